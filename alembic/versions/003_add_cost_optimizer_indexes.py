@@ -0,0 +1,88 @@
+"""add cost optimizer indexes
+
+Indexes follow the filters and orderings used by routers/cost_optimizer.py
+and routers/billing.py. They are built CONCURRENTLY so existing tables stay
+writable while the migration runs.
+
+Revision ID: 003_indexes
+Revises: 002_jobs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_indexes'
+down_revision = '002_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Subscriptions are looked up with scalar_one_or_none(), so more than one
+    # row per user is already an error. Refuse to guess which row to keep.
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT user_id FROM subscriptions GROUP BY user_id HAVING count(*) > 1 LIMIT 5"
+    )).fetchall()
+    if duplicates:
+        raise RuntimeError(
+            "subscriptions has multiple rows for users "
+            f"{', '.join(str(row[0]) for row in duplicates)}; "
+            "remove the duplicates before adding uq_subscriptions_user_id"
+        )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_cloud_accounts_user_id_created_at', 'cloud_accounts',
+            ['user_id', 'created_at'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_cost_analyses_cloud_account_id_analysis_date', 'cost_analyses',
+            ['cloud_account_id', sa.text('analysis_date DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_cost_recommendations_cost_analysis_id_status', 'cost_recommendations',
+            ['cost_analysis_id', 'status'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_cost_recommendations_pending_savings', 'cost_recommendations',
+            ['cost_analysis_id', sa.text('monthly_savings DESC')],
+            postgresql_where=sa.text("status = 'PENDING'"),
+            postgresql_concurrently=True,
+        )
+        # Build the unique index without blocking writes, then attach it.
+        op.create_index(
+            'uq_subscriptions_user_id', 'subscriptions', ['user_id'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+    op.execute(
+        'ALTER TABLE subscriptions ADD CONSTRAINT uq_subscriptions_user_id '
+        'UNIQUE USING INDEX uq_subscriptions_user_id'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_subscriptions_user_id', 'subscriptions', type_='unique')
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_cost_recommendations_pending_savings',
+            table_name='cost_recommendations', postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_cost_recommendations_cost_analysis_id_status',
+            table_name='cost_recommendations', postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_cost_analyses_cloud_account_id_analysis_date',
+            table_name='cost_analyses', postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_cloud_accounts_user_id_created_at',
+            table_name='cloud_accounts', postgresql_concurrently=True,
+        )
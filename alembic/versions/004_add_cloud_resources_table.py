@@ -0,0 +1,50 @@
+"""add cloud resource inventory
+
+Revision ID: 004_inventory
+Revises: 003_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '004_inventory'
+down_revision = '003_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('cloud_accounts', sa.Column('last_full_sync_at', sa.DateTime(timezone=True), nullable=True))
+
+    op.create_table('cloud_resources',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('cloud_account_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('resource_type', sa.String(length=100), nullable=False),
+    sa.Column('resource_id', sa.String(length=512), nullable=False),
+    sa.Column('region', sa.String(length=100), nullable=True),
+    sa.Column('attributes', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('first_seen_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('last_seen_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['cloud_account_id'], ['cloud_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint(
+        'cloud_account_id', 'resource_type', 'resource_id',
+        name='uq_cloud_resources_account_type_resource',
+    )
+    )
+    op.create_index(
+        'ix_cloud_resources_live', 'cloud_resources', ['cloud_account_id'],
+        postgresql_where=sa.text('deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cloud_resources_live', table_name='cloud_resources')
+    op.drop_table('cloud_resources')
+    op.drop_column('cloud_accounts', 'last_full_sync_at')
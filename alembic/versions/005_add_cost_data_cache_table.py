@@ -0,0 +1,40 @@
+"""add billing api response cache
+
+Revision ID: 005_cost_data_cache
+Revises: 004_inventory
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '005_cost_data_cache'
+down_revision = '004_inventory'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('cost_data_cache',
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('cloud_account_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('granularity', sa.String(length=20), nullable=False),
+    sa.Column('group_by', sa.String(length=50), nullable=False),
+    sa.Column('data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['cloud_account_id'], ['cloud_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cache_key')
+    )
+    op.create_index(
+        op.f('ix_cost_data_cache_cloud_account_id'), 'cost_data_cache', ['cloud_account_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_cost_data_cache_cloud_account_id'), table_name='cost_data_cache')
+    op.drop_table('cost_data_cache')
@@ -0,0 +1,45 @@
+"""add daily cost facts partitioned by month
+
+Revision ID: 006_daily_costs
+Revises: 005_cost_data_cache
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006_daily_costs'
+down_revision = '005_cost_data_cache'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Monthly partitions (daily_costs_yYYYYmMM) are created by the backfill
+    # as data arrives.
+    op.create_table('daily_costs',
+    sa.Column('cloud_account_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('usage_date', sa.Date(), nullable=False),
+    sa.Column('service', sa.String(length=255), nullable=False),
+    sa.Column('category', sa.String(length=20), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['cloud_account_id'], ['cloud_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cloud_account_id', 'usage_date', 'service', name='pk_daily_costs'),
+    postgresql_partition_by='RANGE (usage_date)',
+    )
+
+    op.create_table('cost_fact_days',
+    sa.Column('cloud_account_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('usage_date', sa.Date(), nullable=False),
+    sa.Column('ingested_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['cloud_account_id'], ['cloud_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cloud_account_id', 'usage_date')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cost_fact_days')
+    # Drops the partitions as well
+    op.drop_table('daily_costs')
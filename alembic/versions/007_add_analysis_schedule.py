@@ -0,0 +1,30 @@
+"""add scheduled analysis due time to cloud accounts
+
+Revision ID: 007_analysis_schedule
+Revises: 006_daily_costs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_analysis_schedule'
+down_revision = '006_daily_costs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # NULL until the scheduler first sees the account, so existing accounts
+    # get spread over the jitter window instead of all coming due at once.
+    op.add_column('cloud_accounts', sa.Column('next_analysis_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_cloud_accounts_next_analysis_at', 'cloud_accounts', ['next_analysis_at'],
+        postgresql_where=sa.text('is_active'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cloud_accounts_next_analysis_at', table_name='cloud_accounts')
+    op.drop_column('cloud_accounts', 'next_analysis_at')
@@ -0,0 +1,45 @@
+"""add request profiles table
+
+Revision ID: 008_request_profiles
+Revises: 007_analysis_schedule
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '008_request_profiles'
+down_revision = '007_analysis_schedule'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('request_profiles',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('method', sa.String(length=10), nullable=False),
+    sa.Column('path', sa.String(length=2048), nullable=False),
+    sa.Column('route', sa.String(length=255), nullable=True),
+    sa.Column('status_code', sa.Integer(), nullable=False),
+    sa.Column('trigger', sa.String(length=20), nullable=False),
+    sa.Column('user_id', postgresql.UUID(as_uuid=True), nullable=True),
+    sa.Column('duration_ms', sa.Float(), nullable=False),
+    sa.Column('sample_interval_ms', sa.Float(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('folded_stacks', sa.Text(), nullable=False),
+    sa.Column('top_functions', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('sql_statements', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('sql_time_ms', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # Listing and retention both go newest first
+    op.create_index('ix_request_profiles_created_at', 'request_profiles', ['created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_request_profiles_created_at', table_name='request_profiles')
+    op.drop_table('request_profiles')
@@ -0,0 +1,27 @@
+"""add recommendations version to cost analyses
+
+Revision ID: 009_recommendations_version
+Revises: 008_request_profiles
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_recommendations_version'
+down_revision = '008_request_profiles'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Counts recommendation status changes; with the analysis id it forms the ETag
+    op.add_column(
+        'cost_analyses',
+        sa.Column('recommendations_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('cost_analyses', 'recommendations_version')
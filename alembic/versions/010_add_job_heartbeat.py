@@ -0,0 +1,24 @@
+"""add heartbeat to background jobs
+
+Revision ID: 010_job_heartbeat
+Revises: 009_recommendations_version
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_job_heartbeat'
+down_revision = '009_recommendations_version'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Refreshed by the job's worker; RUNNING jobs with a stale heartbeat are re-queued
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
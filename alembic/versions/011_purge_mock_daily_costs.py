@@ -0,0 +1,30 @@
+"""purge demo daily costs stored for Azure and GCP accounts
+
+Revision ID: 011_purge_mock_daily_costs
+Revises: 010_job_heartbeat
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '011_purge_mock_daily_costs'
+down_revision = '010_job_heartbeat'
+branch_labels = None
+depends_on = None
+
+# Until now the Azure and GCP analyzers returned demo figures as daily costs,
+# so every fact and ledger day stored for those accounts is made up. Dropping
+# the ledger rows lets the backfill fetch the days once the real billing
+# queries exist.
+MOCK_ACCOUNTS = "SELECT id FROM cloud_accounts WHERE provider IN ('AZURE', 'GCP')"
+
+
+def upgrade() -> None:
+    op.execute(f"DELETE FROM daily_costs WHERE cloud_account_id IN ({MOCK_ACCOUNTS})")
+    op.execute(f"DELETE FROM cost_fact_days WHERE cloud_account_id IN ({MOCK_ACCOUNTS})")
+
+
+def downgrade() -> None:
+    # The demo rows are not restored
+    pass
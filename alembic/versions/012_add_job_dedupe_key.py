@@ -0,0 +1,32 @@
+"""add dedupe key to background jobs
+
+Revision ID: 012_job_dedupe_key
+Revises: 011_purge_mock_daily_costs
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '012_job_dedupe_key'
+down_revision = '011_purge_mock_daily_costs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('dedupe_key', sa.String(255), nullable=True))
+    # At most one QUEUED or RUNNING job per type and key, e.g. one analysis per account
+    op.create_index(
+        'uq_jobs_active_dedupe_key',
+        'jobs',
+        ['job_type', 'dedupe_key'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_jobs_active_dedupe_key', table_name='jobs')
+    op.drop_column('jobs', 'dedupe_key')
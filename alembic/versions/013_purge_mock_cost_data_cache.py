@@ -0,0 +1,27 @@
+"""purge demo billing data cached for Azure and GCP accounts
+
+Revision ID: 013_purge_mock_cost_data
+Revises: 012_job_dedupe_key
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '013_purge_mock_cost_data'
+down_revision = '012_job_dedupe_key'
+branch_labels = None
+depends_on = None
+
+# Until now the Azure and GCP analyzers returned demo figures as billing data,
+# and the billing cache stored them, closed periods without an expiry.
+MOCK_ACCOUNTS = "SELECT id FROM cloud_accounts WHERE provider IN ('AZURE', 'GCP')"
+
+
+def upgrade() -> None:
+    op.execute(f"DELETE FROM cost_data_cache WHERE cloud_account_id IN ({MOCK_ACCOUNTS})")
+
+
+def downgrade() -> None:
+    # The demo rows are not restored
+    pass
@@ -0,0 +1,209 @@
+"""
+Multi-user load test of the cost optimizer against simulated cloud providers.
+
+Every virtual user registers and logs in (routers/auth.py), connects
+--accounts cloud accounts (AWS, GCP and Azure in turn, --resources resources
+each) and then runs --iterations rounds of: POST /analyze for each account,
+polling GET /jobs/{id} while also polling the dashboard lists
+(GET /analyses, GET /cloud-accounts) until the job finishes, then
+GET /analyses/{id} of the result. Users start spread over --ramp-up seconds.
+
+Reports throughput and p50/p95/p99 latency per endpoint, plus the time from
+POST /analyze until the analysis finished.
+
+By default the app runs in-process with CLOUD_PROVIDER_BACKEND=fake (see
+services/cost_optimizer/providers/fake.py), its job workers started, rate
+limiting and the analysis scheduler off; only the database is needed. With
+--base-url the load goes to a running API instead, which should be started
+with CLOUD_PROVIDER_BACKEND=fake and RATE_LIMIT_ENABLED=false. The users
+created are deleted afterwards (through DATABASE_URL) unless --keep-data
+is given.
+
+Usage:
+    python -m apps.api.benchmarks.load_test --users 20 --accounts 2 --resources 2000
+    python -m apps.api.benchmarks.load_test --base-url http://localhost:8000 --users 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+
+from apps.api.core.config import get_settings
+from apps.api.core.database import engine
+from apps.api.main import app
+from apps.api.services.cost_optimizer.providers import fake
+from .suite import _percentile, cleanup
+
+# Load test users are recognisable by their email, so a crashed run is cleaned up by the next one
+EMAIL_DOMAIN = "load.bench.io"
+
+PASSWORD = "load-test-password"
+
+PROVIDERS = ("AWS", "GCP", "AZURE")
+REGIONS = {"AWS": "us-east-1", "GCP": "load-test-project", "AZURE": "load-test-subscription"}
+
+API = "/api/cost-optimizer"
+
+FINISHED = ("SUCCEEDED", "FAILED", "SKIPPED")
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.analyses: List[float] = []  # seconds from POST /analyze until the job finished
+        self.failed_analyses = 0
+
+    async def call(self, name: str, request) -> Optional[httpx.Response]:
+        """Await ``request``, recording its latency under ``name``; None if it failed."""
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            response = None
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if response is None or response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            return None
+        return response
+
+
+async def virtual_user(client: httpx.AsyncClient, stats: LoadStats, n: int, run_id: str,
+                       args: argparse.Namespace) -> None:
+    email = f"user{n}-{run_id}@{EMAIL_DOMAIN}"
+    credentials = {"email": email, "password": PASSWORD}
+    if not await stats.call("POST /auth/register", client.post(
+        "/api/auth/register", json={**credentials, "name": f"Load User {n}"}
+    )):
+        return
+    login = await stats.call("POST /auth/login", client.post("/api/auth/login", json=credentials))
+    if login is None:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    accounts = []
+    for i in range(args.accounts):
+        provider = PROVIDERS[(n + i) % len(PROVIDERS)]
+        response = await stats.call("POST /cloud-accounts", client.post(f"{API}/cloud-accounts", json={
+            "name": f"{provider.lower()}-{i}",
+            "provider": provider,
+            "credentials": {"resource_count": args.resources, "seed": f"{run_id}-{n}-{i}"},
+            "region": REGIONS[provider],
+        }, headers=headers))
+        if response is not None:
+            accounts.append(response.json()["id"])
+
+    for _ in range(args.iterations):
+        for account_id in accounts:
+            started = time.perf_counter()
+            response = await stats.call("POST /analyze", client.post(
+                f"{API}/analyze", json={"cloud_account_id": account_id}, headers=headers
+            ))
+            if response is None:
+                continue
+            job = response.json()
+            while job["status"] not in FINISHED:
+                await asyncio.sleep(args.poll_interval)
+                await stats.call("GET /analyses", client.get(
+                    f"{API}/analyses", params={"limit": args.list_limit}, headers=headers
+                ))
+                await stats.call("GET /cloud-accounts", client.get(f"{API}/cloud-accounts", headers=headers))
+                response = await stats.call("GET /jobs/{id}", client.get(f"{API}/jobs/{job['id']}", headers=headers))
+                if response is not None:
+                    job = response.json()
+
+            if job["status"] != "SUCCEEDED":
+                stats.failed_analyses += 1
+                continue
+            stats.analyses.append(time.perf_counter() - started)
+            await stats.call("GET /analyses/{id}", client.get(
+                f"{API}/analyses/{job['result']['analysis_id']}", headers=headers
+            ))
+
+
+async def run(client: httpx.AsyncClient, args: argparse.Namespace) -> LoadStats:
+    stats = LoadStats()
+    run_id = uuid.uuid4().hex[:8]
+
+    async def staggered(n: int) -> None:
+        await asyncio.sleep(args.ramp_up * n / max(1, args.users))
+        await virtual_user(client, stats, n, run_id, args)
+
+    await asyncio.gather(*(staggered(n) for n in range(args.users)))
+    return stats
+
+
+def report(stats: LoadStats, elapsed: float) -> None:
+    total = sum(len(latencies) for latencies in stats.latencies.values())
+    errors = sum(stats.errors.values())
+    print(f"\n{total:,} requests in {elapsed:.1f}s: {total / elapsed:.1f} req/s, {errors} errors\n")
+    print(f"{'endpoint':<24}{'requests':>9}{'errors':>8}{'req/s':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, latencies in stats.latencies.items():
+        ms = [latency * 1000 for latency in latencies]
+        print(
+            f"{name:<24}{len(ms):>9}{stats.errors.get(name, 0):>8}{len(ms) / elapsed:>8.1f}"
+            f"{statistics.median(ms):>8.1f}ms{_percentile(ms, 0.95):>8.1f}ms"
+            f"{_percentile(ms, 0.99):>8.1f}ms{max(ms):>8.1f}ms"
+        )
+    if stats.analyses:
+        print(
+            f"\n{len(stats.analyses)} analyses finished ({stats.failed_analyses} failed), "
+            f"{len(stats.analyses) / elapsed * 60:.1f}/min; time to result "
+            f"p50 {statistics.median(stats.analyses):.2f}s, p95 {_percentile(stats.analyses, 0.95):.2f}s, "
+            f"max {max(stats.analyses):.2f}s"
+        )
+    else:
+        print(f"\nNo analyses finished ({stats.failed_analyses} failed)")
+
+
+async def main(args: argparse.Namespace) -> None:
+    await cleanup(EMAIL_DOMAIN)
+    timeout = httpx.Timeout(60.0)
+    started = time.perf_counter()
+    try:
+        if args.base_url:
+            async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout) as client:
+                stats = await run(client, args)
+        else:
+            settings = get_settings()
+            settings.CLOUD_PROVIDER_BACKEND = "fake"
+            settings.RATE_LIMIT_ENABLED = False
+            settings.ANALYSIS_SCHEDULE_ENABLED = False
+            for handler in app.router.on_startup:
+                await handler()
+            try:
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app), base_url="http://load", timeout=timeout
+                ) as client:
+                    stats = await run(client, args)
+            finally:
+                for handler in app.router.on_shutdown:
+                    await handler()
+            provider = fake.stats()
+            print(
+                f"Simulated provider: {provider['requests']:,} requests, {provider['throttled']:,} throttled, "
+                f"{provider['failed']:,} failed after retries"
+            )
+        report(stats, time.perf_counter() - started)
+    finally:
+        if not args.keep_data:
+            await cleanup(EMAIL_DOMAIN)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="virtual users")
+    parser.add_argument("--accounts", type=int, default=2, help="cloud accounts per user")
+    parser.add_argument("--resources", type=int, default=2000, help="simulated resources per account")
+    parser.add_argument("--iterations", type=int, default=3, help="analyses per account")
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="seconds between dashboard polls")
+    parser.add_argument("--list-limit", type=int, default=20, help="page size of the polled analyses list")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which users start")
+    parser.add_argument("--base-url", help="load a running API instead of an in-process app")
+    parser.add_argument("--keep-data", action="store_true", help="keep the created users and their data")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,135 @@
+"""
+Login throughput benchmark.
+
+Drives concurrent POST /api/auth/login requests against the app in-process
+while a probe polls GET /api/health, and reports login throughput next to
+the probe latency. Runs twice: once with bcrypt inline on the event loop
+(the old behaviour) and once on the password hashing executor. With the
+executor the probe latency should stay flat under a login burst. Rate
+limiting is off for the run; the auth bucket would otherwise refuse all but
+the first few logins.
+
+Usage:
+    python -m apps.api.benchmarks.login_throughput --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import delete
+
+from apps.api.core import rate_limit, security
+from apps.api.core.database import AsyncSessionLocal
+from apps.api.main import app
+from apps.api.models.user import User
+
+PASSWORD = "benchmark-password"
+
+
+async def _inline_hasher(func, *args):
+    return func(*args)
+
+
+async def create_user() -> str:
+    email = f"bench-{uuid.uuid4().hex[:12]}@bench.io"
+    async with AsyncSessionLocal() as db:
+        db.add(User(
+            email=email,
+            name="Benchmark User",
+            password_hash=security.pwd_context.hash(PASSWORD),
+            role="VIEWER",
+        ))
+        await db.commit()
+    return email
+
+
+async def delete_user(email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(User).where(User.email == email))
+        await db.commit()
+
+
+async def run(email: str, concurrency: int, duration: float, probe_interval: float) -> Dict[str, float]:
+    deadline = time.perf_counter() + duration
+    logins = 0
+    failures = 0
+    probe_latencies: List[float] = []
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+
+        async def login_worker() -> None:
+            nonlocal logins, failures
+            while time.perf_counter() < deadline:
+                response = await client.post(
+                    "/api/auth/login", json={"email": email, "password": PASSWORD}
+                )
+                if response.status_code == 200:
+                    logins += 1
+                else:
+                    failures += 1
+
+        async def probe() -> None:
+            # Latency is measured from when the probe was due, so time spent
+            # waiting for a blocked event loop is counted.
+            while time.perf_counter() < deadline:
+                due = time.perf_counter() + probe_interval
+                await asyncio.sleep(probe_interval)
+                await client.get("/api/health")
+                probe_latencies.append((time.perf_counter() - due) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(login_worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    probe_latencies.sort()
+    return {
+        "logins_per_sec": logins / elapsed,
+        "failures": failures,
+        "probe_p50_ms": statistics.median(probe_latencies),
+        "probe_p99_ms": probe_latencies[max(0, int(len(probe_latencies) * 0.99) - 1)],
+        "probe_max_ms": probe_latencies[-1],
+        "probes": len(probe_latencies),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    email = await create_user()
+    executor_hasher = security._run_hasher
+    rate_limit_enabled = rate_limit.settings.RATE_LIMIT_ENABLED
+    rate_limit.settings.RATE_LIMIT_ENABLED = False
+    results = {}
+    try:
+        security._run_hasher = _inline_hasher
+        results["inline"] = await run(email, args.concurrency, args.duration, args.probe_interval)
+        security._run_hasher = executor_hasher
+        results["executor"] = await run(email, args.concurrency, args.duration, args.probe_interval)
+    finally:
+        security._run_hasher = executor_hasher
+        rate_limit.settings.RATE_LIMIT_ENABLED = rate_limit_enabled
+        await delete_user(email)
+
+    print(
+        f"bcrypt rounds={security.settings.PASSWORD_HASH_ROUNDS} "
+        f"workers={security.settings.PASSWORD_HASH_WORKERS} concurrency={args.concurrency}\n"
+    )
+    print(f"{'mode':<10}{'logins/s':>10}{'failures':>10}{'probe p50':>12}{'probe p99':>12}{'probe max':>12}{'probes':>8}")
+    for mode, result in results.items():
+        print(
+            f"{mode:<10}{result['logins_per_sec']:>10.1f}{result['failures']:>10}"
+            f"{result['probe_p50_ms']:>10.1f}ms{result['probe_p99_ms']:>10.1f}ms"
+            f"{result['probe_max_ms']:>10.1f}ms{result['probes']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per mode")
+    parser.add_argument("--probe-interval", type=float, default=0.05, help="seconds between health probes")
+    asyncio.run(main(parser.parse_args()))
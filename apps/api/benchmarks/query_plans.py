@@ -0,0 +1,218 @@
+"""
+Query-plan benchmark for the cost optimizer hot queries.
+
+Seeds a large synthetic dataset into a scratch schema, then runs
+``EXPLAIN ANALYZE`` on the queries issued by routers/cost_optimizer.py and
+routers/billing.py, first without and then with the indexes declared on the
+models (migration 003_indexes). The scratch schema is dropped afterwards.
+
+Usage:
+    python -m apps.api.benchmarks.query_plans --users 5000 --analyses 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import AddConstraint, DropConstraint
+
+from apps.api.core.database import engine
+from apps.api.models.billing import (
+    CloudAccount,
+    CostAnalysis,
+    CostRecommendation,
+    Subscription,
+)
+from apps.api.models.user import User
+
+SCHEMA = "bench_query_plans"
+
+TABLES = [
+    User.__table__,
+    Subscription.__table__,
+    CloudAccount.__table__,
+    CostAnalysis.__table__,
+    CostRecommendation.__table__,
+]
+
+# (name, SQL) pairs mirroring the ORM queries in the routers.
+QUERIES: List[Tuple[str, str]] = [
+    (
+        "subscription by user",
+        "SELECT * FROM subscriptions WHERE user_id = :user_id",
+    ),
+    (
+        "cloud accounts by user",
+        "SELECT * FROM cloud_accounts WHERE user_id = :user_id ORDER BY created_at",
+    ),
+    (
+        "analyses page (user)",
+        "SELECT ca.* FROM cost_analyses ca "
+        "JOIN cloud_accounts a ON a.id = ca.cloud_account_id "
+        "WHERE a.user_id = :user_id "
+        "ORDER BY ca.analysis_date DESC, ca.id DESC LIMIT 51",
+    ),
+    (
+        "analyses page (account)",
+        "SELECT ca.* FROM cost_analyses ca "
+        "JOIN cloud_accounts a ON a.id = ca.cloud_account_id "
+        "WHERE a.user_id = :user_id AND ca.cloud_account_id = :account_id "
+        "ORDER BY ca.analysis_date DESC, ca.id DESC LIMIT 51",
+    ),
+    (
+        "recommendations selectin",
+        "SELECT * FROM cost_recommendations WHERE cost_analysis_id IN ("
+        "SELECT id FROM cost_analyses WHERE cloud_account_id = :account_id "
+        "ORDER BY analysis_date DESC LIMIT 50)",
+    ),
+    (
+        "pending recommendations",
+        "SELECT * FROM cost_recommendations "
+        "WHERE cost_analysis_id = :analysis_id AND status = 'PENDING' "
+        "ORDER BY monthly_savings DESC LIMIT 20",
+    ),
+]
+
+
+async def seed(conn: AsyncConnection, users: int, accounts: int, analyses: int, recommendations: int) -> None:
+    """Populate the scratch schema with generate_series; much faster than the ORM."""
+    await conn.execute(text(
+        "INSERT INTO users (id, email, name, password_hash, role, created_at) "
+        "SELECT gen_random_uuid(), 'user' || n || '@bench.io', 'User ' || n, 'x', 'VIEWER', now() "
+        "FROM generate_series(1, :n) AS n"
+    ), {"n": users})
+    await conn.execute(text(
+        "INSERT INTO subscriptions (id, user_id, plan, status, cancel_at_period_end, created_at, updated_at) "
+        "SELECT gen_random_uuid(), id, 'PREMIUM', 'ACTIVE', false, now(), now() FROM users"
+    ))
+    await conn.execute(text(
+        "INSERT INTO cloud_accounts (id, user_id, name, provider, credentials, region, is_active, created_at) "
+        "SELECT gen_random_uuid(), u.id, 'account ' || n, 'AWS', '{}'::jsonb, 'us-east-1', true, "
+        "now() - n * interval '1 day' "
+        "FROM users u CROSS JOIN generate_series(1, :n) AS n"
+    ), {"n": accounts})
+    await conn.execute(text(
+        "INSERT INTO cost_analyses (id, cloud_account_id, analysis_date, total_monthly_cost, "
+        "potential_savings, savings_percentage, resource_count, cost_breakdown, created_at) "
+        "SELECT gen_random_uuid(), a.id, now() - n * interval '1 hour', 1000, 100, 10, 50, '{}'::jsonb, now() "
+        "FROM cloud_accounts a CROSS JOIN generate_series(1, :n) AS n"
+    ), {"n": analyses})
+    await conn.execute(text(
+        "INSERT INTO cost_recommendations (id, cost_analysis_id, resource_type, resource_id, "
+        "recommendation_type, title, description, current_cost, estimated_new_cost, monthly_savings, "
+        "annual_savings, priority, implementation_effort, status, metadata, created_at) "
+        "SELECT gen_random_uuid(), ca.id, 'EC2', 'i-' || n, 'DOWNSIZE', 'Downsize', 'Downsize it', "
+        "100, 50, random() * 100, 600, 'HIGH', 'EASY', "
+        "(ARRAY['PENDING', 'APPLIED', 'DISMISSED'])[1 + n % 3], '{}'::jsonb, now() "
+        "FROM cost_analyses ca CROSS JOIN generate_series(1, :n) AS n"
+    ), {"n": recommendations})
+
+
+async def sample_params(conn: AsyncConnection) -> Dict[str, Any]:
+    row = (await conn.execute(text(
+        "SELECT a.user_id, a.id, ca.id FROM cloud_accounts a "
+        "JOIN cost_analyses ca ON ca.cloud_account_id = a.id "
+        "ORDER BY a.created_at DESC LIMIT 1"
+    ))).one()
+    return {"user_id": row[0], "account_id": row[1], "analysis_id": row[2]}
+
+
+def _scan_nodes(plan: Dict[str, Any]) -> List[str]:
+    """Collect the scan node types of a plan, outermost first."""
+    nodes = []
+    if "Scan" in plan["Node Type"]:
+        nodes.append(plan["Node Type"])
+    for child in plan.get("Plans", []):
+        nodes.extend(_scan_nodes(child))
+    return nodes
+
+
+async def explain(conn: AsyncConnection, params: Dict[str, Any], repeat: int) -> Dict[str, Tuple[float, str]]:
+    results = {}
+    for name, sql in QUERIES:
+        timings = []
+        plan = None
+        for _ in range(repeat):
+            raw = (await conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"),
+                {key: params[key] for key in params if f":{key}" in sql},
+            )).scalar_one()
+            plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]
+            timings.append(plan["Execution Time"])
+        scans = ", ".join(dict.fromkeys(_scan_nodes(plan["Plan"])))
+        results[name] = (sorted(timings)[len(timings) // 2], scans)
+    return results
+
+
+def _drop_indexes(sync_conn) -> None:
+    for table in TABLES:
+        for index in table.indexes:
+            if index.name != "ix_users_email":
+                index.drop(sync_conn, checkfirst=True)
+    sync_conn.execute(DropConstraint(_subscription_unique()))
+
+
+def _create_indexes(sync_conn) -> None:
+    for table in TABLES:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+    sync_conn.execute(AddConstraint(_subscription_unique()))
+
+
+def _subscription_unique():
+    return next(
+        constraint for constraint in Subscription.__table__.constraints
+        if constraint.name == "uq_subscriptions_user_id"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with engine.connect() as base_conn:
+        conn = await base_conn.execution_options(schema_translate_map={None: SCHEMA})
+        await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        await conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        try:
+            await conn.run_sync(
+                lambda sync_conn: TABLES[0].metadata.create_all(sync_conn, tables=TABLES)
+            )
+            await conn.run_sync(_drop_indexes)
+
+            started = time.perf_counter()
+            await seed(conn, args.users, args.accounts, args.analyses, args.recommendations)
+            await conn.execute(text("ANALYZE"))
+            await conn.commit()
+            rows = args.users * args.accounts * args.analyses * args.recommendations
+            print(f"Seeded {rows:,} recommendations in {time.perf_counter() - started:.1f}s")
+
+            params = await sample_params(conn)
+            before = await explain(conn, params, args.repeat)
+
+            await conn.run_sync(_create_indexes)
+            await conn.execute(text("ANALYZE"))
+            await conn.commit()
+            after = await explain(conn, params, args.repeat)
+        finally:
+            await conn.rollback()
+            await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            await conn.commit()
+
+    print(f"\n{'query':<28}{'before ms':>12}{'after ms':>12}{'speedup':>10}  plan")
+    for name, _ in QUERIES:
+        before_ms, before_scans = before[name]
+        after_ms, after_scans = after[name]
+        speedup = before_ms / after_ms if after_ms else float("inf")
+        print(f"{name:<28}{before_ms:>12.2f}{after_ms:>12.2f}{speedup:>9.1f}x  {before_scans} -> {after_scans}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--accounts", type=int, default=2, help="cloud accounts per user")
+    parser.add_argument("--analyses", type=int, default=20, help="analyses per account")
+    parser.add_argument("--recommendations", type=int, default=10, help="recommendations per analysis")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the median is reported")
+    asyncio.run(main(parser.parse_args()))
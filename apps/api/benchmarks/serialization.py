@@ -0,0 +1,149 @@
+"""
+Serialization benchmark for the cost analysis read endpoints.
+
+Builds a page of --analyses analyses in memory, each with the
+recommendations the engine makes for a --resources synthetic inventory,
+and serializes it two ways:
+
+- ``response_model``: what GET /analyses did before, FastAPI validating
+  the ORM rows into List[CostAnalysisResponse] (from_attributes) and
+  rendering the result with JSONResponse
+- ``orjson``: what it does now, recommendation column tuples (as
+  load_recommendations selects them) zipped into dicts and dumped with
+  orjson, see services/cost_optimizer/serialization.py
+
+and checks both produce the same bytes. Only serialization is timed; the
+new path also saves hydrating an ORM object per recommendation, which
+needs the database to measure (the API cases of suite.py include it).
+
+The orjson body is then compressed with every configured encoding whose
+package is installed (see core/responses.py), reporting payload size and
+compression time. No database is needed.
+
+Usage:
+    python -m apps.api.benchmarks.serialization
+    python -m apps.api.benchmarks.serialization --analyses 50 --resources 1000 --runs 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import Float
+
+from apps.api.core.responses import ENCODINGS, compress, compressors
+from apps.api.models.billing import CostAnalysis, CostRecommendation
+from apps.api.schemas.billing import CostAnalysisResponse
+from apps.api.services.cost_optimizer.engine import CostOptimizerEngine
+from apps.api.services.cost_optimizer.persistence import build_recommendation_rows
+from apps.api.services.cost_optimizer.serialization import (
+    RECOMMENDATION_COLUMNS,
+    RECOMMENDATION_FIELDS,
+    dump_analyses,
+)
+from .suite import _percentile
+
+
+def build_analyses(count: int, resources: int) -> List[CostAnalysis]:
+    """Transient analyses as a recommendation-loaded page of GET /analyses returns them."""
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    account_id = uuid.uuid4()
+    analyses = []
+    for i in range(count):
+        inventory = CostOptimizerEngine.generate_mock_resources("AWS", resources, seed=i)
+        result = CostOptimizerEngine.analyze_resources("AWS", inventory, seed=i)
+        analysis = CostAnalysis(
+            id=uuid.uuid4(),
+            cloud_account_id=account_id,
+            analysis_date=now - timedelta(days=i),
+            total_monthly_cost=result["total_monthly_cost"],
+            potential_savings=result["potential_savings"],
+            savings_percentage=result["savings_percentage"],
+            resource_count=result["resource_count"],
+            cost_breakdown=result["cost_breakdown"],
+        )
+        analysis.recommendations = [
+            CostRecommendation(**row) for row in build_recommendation_rows(analysis.id, result["recommendations"])
+        ]
+        analyses.append(analysis)
+    return analyses
+
+
+def time_runs(func: Callable[[], bytes], runs: int) -> List[float]:
+    func()  # warm-up
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main(args: argparse.Namespace) -> int:
+    analyses = build_analyses(args.analyses, args.resources)
+    recommendations = sum(len(analysis.recommendations) for analysis in analyses)
+    print(f"{args.analyses} analyses, {recommendations:,} recommendations\n")
+
+    field = create_response_field(name="Response_list_cost_analyses", type_=List[CostAnalysisResponse])
+    loop = asyncio.new_event_loop()
+
+    def response_model() -> bytes:
+        content = loop.run_until_complete(serialize_response(field=field, response_content=analyses))
+        return JSONResponse(content).body
+
+    # What load_recommendations' query returns for the page (Float columns come back as floats)
+    def row(rec: CostRecommendation) -> tuple:
+        return tuple(
+            float(value) if isinstance(column.type, Float) else value
+            for column, value in ((column, getattr(rec, column.key)) for column in RECOMMENDATION_COLUMNS)
+        )
+
+    rows = {analysis.id: [row(rec) for rec in analysis.recommendations] for analysis in analyses}
+
+    def fast() -> bytes:
+        recommendations = {
+            analysis_id: [dict(zip(RECOMMENDATION_FIELDS, values)) for values in analysis_rows]
+            for analysis_id, analysis_rows in rows.items()
+        }
+        return dump_analyses(analyses, recommendations)
+
+    legacy_body, body = response_model(), fast()
+    identical = legacy_body == body
+
+    print(f"{'path':<16}{'bytes':>14}{'p50':>12}{'p99':>12}")
+    for name, func, payload in (("response_model", response_model, legacy_body), ("orjson", fast, body)):
+        timings = time_runs(func, args.runs)
+        print(
+            f"{name:<16}{len(payload):>14,}{statistics.median(timings):>10.1f}ms"
+            f"{_percentile(timings, 0.99):>10.1f}ms"
+        )
+    loop.close()
+    print(f"\nBodies identical: {'yes' if identical else 'NO'}\n")
+
+    print(f"{'encoding':<16}{'bytes':>14}{'ratio':>8}{'p50':>12}")
+    print(f"{'identity':<16}{len(body):>14,}{1:>8.1f}{0:>10.1f}ms")
+    for encoding in compressors():
+        compressed = compress(body, encoding)
+        timings = time_runs(lambda: compress(body, encoding), args.runs)
+        print(
+            f"{encoding:<16}{len(compressed):>14,}{len(body) / len(compressed):>8.1f}"
+            f"{statistics.median(timings):>10.1f}ms"
+        )
+    missing = set(ENCODINGS) - set(compressors())
+    if missing:
+        print(f"\nNot measured (disabled or package missing): {', '.join(sorted(missing))}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analyses", type=int, default=20, help="analyses in the page")
+    parser.add_argument("--resources", type=int, default=2000, help="inventory size each analysis ran on")
+    parser.add_argument("--runs", type=int, default=10, help="timed runs per path and encoding")
+    raise SystemExit(main(parser.parse_args()))
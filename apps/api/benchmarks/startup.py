@@ -0,0 +1,130 @@
+"""
+API startup benchmark: import time and resident memory of ``apps.api.main``.
+
+Each sample runs in a fresh interpreter with ``python -X importtime``, so
+the numbers are what a newly forked API worker pays before serving its first
+request. Two scenarios are measured:
+
+- ``lazy``: import the app only (what a worker pays at boot)
+- ``providers``: import the app and resolve every cloud provider analyzer
+  (what a worker pays once it has run analyses for all three clouds)
+
+The report lists the slowest top-level imports and which provider SDKs were
+loaded. The run fails (exit status 1) if a provider SDK is imported at boot
+or the median boot import time exceeds ``--budget-ms``, so startup
+regressions show up in CI.
+
+Usage:
+    python -m apps.api.benchmarks.startup --runs 5 --budget-ms 2500
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+# Modules that must not be imported until a provider is actually used
+PROVIDER_SDKS = ("boto3", "botocore", "google.cloud", "azure")
+
+_SCENARIOS = {
+    "lazy": "import apps.api.main",
+    "providers": (
+        "import apps.api.main\n"
+        "from apps.api.services.cost_optimizer.cloud_providers import ANALYZERS, get_analyzer\n"
+        "for provider in ANALYZERS: get_analyzer(provider)\n"
+    ),
+}
+
+# Runs in the child after the scenario: report peak RSS and loaded modules
+_REPORT = (
+    "\nimport json, resource, sys\n"
+    "print(json.dumps({'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,"
+    " 'modules': sorted(sys.modules)}))\n"
+)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def sample(scenario: str) -> Dict[str, Any]:
+    """Run one scenario in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _SCENARIOS[scenario] + _REPORT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imports = []
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            imports.append({
+                "module": match.group(4),
+                "cumulative_us": int(match.group(2)),
+                "depth": len(match.group(3)) // 2,
+            })
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {
+        # Top-level entries add up to the whole import graph
+        "import_ms": sum(i["cumulative_us"] for i in imports if i["depth"] == 0) / 1000,
+        "maxrss_mb": report["maxrss_kb"] / 1024,
+        "imports": imports,
+        "sdks": sorted(
+            sdk for sdk in PROVIDER_SDKS
+            if any(m == sdk or m.startswith(sdk + ".") for m in report["modules"])
+        ),
+    }
+
+
+def summarize(samples: List[Dict[str, Any]], top: int) -> Dict[str, Any]:
+    # Slowest imports of the app's own direct dependencies, from the median run
+    median_run = sorted(samples, key=lambda s: s["import_ms"])[len(samples) // 2]
+    slowest = sorted(
+        (i for i in median_run["imports"] if i["depth"] <= 2),
+        key=lambda i: i["cumulative_us"],
+        reverse=True,
+    )[:top]
+    return {
+        "import_ms": statistics.median(s["import_ms"] for s in samples),
+        "maxrss_mb": statistics.median(s["maxrss_mb"] for s in samples),
+        "sdks": median_run["sdks"],
+        "slowest": slowest,
+    }
+
+
+def main(args: argparse.Namespace) -> int:
+    results = {
+        scenario: summarize([sample(scenario) for _ in range(args.runs)], args.top)
+        for scenario in _SCENARIOS
+    }
+
+    print(f"{'scenario':<12}{'import':>12}{'max rss':>12}  provider SDKs")
+    for scenario, result in results.items():
+        print(
+            f"{scenario:<12}{result['import_ms']:>10.1f}ms{result['maxrss_mb']:>10.1f}MB"
+            f"  {', '.join(result['sdks']) or '-'}"
+        )
+
+    print(f"\nslowest imports at boot (median of {args.runs} runs):")
+    for entry in results["lazy"]["slowest"]:
+        print(f"  {entry['cumulative_us'] / 1000:>8.1f}ms  {'  ' * entry['depth']}{entry['module']}")
+
+    failures = []
+    if results["lazy"]["sdks"]:
+        failures.append(f"provider SDKs imported at boot: {', '.join(results['lazy']['sdks'])}")
+    if args.budget_ms and results["lazy"]["import_ms"] > args.budget_ms:
+        failures.append(
+            f"boot import time {results['lazy']['import_ms']:.0f}ms exceeds budget {args.budget_ms:.0f}ms"
+        )
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--budget-ms", type=float, default=0, help="fail if boot import time exceeds this (0: off)")
+    sys.exit(main(parser.parse_args()))
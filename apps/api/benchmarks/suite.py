@@ -0,0 +1,401 @@
+"""
+Benchmark suite for the cost optimizer engine and API endpoints.
+
+Engine cases run CostOptimizerEngine.analyze_resources on the seeded
+synthetic inventory (services/cost_optimizer/synthetic.py) of each --sizes
+count, in columnar and row mode. API cases seed --users users with a large analysis history
+(accounts x analyses x recommendations each) into the database, then drive
+POST /analyze, GET /analyses and GET /analyses/{id} in-process as one of
+them; the seeded rows are deleted afterwards. Rate limiting is turned off
+for the run and job workers are not started, so /analyze measures the
+request path up to the enqueue. The analysis response cache is off for
+those cases, so they keep measuring the database and serialization path;
+the "(cached)" cases read a few hot analyses with the cache on, measuring
+cache hits.
+
+Every case records throughput (resources/s or requests/s), p50/p99 latency
+(per run or per request) and peak memory (Python heap growth at the peak of
+one run, from tracemalloc, measured in a separate pass so tracing does not
+skew the timings). Results are compared with the stored baseline
+(baseline.json next to this file): a case more than --tolerance slower or
+--memory-tolerance larger than its baseline is a regression, and the suite
+exits with status 1. Baselines are machine specific; record them with
+--update-baseline on the machine the comparison runs on.
+
+Usage:
+    python -m apps.api.benchmarks.suite
+    python -m apps.api.benchmarks.suite --skip-api --sizes 1000,100000
+    python -m apps.api.benchmarks.suite --update-baseline
+"""
+import argparse
+import asyncio
+import gc
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import text
+
+from apps.api.core import rate_limit
+from apps.api.core.database import engine
+from apps.api.core.security import create_access_token
+from apps.api.main import app
+from apps.api.services.cost_optimizer.analysis import ANALYSIS_JOB, run_analysis_job
+from apps.api.services.cost_optimizer.analysis_cache import analysis_cache
+from apps.api.services.cost_optimizer.engine import CostOptimizerEngine
+from apps.api.services.jobs import get_job_queue
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Seeded users are recognisable by their email, so a crashed run is cleaned up by the next one
+EMAIL_DOMAIN = "suite.bench.io"
+
+API_PREFIX = "/api/cost-optimizer"
+
+# API cases run with the analysis response cache on; the others bypass it
+CACHED_CASES = ("api/analyses (cached)", "api/analyses/{id} (cached)")
+
+# Analyses the cached cases read, all cached during the warm-up
+HOT_ANALYSES = 8
+
+# (metric, direction): +1 when larger is better, -1 when smaller is better
+METRICS = (
+    ("throughput", +1),
+    ("p50_ms", -1),
+    ("p99_ms", -1),
+    ("peak_mb", -1),
+)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+
+def _size_label(size: int) -> str:
+    for unit, scale in (("M", 1_000_000), ("k", 1_000)):
+        if size >= scale and size % scale == 0:
+            return f"{size // scale}{unit}"
+    return str(size)
+
+
+def _peak_mb(run: Callable[[], Any]) -> float:
+    """Heap growth at the peak of ``run()``, above what was allocated before it."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / 2**20
+
+
+async def _peak_mb_async(run: Callable[[], Awaitable[Any]]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        await run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - before) / 2**20
+
+
+# --- engine -----------------------------------------------------------------
+
+
+def bench_engine(size: int, columnar: bool, runs: int) -> Dict[str, float]:
+    resources = CostOptimizerEngine.generate_mock_resources("AWS", size)
+
+    def analyze():
+        return CostOptimizerEngine.analyze_resources("AWS", resources, columnar=columnar, seed=42)
+
+    if size <= 100_000:
+        analyze()  # warm-up: imports, lookup tables, allocator
+    timings = []
+    # Small inventories run in milliseconds; time more runs so p99 is not a single outlier
+    for _ in range(max(runs, min(200, 1_000_000 // size))):
+        gc.collect()
+        started = time.perf_counter()
+        analyze()
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "throughput": size / statistics.median(timings),
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": _percentile(timings, 0.99) * 1000,
+        "peak_mb": _peak_mb(analyze),
+    }
+
+
+# --- API --------------------------------------------------------------------
+
+
+async def cleanup(email_domain: str = EMAIL_DOMAIN) -> None:
+    """Delete the users with an ``@email_domain`` address and everything they own."""
+    users = f"SELECT id FROM users WHERE email LIKE '%@{email_domain}'"
+    accounts = f"SELECT id FROM cloud_accounts WHERE user_id IN ({users})"
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "DELETE FROM cost_recommendations WHERE cost_analysis_id IN ("
+            f"SELECT id FROM cost_analyses WHERE cloud_account_id IN ({accounts}))"
+        ))
+        await conn.execute(text(f"DELETE FROM cost_analyses WHERE cloud_account_id IN ({accounts})"))
+        await conn.execute(text(f"DELETE FROM cloud_accounts WHERE user_id IN ({users})"))
+        await conn.execute(text(f"DELETE FROM subscriptions WHERE user_id IN ({users})"))
+        await conn.execute(text(f"DELETE FROM users WHERE email LIKE '%@{email_domain}'"))
+
+
+async def seed(users: int, accounts: int, analyses: int, recommendations: int) -> Dict[str, Any]:
+    """Seed the histories with generate_series and return the benchmark user's ids."""
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TEMP TABLE suite_users ON COMMIT DROP AS "
+            "SELECT gen_random_uuid() AS id, n AS number FROM generate_series(1, :n) AS n"
+        ), {"n": users})
+        await conn.execute(text(
+            "INSERT INTO users (id, email, name, password_hash, role, created_at) "
+            f"SELECT id, 'user' || number || '@{EMAIL_DOMAIN}', 'Suite User ' || number, 'x', 'VIEWER', now() "
+            "FROM suite_users"
+        ))
+        await conn.execute(text(
+            "INSERT INTO subscriptions (id, user_id, plan, status, cancel_at_period_end, created_at, updated_at) "
+            "SELECT gen_random_uuid(), id, 'ENTERPRISE', 'ACTIVE', false, now(), now() FROM suite_users"
+        ))
+        await conn.execute(text(
+            "INSERT INTO cloud_accounts (id, user_id, name, provider, credentials, region, is_active, "
+            "next_analysis_at, created_at) "
+            "SELECT gen_random_uuid(), u.id, 'account ' || n, 'AWS', '{}'::jsonb, 'us-east-1', true, "
+            "now() + interval '1 day', now() - n * interval '1 day' "
+            "FROM suite_users u CROSS JOIN generate_series(1, :n) AS n"
+        ), {"n": accounts})
+        await conn.execute(text(
+            "INSERT INTO cost_analyses (id, cloud_account_id, analysis_date, total_monthly_cost, "
+            "potential_savings, savings_percentage, resource_count, cost_breakdown, created_at) "
+            "SELECT gen_random_uuid(), a.id, now() - n * interval '1 hour', 1000, 100, 10, 50, "
+            "'{\"compute\": 600, \"storage\": 300, \"network\": 50, \"database\": 50, \"other\": 0}'::jsonb, now() "
+            "FROM cloud_accounts a JOIN suite_users u ON u.id = a.user_id "
+            "CROSS JOIN generate_series(1, :n) AS n"
+        ), {"n": analyses})
+        await conn.execute(text(
+            "INSERT INTO cost_recommendations (id, cost_analysis_id, resource_type, resource_id, "
+            "recommendation_type, title, description, current_cost, estimated_new_cost, monthly_savings, "
+            "annual_savings, priority, implementation_effort, status, metadata, created_at) "
+            "SELECT gen_random_uuid(), ca.id, 'EC2 Instance', 'aws-resource-' || n, 'DOWNSIZE', "
+            "'Downsize EC2 Instance', 'Average CPU utilization is below 20%. Downsizing can reduce costs.', "
+            "100, 50, random() * 100, 600, 'HIGH', 'EASY', "
+            "(ARRAY['PENDING', 'APPLIED', 'DISMISSED'])[1 + n % 3], '{}'::jsonb, now() "
+            "FROM cost_analyses ca JOIN cloud_accounts a ON a.id = ca.cloud_account_id "
+            "JOIN suite_users u ON u.id = a.user_id "
+            "CROSS JOIN generate_series(1, :n) AS n"
+        ), {"n": recommendations})
+        user_id = (await conn.execute(text("SELECT id FROM suite_users WHERE number = 1"))).scalar_one()
+        account_ids = (await conn.execute(text(
+            "SELECT id FROM cloud_accounts WHERE user_id = :user_id"
+        ), {"user_id": user_id})).scalars().all()
+        analysis_ids = (await conn.execute(text(
+            "SELECT ca.id FROM cost_analyses ca JOIN cloud_accounts a ON a.id = ca.cloud_account_id "
+            "WHERE a.user_id = :user_id"
+        ), {"user_id": user_id})).scalars().all()
+    # Vacuum too: the previous run's cleanup left its rows dead, and scanning
+    # them slows every run after the first (VACUUM cannot run in a transaction)
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for table in ("users", "cloud_accounts", "cost_analyses", "cost_recommendations", "jobs"):
+            await conn.execute(text(f"VACUUM ANALYZE {table}"))
+    return {"user_id": user_id, "account_ids": account_ids, "analysis_ids": analysis_ids}
+
+
+def api_requests(seeded: Dict[str, Any]) -> Dict[str, Callable[[httpx.AsyncClient, Dict[str, str]], Awaitable]]:
+    """One request factory per endpoint case."""
+    pick = random.Random(42).choice
+    account_ids = [str(account_id) for account_id in seeded["account_ids"]]
+    analysis_ids = [str(analysis_id) for analysis_id in seeded["analysis_ids"]]
+    hot_ids = analysis_ids[:HOT_ANALYSES]
+    return {
+        "api/analyze": lambda client, headers: client.post(
+            f"{API_PREFIX}/analyze", json={"cloud_account_id": pick(account_ids)}, headers=headers
+        ),
+        "api/analyses": lambda client, headers: client.get(f"{API_PREFIX}/analyses", headers=headers),
+        "api/analyses/{id}": lambda client, headers: client.get(
+            f"{API_PREFIX}/analyses/{pick(analysis_ids)}", headers=headers
+        ),
+        "api/analyses (cached)": lambda client, headers: client.get(f"{API_PREFIX}/analyses", headers=headers),
+        "api/analyses/{id} (cached)": lambda client, headers: client.get(
+            f"{API_PREFIX}/analyses/{pick(hot_ids)}", headers=headers
+        ),
+    }
+
+
+async def drive(client: httpx.AsyncClient, send: Callable, headers: Dict[str, str], requests: int,
+                concurrency: int) -> Tuple[List[float], float]:
+    latencies: List[float] = []
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await send(client, headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.request.method} {response.request.url.path}: "
+                                   f"{response.status_code} {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def bench_api(args: argparse.Namespace) -> Dict[str, Dict[str, float]]:
+    await cleanup()
+    started = time.perf_counter()
+    seeded = await seed(args.users, args.accounts, args.analyses, args.recommendations)
+    rows = args.users * args.accounts * args.analyses * args.recommendations
+    print(f"Seeded {rows:,} recommendations in {time.perf_counter() - started:.1f}s")
+
+    # Registered but not started: queued jobs are never run (and go with the seeded users)
+    get_job_queue().register(ANALYSIS_JOB, run_analysis_job)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(seeded['user_id'])})}"}
+    rate_limit_enabled = rate_limit.settings.RATE_LIMIT_ENABLED
+    rate_limit.settings.RATE_LIMIT_ENABLED = False
+    cache_enabled = analysis_cache.enabled
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            for name, send in api_requests(seeded).items():
+                analysis_cache.enabled = name in CACHED_CASES
+                await drive(client, send, headers, args.concurrency * 2, args.concurrency)  # warm-up
+                latencies, elapsed = await drive(client, send, headers, args.requests, args.concurrency)
+                peak_mb = await _peak_mb_async(
+                    lambda: drive(client, send, headers, args.concurrency * 4, args.concurrency)
+                )
+                results[name] = {
+                    "throughput": len(latencies) / elapsed,
+                    "p50_ms": statistics.median(latencies) * 1000,
+                    "p99_ms": _percentile(latencies, 0.99) * 1000,
+                    "peak_mb": peak_mb,
+                }
+    finally:
+        rate_limit.settings.RATE_LIMIT_ENABLED = rate_limit_enabled
+        analysis_cache.enabled = cache_enabled
+        await cleanup()
+    return results
+
+
+# --- baseline ---------------------------------------------------------------
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Any], tolerance: float,
+            memory_tolerance: float) -> List[str]:
+    """Print results next to the baseline and return the regressions."""
+    cases = baseline.get("cases", {})
+    regressions = []
+    print(f"\n{'case':<30}{'metric':<12}{'value':>14}{'baseline':>14}{'change':>9}")
+    for case, metrics in results.items():
+        for metric, direction in METRICS:
+            value = metrics[metric]
+            reference = cases.get(case, {}).get(metric)
+            if not reference:
+                print(f"{case:<30}{metric:<12}{value:>14,.2f}{'-':>14}{'new':>9}")
+                continue
+            change = (value - reference) / reference
+            limit = memory_tolerance if metric == "peak_mb" else tolerance
+            # Memory under 1 MB is noise from allocator and cache state
+            regressed = -direction * change > limit and not (metric == "peak_mb" and value < 1)
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{case:<30}{metric:<12}{value:>14,.2f}{reference:>14,.2f}{change:>+9.1%}{flag}")
+            if regressed:
+                regressions.append(f"{case} {metric}: {value:,.2f} vs {reference:,.2f} ({change:+.1%})")
+    return regressions
+
+
+def _params(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "runs": args.runs,
+        "users": args.users,
+        "accounts": args.accounts,
+        "analyses": args.analyses,
+        "recommendations": args.recommendations,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+    }
+
+
+async def main(args: argparse.Namespace) -> int:
+    results: Dict[str, Dict[str, float]] = {}
+    if not args.skip_engine:
+        for size in args.sizes:
+            for mode in args.modes:
+                case = f"engine/{mode}/{_size_label(size)}"
+                results[case] = bench_engine(size, mode == "columnar", args.runs)
+                print(f"{case}: {results[case]['p50_ms']:,.1f}ms p50")
+    if not args.skip_api:
+        results.update(await bench_api(args))
+    await engine.dispose()
+
+    if args.update_baseline:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update({
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "machine": f"{platform.system()} {platform.machine()}",
+            "params": _params(args),
+        })
+        baseline.setdefault("cases", {}).update(
+            {case: {metric: round(value, 3) for metric, value in metrics.items()} for case, metrics in results.items()}
+        )
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if not baseline:
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to record one")
+    elif baseline.get("params") != _params(args):
+        print(f"\nWarning: baseline was recorded with {baseline.get('params')}, not {_params(args)}")
+    regressions = compare(results, baseline, args.tolerance, args.memory_tolerance)
+    if regressions:
+        print(f"\nFAILED: {len(regressions)} regression(s) against {args.baseline}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")],
+                        default=[1_000, 100_000, 1_000_000], help="engine inventory sizes, comma separated")
+    parser.add_argument("--modes", type=lambda value: value.split(","), default=["columnar", "row"],
+                        help="engine modes, comma separated")
+    parser.add_argument("--runs", type=int, default=5, help="minimum timed runs per engine case")
+    parser.add_argument("--users", type=int, default=50, help="seeded users")
+    parser.add_argument("--accounts", type=int, default=5, help="cloud accounts per seeded user")
+    parser.add_argument("--analyses", type=int, default=200, help="analyses per account")
+    parser.add_argument("--recommendations", type=int, default=10, help="recommendations per analysis")
+    parser.add_argument("--requests", type=int, default=500, help="timed requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent API clients")
+    parser.add_argument("--skip-engine", action="store_true", help="skip the engine cases")
+    parser.add_argument("--skip-api", action="store_true", help="skip the API cases (no database needed)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed throughput/latency regression (fraction)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10,
+                        help="allowed peak memory regression (fraction)")
+    parser.add_argument("--update-baseline", action="store_true", help="record the results as the baseline")
+    sys.exit(asyncio.run(main(parser.parse_args())))
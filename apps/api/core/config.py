@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -9,7 +10,107 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_TTL_DAYS: int = 7
     CORS_ORIGIN: str = "http://localhost:5173"
     LOG_LEVEL: str = "info"
-    RATE_LIMIT_REDIS_URL: str = "redis://redis:6379/0"
+    RATE_LIMIT_REDIS_URL: str = "redis://redis:6379/0"  # empty: limit per process
+
+    # Rate limiting (limits per plan are in core/rate_limit.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REDIS_RETRY_SEC: float = 30  # limit per process this long after a Redis error
+    RATE_LIMIT_PLAN_CACHE_TTL_SEC: int = 300
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # key anonymous callers by X-Forwarded-For
+
+    # Database connection pool
+    DATABASE_READ_URL: Optional[str] = None  # read replica for list endpoints
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SEC: float = 30.0
+    DB_POOL_RECYCLE_SEC: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500
+
+    # Password hashing
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt cost factor
+    PASSWORD_HASH_WORKERS: int = 4
+
+    # Authenticated user cache. The TTL is how long other API processes keep
+    # honoring a user's old role after it changes (invalidation is per process);
+    # capped at 60s and at the access token lifetime.
+    USER_CACHE_TTL_SEC: int = 30
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Background jobs
+    JOB_BACKEND: str = "database"  # database, memory (single uvicorn worker only)
+    JOB_WORKERS: int = 4
+    JOB_POLL_INTERVAL_SEC: float = 1.0
+    JOB_HEARTBEAT_SEC: float = 30.0
+    JOB_STALE_AFTER_SEC: float = 300.0  # RUNNING jobs without a heartbeat this long lost their worker
+    JOB_MAX_ATTEMPTS: int = 3  # claims before a job that keeps losing its worker fails
+
+    # Cloud provider backend ("fake" simulates every provider, see providers/fake.py)
+    CLOUD_PROVIDER_BACKEND: str = "live"  # live, fake
+    FAKE_PROVIDER_RESOURCES: int = 1000  # per account, unless its credentials set resource_count
+    FAKE_PROVIDER_LATENCY_MS: float = 120  # median per request; lognormal tail
+    FAKE_PROVIDER_THROTTLE_RATE: float = 0.02  # fraction of requests throttled
+    FAKE_PROVIDER_MAX_ATTEMPTS: int = 3  # per request, as with the SDK retry modes
+
+    # Cloud resource discovery
+    AWS_DISCOVERY_MAX_WORKERS: int = 16
+    AWS_DISCOVERY_SERVICE_TIMEOUT_SEC: float = 60.0
+
+    # Resource inventory sync
+    INVENTORY_SYNC_MODE: str = "incremental"  # incremental, full
+    INVENTORY_FULL_RESYNC_HOURS: int = 24
+    INVENTORY_CHANGE_LOOKBACK_SEC: int = 900  # overlap for change feed delivery delay
+    INVENTORY_MAX_CHANGES: int = 5000  # above this a full sync is cheaper
+
+    # Billing API response cache (closed periods never expire)
+    BILLING_CACHE_OPEN_TTL_SEC: int = 3600
+    BILLING_CACHE_MAX_SIZE: int = 5000
+    BILLING_CACHE_SETTLE_DAYS: int = 3  # days after month end before a month is final
+
+    # Provider SDK sessions, clients and credentials, pooled per account
+    PROVIDER_CLIENT_POOL_MAX_ACCOUNTS: int = 1000
+    PROVIDER_CLIENT_POOL_TTL_SEC: int = 3600
+
+    # Daily cost facts
+    COST_FACTS_BACKFILL_DAYS: int = 90
+    COST_FACTS_SETTLE_DAYS: int = 2  # providers revise recent days; must be >= 1
+    COST_FACTS_MAX_RANGE_DAYS: int = 90  # days per billing API request
+    COST_FACTS_MERGE_GAP_DAYS: int = 7  # re-fetch up to this many known days to save a request
+
+    # Scheduled analyses (caps count in-flight scheduled jobs, fleet-wide)
+    ANALYSIS_SCHEDULE_ENABLED: bool = True
+    ANALYSIS_SCHEDULE_INTERVAL_HOURS: float = 24
+    ANALYSIS_SCHEDULE_JITTER_SEC: int = 3600
+    ANALYSIS_SCHEDULE_TICK_SEC: float = 30
+    ANALYSIS_SCHEDULE_MAX_CONCURRENT: int = 8
+    ANALYSIS_SCHEDULE_PROVIDER_CONCURRENCY: Dict[str, int] = {"AWS": 4, "GCP": 2, "AZURE": 2}  # JSON in env
+
+    # Request profiling (admins send X-Profile: 1 or ?profile=1)
+    PROFILING_ENABLED: bool = True
+    PROFILING_SAMPLE_RATE: float = 0.0  # fraction of all requests profiled
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_MAX_CONCURRENT: int = 2  # further requests run unprofiled
+    PROFILING_MAX_STORED: int = 500
+    PROFILING_MAX_SQL_STATEMENTS: int = 1000
+
+    # Response compression (see core/responses.py; br and zstd need brotli and zstandard)
+    RESPONSE_COMPRESSION_ENCODINGS: str = "zstd,br,gzip"  # server preference order
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1024
+    RESPONSE_COMPRESSION_THREAD_MIN_BYTES: int = 262144  # compress larger bodies off the event loop
+    RESPONSE_GZIP_LEVEL: int = 6
+    RESPONSE_BROTLI_QUALITY: int = 4
+    RESPONSE_ZSTD_LEVEL: int = 3
+
+    # Analysis response cache (see services/cost_optimizer/analysis_cache.py)
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_REDIS_URL: str = "redis://redis:6379/0"  # empty: per process, and off unless JOB_BACKEND=memory
+    ANALYSIS_CACHE_REDIS_RETRY_SEC: float = 30  # bypass the cache this long after a Redis error
+    ANALYSIS_CACHE_TTL_SEC: int = 300
+    ANALYSIS_CACHE_MAX_MB: float = 256  # per process
+    ANALYSIS_CACHE_LOCK_SEC: float = 5  # other processes wait this long for a load in progress
+
+    # Recommendation engine
+    ENGINE_MODE: str = "columnar"  # row, columnar
 
     class Config:
         env_file = ".env"
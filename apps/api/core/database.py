@@ -1,15 +1,77 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .config import get_settings
+from .metrics import instrument_engine
 
 settings = get_settings()
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.LOG_LEVEL == "debug",
-    future=True,
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Carry the counters across pool recreation (e.g. after a disconnect)
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_total, pool.wait_max = self.wait_total, self.wait_max
+        return pool
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        echo=settings.LOG_LEVEL == "debug",
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SEC,
+        pool_recycle=settings.DB_POOL_RECYCLE_SEC,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        # Per-connection prepared statement cache (asyncpg dialect). Set to 0
+        # behind PgBouncer in transaction pooling mode.
+        connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    )
+
+
+engine = _create_engine(settings.DATABASE_URL)
+
+# Read-only traffic (list endpoints) goes to the replica when one is
+# configured; replicas may lag the primary by a few seconds.
+read_engine = (
+    _create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 )
 
+instrument_engine(engine, "primary")
+if read_engine is not engine:
+    instrument_engine(read_engine, "replica")
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -18,6 +80,14 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
 Base = declarative_base()
 
 
@@ -27,3 +97,62 @@ async def get_db() -> AsyncSession:
             yield session
         finally:
             await session.close()
+
+
+async def get_read_db() -> AsyncSession:
+    """Session bound to the read replica (or the primary if none is configured)."""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+@asynccontextmanager
+async def try_advisory_lock(namespace: int, key: str) -> AsyncIterator[bool]:
+    """
+    Try to take the session-level advisory lock ``(namespace, hashtext(key))``.
+
+    Yields whether it was acquired; the lock is held on a dedicated
+    connection (outside any transaction) until the block exits, and is
+    released by Postgres if this process dies.
+    """
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        acquired = await conn.scalar(
+            text("SELECT pg_try_advisory_lock(:namespace, hashtext(:key))"),
+            {"namespace": namespace, "key": key},
+        )
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                await conn.execute(
+                    text("SELECT pg_advisory_unlock(:namespace, hashtext(:key))"),
+                    {"namespace": namespace, "key": key},
+                )
+
+
+def _pool_stats(async_engine: AsyncEngine) -> Dict[str, Any]:
+    pool = async_engine.sync_engine.pool
+    checkouts = getattr(pool, "checkouts", 0)
+    wait_total = getattr(pool, "wait_total", 0.0)
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": checkouts,
+        "timeouts": getattr(pool, "timeouts", 0),
+        "wait_avg_ms": round(wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_max_ms": round(getattr(pool, "wait_max", 0.0) * 1000, 3),
+    }
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Connection pool saturation for the primary and replica engines."""
+    stats = {"primary": _pool_stats(engine)}
+    if read_engine is not engine:
+        stats["replica"] = _pool_stats(read_engine)
+    return stats
@@ -5,12 +5,37 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import uuid
 
+from .cache import TTLCache
+from .config import get_settings
 from .database import get_db
 from .security import decode_token
 from apps.api.models.user import User
 
 security = HTTPBearer()
 
+settings = get_settings()
+
+# Role checks never trust a cached principal older than this, whatever
+# USER_CACHE_TTL_SEC says.
+MAX_USER_CACHE_TTL_SEC = 60
+
+# Authenticated principals keyed by user id, so polling clients don't hit the
+# users table on every request. Role changes invalidate the entry in the
+# process that made them (see invalidate_cached_user); other API processes
+# keep serving the old role until their entry expires, so the TTL is the
+# window in which a demoted or deleted user keeps their access.
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=min(settings.USER_CACHE_TTL_SEC, MAX_USER_CACHE_TTL_SEC, settings.ACCESS_TOKEN_TTL_MIN * 60),
+)
+
+_PRINCIPAL_FIELDS = ("id", "email", "name", "role", "created_at")
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Drop a user's cached principal after their account changes (in this process only)."""
+    user_cache.invalidate(user_id)
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -43,6 +68,11 @@ async def get_current_user(
             detail="Invalid user ID format",
         )
 
+    principal = user_cache.get(user_uuid)
+    if principal is not None:
+        # A fresh transient instance per request; the cached snapshot is never shared.
+        return User(**principal)
+
     result = await db.execute(select(User).where(User.id == user_uuid))
     user = result.scalar_one_or_none()
 
@@ -52,6 +82,7 @@ async def get_current_user(
             detail="User not found",
         )
 
+    user_cache.set(user_uuid, {field: getattr(user, field) for field in _PRINCIPAL_FIELDS})
     return user
 
 
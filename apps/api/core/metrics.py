@@ -0,0 +1,225 @@
+"""
+Prometheus instrumentation.
+
+Metrics are recorded in-process with prometheus_client and served in the
+text exposition format by ``GET /api/metrics``:
+
+- HTTP: request latency per route template, method and status, and requests
+  in flight (RequestMetricsMiddleware)
+- database: query latency per statement kind and errors, for the primary and
+  the read replica (instrument_engine)
+- cloud providers: SDK request latency and errors per provider and service,
+  one observation per listing page or billing request (observe_pages,
+  observe_provider_request)
+- engine: analysis duration and inventory size per provider and mode
+- the caches, pools, scheduler and rate limiter, read from their ``stats()``
+  when scraped (StatsCollector)
+
+Recording is a dict lookup and a few additions per observation, so it stays
+on in production; label values are bounded (route templates, not paths).
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Sequence, TypeVar
+
+from prometheus_client import Counter, Gauge, Histogram, disable_created_metrics
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Only counters' and histograms' values are scraped; skip the *_created series
+disable_created_metrics()
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests being served",
+    ["method"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time",
+    ["database", "operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database statements that raised",
+    ["database", "operation"],
+)
+
+PROVIDER_REQUEST_DURATION = Histogram(
+    "provider_request_duration_seconds",
+    "Cloud provider API time per service (listing page or billing request)",
+    ["provider", "service"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+PROVIDER_REQUEST_ERRORS = Counter(
+    "provider_request_errors_total",
+    "Cloud provider API calls that failed or timed out",
+    ["provider", "service"],
+)
+
+ENGINE_ANALYSIS_DURATION = Histogram(
+    "engine_analysis_duration_seconds",
+    "Recommendation engine compute time per analysis",
+    ["provider", "mode"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+ENGINE_RESOURCES = Histogram(
+    "engine_analysis_resources",
+    "Resources analyzed per analysis",
+    ["provider", "mode"],
+    buckets=(10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+
+_OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "COPY", "WITH", "BEGIN", "COMMIT", "ROLLBACK"))
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording request latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope; unmatched
+            # paths share one label so scanners can't blow up cardinality.
+            route = scope.get("route")
+            HTTP_REQUEST_DURATION.labels(
+                method, getattr(route, "path", "unmatched"), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in _OPERATIONS else "OTHER"
+
+
+def instrument_engine(async_engine: AsyncEngine, database: str) -> None:
+    """Time every statement executed through ``async_engine``."""
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        DB_QUERY_DURATION.labels(database, _operation(statement)).observe(time.perf_counter() - start)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(context):
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.labels(database, _operation(context.statement or "")).inc()
+
+
+@contextmanager
+def observe_provider_request(provider: str, service: str) -> Iterator[None]:
+    """Time a provider API call; exceptions count as errors and propagate."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        PROVIDER_REQUEST_ERRORS.labels(provider, service).inc()
+        raise
+    finally:
+        PROVIDER_REQUEST_DURATION.labels(provider, service).observe(time.perf_counter() - start)
+
+
+T = TypeVar("T")
+
+
+def observe_pages(provider: str, service: str, pages: Iterable[T]) -> Iterator[T]:
+    """
+    Iterate a lazy SDK pager, timing each page fetch as one provider request.
+
+    Only ``next()`` on the pager is timed: whatever the caller does with a
+    page before asking for the next one (storing it, analyzing it, waiting
+    on a full queue) is not provider latency.
+    """
+    iterator = iter(pages)
+    duration = PROVIDER_REQUEST_DURATION.labels(provider, service)
+    while True:
+        start = time.perf_counter()
+        try:
+            page = next(iterator)
+        except StopIteration:
+            return  # the pager ran out; not a request
+        except Exception:
+            PROVIDER_REQUEST_ERRORS.labels(provider, service).inc()
+            duration.observe(time.perf_counter() - start)
+            raise
+        duration.observe(time.perf_counter() - start)
+        yield page
+
+
+class StatsCollector:
+    """
+    Exports a component's ``stats()`` dict as gauges, read at scrape time.
+
+    Numbers (and booleans, as 0/1) become ``<prefix>_<path>`` gauges; nested
+    dicts extend the path, except for the keys in ``labels``, whose
+    ``{name: number}`` dicts become one gauge with ``name`` as the label
+    value. Strings, None and the keys in ``exclude`` are skipped.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        stats: Callable[[], Dict[str, Any]],
+        labels: Optional[Mapping[str, str]] = None,
+        exclude: Sequence[str] = (),
+    ):
+        self.prefix = prefix
+        self.stats = stats
+        self.labels = labels or {}
+        self.exclude = set(exclude)
+
+    def collect(self):
+        yield from self._families(self.prefix, self.stats())
+
+    def _families(self, name: str, stats: Dict[str, Any]):
+        for key, value in stats.items():
+            if key in self.exclude:
+                continue
+            metric = f"{name}_{key}"
+            if isinstance(value, (bool, int, float)):
+                family = GaugeMetricFamily(metric, f"{self.prefix} {key}")
+                family.add_metric([], float(value))
+                yield family
+            elif isinstance(value, dict) and key in self.labels:
+                family = GaugeMetricFamily(metric, f"{self.prefix} {key}", labels=[self.labels[key]])
+                for label, number in value.items():
+                    family.add_metric([str(label)], float(number))
+                yield family
+            elif isinstance(value, dict):
+                yield from self._families(metric, value)
@@ -0,0 +1,260 @@
+"""
+On-demand request profiling.
+
+A request is profiled when an ADMIN asks for it (``X-Profile: 1`` header or
+``?profile=1``) or when it is picked by PROFILING_SAMPLE_RATE. While it runs:
+
+- a sampler thread records the event loop thread's call stack every
+  PROFILING_INTERVAL_MS, giving folded stacks (``a;b;c <count>``, the input
+  of flamegraph.pl and speedscope) and per-function sample counts. Samples
+  show the whole loop, so requests served concurrently appear too; time
+  spent waiting on I/O shows up under the selector.
+- every SQL statement the request executes is recorded with its duration
+  (statement text only, never parameters).
+
+Profiles are stored in ``request_profiles`` (newest PROFILING_MAX_STORED
+kept) and the response carries ``X-Profile-Id`` to fetch it from the admin
+endpoints in routers/profiles.py.
+"""
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from loguru import logger
+from sqlalchemy import delete, event, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from .config import get_settings
+from .database import AsyncSessionLocal, engine, read_engine
+from .deps import get_current_user, require_role
+from apps.api.models.profile import RequestProfile
+
+settings = get_settings()
+
+_FLAG_VALUES = ("1", "true", "yes")
+
+TOP_FUNCTIONS = 50
+SQL_STATEMENT_MAX_CHARS = 4000
+
+
+class StackSampler:
+    """Samples one thread's Python call stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{getattr(code, 'co_qualname', code.co_name)}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict[str, Any]]:
+        """Functions with the most samples on top of the stack (self) and anywhere in it (total)."""
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for function in set(frames):
+                total[function] += count
+        interval_ms = self.interval * 1000
+        return [
+            {
+                "function": function,
+                "self_samples": own[function],
+                "total_samples": total[function],
+                "self_ms": round(own[function] * interval_ms, 1),
+                "total_ms": round(total[function] * interval_ms, 1),
+            }
+            for function, _ in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:limit]
+        ]
+
+
+class _ActiveProfile:
+    def __init__(self):
+        self.statements: List[Dict[str, Any]] = []
+        self.sql_time = 0.0
+        self.closed = False  # tasks spawned by the request may outlive it
+
+
+_active_profile: ContextVar[Optional[_ActiveProfile]] = ContextVar("active_profile", default=None)
+
+
+def _capture_sql(async_engine: AsyncEngine) -> None:
+    sync_engine = async_engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _active_profile.get() is not None:
+            conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop(conn, cursor, statement, parameters, context, executemany):
+        profile = _active_profile.get()
+        starts = conn.info.get("profile_query_start")
+        if profile is None or not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        if profile.closed:
+            return
+        profile.sql_time += elapsed
+        if len(profile.statements) < settings.PROFILING_MAX_SQL_STATEMENTS:
+            profile.statements.append({
+                "statement": statement[:SQL_STATEMENT_MAX_CHARS],
+                "duration_ms": round(elapsed * 1000, 3),
+                "executemany": executemany,
+            })
+
+
+_capture_sql(engine)
+if read_engine is not engine:
+    _capture_sql(read_engine)
+
+
+async def _requesting_admin(headers: Dict[bytes, bytes]) -> Optional[uuid.UUID]:
+    """The caller's id if they are an ADMIN, else None."""
+    scheme, _, token = headers.get(b"authorization", b"").decode("latin-1").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        async with AsyncSessionLocal() as db:
+            user = await get_current_user(HTTPAuthorizationCredentials(scheme=scheme, credentials=token), db)
+        await require_role(["ADMIN"])(user)
+    except HTTPException:
+        return None
+    return user.id
+
+
+def _profile_requested(scope, headers: Dict[bytes, bytes]) -> bool:
+    if headers.get(b"x-profile", b"").decode("latin-1").lower() in _FLAG_VALUES:
+        return True
+    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+    return any(value.lower() in _FLAG_VALUES for value in query.get("profile", []))
+
+
+async def _store(profile: RequestProfile) -> None:
+    async with AsyncSessionLocal() as db:
+        db.add(profile)
+        await db.flush()
+        # Retention: keep the newest PROFILING_MAX_STORED profiles
+        stale = (
+            select(RequestProfile.id)
+            .order_by(RequestProfile.created_at.desc())
+            .offset(settings.PROFILING_MAX_STORED)
+        )
+        await db.execute(delete(RequestProfile).where(RequestProfile.id.in_(stale)))
+        await db.commit()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling admin-requested and sampled requests."""
+
+    def __init__(self, app):
+        self.app = app
+        self._running = threading.BoundedSemaphore(max(1, settings.PROFILING_MAX_CONCURRENT))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        trigger = None
+        user_id = None
+        if _profile_requested(scope, headers):
+            user_id = await _requesting_admin(headers)
+            if user_id is not None:
+                trigger = "requested"
+        if trigger is None and settings.PROFILING_SAMPLE_RATE and random.random() < settings.PROFILING_SAMPLE_RATE:
+            trigger = "sampled"
+        if trigger is None or not self._running.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self._profile(scope, receive, send, trigger, user_id)
+        finally:
+            self._running.release()
+
+    async def _profile(self, scope, receive, send, trigger: str, user_id: Optional[uuid.UUID]):
+        profile_id = uuid.uuid4()
+        status_code = 500
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", str(profile_id).encode())
+                ]
+            await send(message)
+
+        active = _ActiveProfile()
+        token = _active_profile.set(active)
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration = time.perf_counter() - started
+            sampler.stop()
+            active.closed = True
+            _active_profile.reset(token)
+
+            route = scope.get("route")
+            profile = RequestProfile(
+                id=profile_id,
+                method=scope["method"],
+                path=scope["path"][:2048],
+                route=getattr(route, "path", None),
+                status_code=status_code,
+                trigger=trigger,
+                user_id=user_id,
+                duration_ms=duration * 1000,
+                sample_interval_ms=settings.PROFILING_INTERVAL_MS,
+                sample_count=sampler.samples,
+                folded_stacks=sampler.folded(),
+                top_functions=sampler.top_functions(),
+                sql_statements=active.statements,
+                sql_time_ms=active.sql_time * 1000,
+            )
+            try:
+                await _store(profile)
+            except Exception as e:
+                logger.warning(f"Failed to store profile {profile_id} of {scope['method']} {scope['path']}: {e}")
+            else:
+                logger.info(
+                    f"Profiled {scope['method']} {scope['path']} ({trigger}): {duration * 1000:.0f}ms, "
+                    f"{sampler.samples} samples, {len(active.statements)} SQL statements; profile {profile_id}"
+                )
@@ -0,0 +1,344 @@
+"""
+Token-bucket rate limiting.
+
+Every API request takes a token from the caller's ``default`` bucket; a few
+expensive or abuse-prone routes (ROUTE_BUCKETS) also take one from their own
+bucket, and a request is only let through if all of its buckets have a
+token. Authenticated callers are keyed by user id and get the limits of
+their subscription plan (PLAN_LIMITS); anonymous callers are keyed by client
+address and get the FREE limits.
+
+Buckets live in Redis (RATE_LIMIT_REDIS_URL) so limits hold across
+replicas: one Lua script refills and takes from all of a request's buckets
+atomically, using the Redis clock. Without Redis, or while it is
+unreachable, an in-process limiter with the same semantics is used instead,
+so limits still apply per replica and the API keeps serving.
+"""
+import ipaddress
+import json
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from loguru import logger
+from sqlalchemy import select
+
+from .cache import TTLCache
+from .config import get_settings
+from .database import ReadSessionLocal
+from .security import decode_token
+from apps.api.models.billing import Subscription
+
+
+@dataclass(frozen=True)
+class Limit:
+    capacity: int  # burst size
+    refill_per_sec: float
+
+    @classmethod
+    def per_minute(cls, requests: int) -> "Limit":
+        return cls(requests, requests / 60)
+
+    @classmethod
+    def per_hour(cls, requests: int, burst: int) -> "Limit":
+        return cls(burst, requests / 3600)
+
+
+PLAN_LIMITS: Dict[str, Dict[str, Limit]] = {
+    "FREE": {
+        "default": Limit.per_minute(120),
+        "analyze": Limit.per_hour(10, burst=3),
+        "auth": Limit.per_minute(10),
+    },
+    "PREMIUM": {
+        "default": Limit.per_minute(600),
+        "analyze": Limit.per_hour(60, burst=10),
+        "auth": Limit.per_minute(10),
+    },
+    "ENTERPRISE": {
+        "default": Limit.per_minute(2400),
+        "analyze": Limit.per_hour(300, burst=30),
+        "auth": Limit.per_minute(10),
+    },
+}
+
+DEFAULT_PLAN = "FREE"
+
+# (method, path prefix, bucket); the first match applies
+ROUTE_BUCKETS: Tuple[Tuple[str, str, str], ...] = (
+    ("POST", "/api/cost-optimizer/analyze", "analyze"),
+    ("POST", "/api/auth/", "auth"),
+)
+
+# Not rate limited: health checks and scrapes
+EXEMPT_PATHS = ("/api/health", "/api/metrics")
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    retry_after: float  # seconds until every bucket has a token again
+    remaining: int  # tokens left in the default bucket
+
+
+def _take(buckets: Sequence[Tuple[List[float], Limit]], now: float) -> Decision:
+    """Refill ``[tokens, updated_at]`` states and take a token from each if all have one."""
+    retry_after = 0.0
+    for state, limit in buckets:
+        state[0] = min(limit.capacity, state[0] + (now - state[1]) * limit.refill_per_sec)
+        state[1] = now
+        if state[0] < 1:
+            retry_after = max(retry_after, (1 - state[0]) / limit.refill_per_sec)
+    allowed = retry_after == 0
+    if allowed:
+        for state, _ in buckets:
+            state[0] -= 1
+    return Decision(allowed, retry_after, int(buckets[0][0][0]))
+
+
+class LocalRateLimiter:
+    """In-process token buckets; limits apply per replica."""
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        # A bucket idle long enough to refill completely is the same as a new one,
+        # so entries only need to outlive the slowest refill.
+        slowest_refill = max(
+            limit.capacity / limit.refill_per_sec
+            for limits in PLAN_LIMITS.values() for limit in limits.values()
+        )
+        self._buckets = TTLCache(max_keys, slowest_refill)
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    async def acquire(self, keys: Sequence[str], limits: Sequence[Limit]) -> Decision:
+        with self._lock:
+            now = self._clock()
+            buckets = []
+            for key, limit in zip(keys, limits):
+                state = self._buckets.get(key) or [float(limit.capacity), now]
+                self._buckets.set(key, state)  # refresh the entry's expiry
+                buckets.append((state, limit))
+            return _take(buckets, now)
+
+
+# KEYS: bucket keys. ARGV: capacity and refill per millisecond for each key.
+# Returns {allowed, retry_after_ms, remaining in the first bucket}.
+_TOKEN_BUCKET_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tokens = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    level = math.min(capacity, level + math.max(0, now - ts) * rate)
+    if level < 1 then
+        retry_after = math.max(retry_after, math.ceil((1 - level) / rate))
+    end
+    tokens[i] = level
+end
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    if retry_after == 0 then
+        tokens[i] = tokens[i] - 1
+    end
+    redis.call('HSET', key, 'tokens', tostring(tokens[i]), 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate))
+end
+return {retry_after == 0 and 1 or 0, retry_after, math.floor(tokens[1])}
+"""
+
+
+class RedisRateLimiter:
+    """Token buckets shared by all replicas through Redis."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, loaded when configured
+
+        self._client = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._script = self._client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def acquire(self, keys: Sequence[str], limits: Sequence[Limit]) -> Decision:
+        args: List[Any] = []
+        for limit in limits:
+            args.extend((limit.capacity, limit.refill_per_sec / 1000))
+        allowed, retry_after_ms, remaining = await self._script(keys=list(keys), args=args)
+        return Decision(bool(allowed), retry_after_ms / 1000, int(remaining))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class RateLimiter:
+    """Redis limiter with the in-process limiter as fallback, plus counters for /metrics."""
+
+    def __init__(self, redis_url: str, retry_sec: float):
+        self.local = LocalRateLimiter()
+        self.redis: Optional[RedisRateLimiter] = None
+        self._retry_sec = retry_sec
+        self._redis_down_until = 0.0
+        if redis_url:
+            try:
+                self.redis = RedisRateLimiter(redis_url)
+            except ImportError:
+                logger.warning("RATE_LIMIT_REDIS_URL is set but redis is not installed; limiting per process")
+        self.allowed: Dict[str, int] = {}
+        self.limited: Dict[str, int] = {}
+        self.redis_errors = 0
+
+    @property
+    def backend(self) -> str:
+        if self.redis is None or time.monotonic() < self._redis_down_until:
+            return "local"
+        return "redis"
+
+    async def acquire(self, keys: Sequence[str], limits: Sequence[Limit]) -> Decision:
+        if self.backend == "redis":
+            try:
+                return await self.redis.acquire(keys, limits)
+            except Exception as e:
+                self.redis_errors += 1
+                self._redis_down_until = time.monotonic() + self._retry_sec
+                logger.warning(f"Rate limit store unavailable, limiting per process for {self._retry_sec:.0f}s: {e}")
+        return await self.local.acquire(keys, limits)
+
+    def count(self, bucket: str, allowed: bool) -> None:
+        counts = self.allowed if allowed else self.limited
+        counts[bucket] = counts.get(bucket, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "allowed": dict(self.allowed),
+            "limited": dict(self.limited),
+            "redis_errors": self.redis_errors,
+            "plans": plan_cache.stats(),
+        }
+
+    async def close(self) -> None:
+        if self.redis is not None:
+            await self.redis.close()
+
+
+settings = get_settings()
+
+rate_limiter = RateLimiter(settings.RATE_LIMIT_REDIS_URL, settings.RATE_LIMIT_REDIS_RETRY_SEC)
+
+# Subscription plan per user id; plan changes invalidate it (see invalidate_cached_plan)
+plan_cache = TTLCache(max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.RATE_LIMIT_PLAN_CACHE_TTL_SEC)
+
+
+def invalidate_cached_plan(user_id: uuid.UUID) -> None:
+    """Drop a user's cached plan after their subscription changes."""
+    plan_cache.invalidate(user_id)
+
+
+async def get_plan(user_id: uuid.UUID) -> str:
+    plan = plan_cache.get(user_id)
+    if plan is not None:
+        return plan
+
+    async with ReadSessionLocal() as db:
+        row = (await db.execute(
+            select(Subscription.plan, Subscription.status).where(Subscription.user_id == user_id)
+        )).first()
+    plan = row.plan if row is not None and row.status == "ACTIVE" and row.plan in PLAN_LIMITS else DEFAULT_PLAN
+    plan_cache.set(user_id, plan)
+    return plan
+
+
+def _bearer_user_id(headers: Dict[bytes, bytes]) -> Optional[uuid.UUID]:
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access":
+        return None
+    try:
+        return uuid.UUID(payload.get("sub", ""))
+    except ValueError:
+        return None
+
+
+def _client_address(scope, headers: Dict[bytes, bytes]) -> str:
+    forwarded = headers.get(b"x-forwarded-for")
+    if forwarded and settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        candidate = forwarded.decode("latin-1").split(",")[0].strip()
+        try:
+            return str(ipaddress.ip_address(candidate))
+        except ValueError:
+            pass
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """ASGI middleware applying the token buckets and setting X-RateLimit-* headers."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not settings.RATE_LIMIT_ENABLED
+            or scope["method"] == "OPTIONS"
+            or not path.startswith("/api/")
+            or path.startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        user_id = _bearer_user_id(headers)
+        if user_id is not None:
+            identity = f"u:{user_id}"
+            plan = await get_plan(user_id)
+        else:
+            identity = f"ip:{_client_address(scope, headers)}"
+            plan = DEFAULT_PLAN
+
+        buckets = ["default"]
+        for method, prefix, bucket in ROUTE_BUCKETS:
+            if scope["method"] == method and path.startswith(prefix):
+                buckets.append(bucket)
+                break
+        limits = [PLAN_LIMITS[plan][bucket] for bucket in buckets]
+        decision = await rate_limiter.acquire([f"rl:{bucket}:{identity}" for bucket in buckets], limits)
+        rate_limiter.count(buckets[-1], decision.allowed)
+
+        limit_headers = [
+            (b"x-ratelimit-limit", str(limits[0].capacity).encode()),
+            (b"x-ratelimit-remaining", str(max(0, decision.remaining)).encode()),
+        ]
+        if not decision.allowed:
+            retry_after = str(max(1, math.ceil(decision.retry_after))).encode()
+            body = json.dumps({"detail": "Rate limit exceeded"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", retry_after),
+                    *limit_headers,
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + limit_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,225 @@
+"""
+JSON responses serialized with orjson and compressed per Accept-Encoding.
+
+Endpoints with large payloads build plain dicts straight from ORM rows and
+return ``await json_response(request, content)`` instead of a model: FastAPI
+does not validate a returned Response, so the payload skips the
+``response_model`` pass (kept on the route for the OpenAPI schema) and the
+stdlib encoder. orjson writes UUIDs and datetimes itself; with OPT_UTC_Z the
+bytes match what the Pydantic schemas would have produced.
+
+Bodies of at least RESPONSE_COMPRESSION_MIN_BYTES are compressed with the
+first of RESPONSE_COMPRESSION_ENCODINGS the client accepts (q-values are
+honoured, ``q=0`` refuses). brotli and zstd need the brotli and zstandard
+packages; an encoding whose package is missing is skipped. Compressing
+large bodies runs in a worker thread so it does not stall the event loop.
+
+Conditional GETs: an endpoint that can name its payload's version cheaply
+passes it as ``etag`` and checks ``etag_matches`` before loading the rest,
+answering ``not_modified`` instead. The ETag sent is strong and names the
+representation, so it gets the content coding appended (``"v-gzip"``);
+If-None-Match accepts the tag of any coding of the same payload.
+"""
+import asyncio
+import gzip
+import uuid
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import orjson
+from fastapi import Request, Response
+from loguru import logger
+
+from apps.api.core.config import get_settings
+
+JSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    # orjson only serializes uuid.UUID itself; asyncpg returns its own subclass
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dump_json(content: Any) -> bytes:
+    """Serialize ``content`` the way the Pydantic response models would."""
+    return orjson.dumps(content, default=_default, option=JSON_OPTIONS)
+
+
+def _gzip(level: int) -> Callable[[bytes], bytes]:
+    return lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _brotli(quality: int) -> Callable[[bytes], bytes]:
+    import brotli
+
+    return lambda body: brotli.compress(body, quality=quality)
+
+
+def _zstd(level: int) -> Callable[[bytes], bytes]:
+    import zstandard
+
+    # ZstdCompressor is not thread safe; compressing is cheap to set up, so use one per call
+    return lambda body: zstandard.ZstdCompressor(level=level).compress(body)
+
+
+ENCODINGS = ("zstd", "br", "gzip")
+
+
+@lru_cache()
+def compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    """Configured encodings, in preference order, whose packages are installed."""
+    settings = get_settings()
+    factories = {
+        "br": (_brotli, settings.RESPONSE_BROTLI_QUALITY),
+        "zstd": (_zstd, settings.RESPONSE_ZSTD_LEVEL),
+        "gzip": (_gzip, settings.RESPONSE_GZIP_LEVEL),
+    }
+    available = {}
+    for encoding in settings.RESPONSE_COMPRESSION_ENCODINGS.split(","):
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+        if encoding not in factories:
+            logger.warning(f"Unknown response encoding in RESPONSE_COMPRESSION_ENCODINGS: {encoding}")
+            continue
+        factory, level = factories[encoding]
+        try:
+            available[encoding] = factory(level)
+        except ImportError:
+            logger.warning(f"RESPONSE_COMPRESSION_ENCODINGS includes {encoding} but its package is not installed")
+    return available
+
+
+def _accepted(accept_encoding: str) -> Tuple[Dict[str, float], Optional[float]]:
+    """Parse Accept-Encoding into {coding: q}, plus the q of ``*`` if given."""
+    accepted: Dict[str, float] = {}
+    wildcard = None
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "*":
+            wildcard = q
+        else:
+            accepted[coding] = q
+    return accepted, wildcard
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """The preferred available encoding the client accepts, or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted, wildcard = _accepted(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in compressors():
+        q = accepted.get(encoding, wildcard or 0.0)
+        if q > best_q:  # ties keep the server's preference order
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return compressors()[encoding](body)
+
+
+def _matching_tag(request: Request, etag: str) -> Optional[str]:
+    """The If-None-Match entry naming payload version ``etag``, in any content coding."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    representations = {etag} | {f"{etag}-{encoding}" for encoding in ENCODINGS}
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return f'"{etag}"'
+        # If-None-Match uses weak comparison
+        if tag.removeprefix("W/").strip('"') in representations:
+            return tag
+    return None
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match names payload version ``etag``."""
+    return _matching_tag(request, etag) is not None
+
+
+def not_modified(request: Request, etag: str, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """
+    304 for a matched ``etag``, with the headers the full response would
+    have carried. The ETag is the one the client holds, coding included.
+    """
+    response_headers = dict(headers or {})
+    response_headers["ETag"] = _matching_tag(request, etag) or f'"{etag}"'
+    response_headers["Vary"] = "Accept-Encoding"
+    return Response(status_code=304, headers=response_headers)
+
+
+async def json_response(
+    request: Request,
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """A JSON response for ``content`` (see dump_json), compressed if the client accepts it."""
+    return await encoded_response(request, dump_json(content), status_code, headers, etag=etag)
+
+
+async def encode(body: bytes, encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+    """
+    ``body`` compressed with ``encoding`` (from negotiate_encoding) if it is
+    large enough: the content and the coding applied, None for identity.
+    """
+    settings = get_settings()
+    if encoding is None or len(body) < settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        return body, None
+    if len(body) >= settings.RESPONSE_COMPRESSION_THREAD_MIN_BYTES:
+        return await asyncio.to_thread(compress, body, encoding), encoding
+    return compress(body, encoding), encoding
+
+
+def make_response(
+    content: bytes,
+    encoding: Optional[str],
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+    media_type: str = "application/json",
+    etag: Optional[str] = None,
+) -> Response:
+    """
+    A response for ``content`` already encoded with ``encoding``.
+
+    ``etag`` is the payload version (unquoted); the ETag header names it
+    together with the content coding.
+    """
+    response_headers = dict(headers or {})
+    response_headers["Vary"] = "Accept-Encoding"
+    if encoding is not None:
+        response_headers["Content-Encoding"] = encoding
+    if etag is not None:
+        response_headers["ETag"] = f'"{etag}-{encoding}"' if encoding else f'"{etag}"'
+    return Response(content=content, status_code=status_code, headers=response_headers, media_type=media_type)
+
+
+async def encoded_response(
+    request: Request,
+    body: bytes,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+    media_type: str = "application/json",
+    etag: Optional[str] = None,
+) -> Response:
+    """A response for serialized ``body``, compressed per the request's Accept-Encoding."""
+    content, encoding = await encode(body, negotiate_encoding(request.headers.get("accept-encoding")))
+    return make_response(content, encoding, status_code, headers, media_type, etag)
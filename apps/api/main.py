@@ -1,13 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from apps.api.core.config import get_settings
+from apps.api.core.metrics import RequestMetricsMiddleware
+from apps.api.core.profiling import ProfilingMiddleware
+from apps.api.core.rate_limit import RateLimitMiddleware, rate_limiter
 from apps.api.routers import (
     auth,
     users,
     health,
     billing,
     cost_optimizer,
+    profiles,
 )
+from apps.api.services.cost_optimizer.analysis import ANALYSIS_JOB, run_analysis_job
+from apps.api.services.cost_optimizer.analysis_cache import analysis_cache
+from apps.api.services.cost_optimizer.scheduler import get_scheduler
+from apps.api.services.jobs import get_job_queue
 
 settings = get_settings()
 
@@ -17,6 +25,12 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Innermost, so profiles cover the endpoint rather than the middleware stack
+app.add_middleware(ProfilingMiddleware)
+
+# Rate limiting runs inside CORS so 429 responses carry CORS headers
+app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -24,14 +38,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-Profile-Id"],
 )
 
+# Outermost, so latency includes CORS handling and rate-limited requests
+app.add_middleware(RequestMetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api")
 app.include_router(users.router, prefix="/api")
 app.include_router(health.router, prefix="/api")
 app.include_router(billing.router, prefix="/api")
 app.include_router(cost_optimizer.router, prefix="/api")
+app.include_router(profiles.router, prefix="/api")
+
+
+@app.on_event("startup")
+async def start_background_workers():
+    """Start the background job workers and the analysis scheduler."""
+    job_queue = get_job_queue()
+    job_queue.register(ANALYSIS_JOB, run_analysis_job)
+    await job_queue.start()
+    if settings.ANALYSIS_SCHEDULE_ENABLED:
+        await get_scheduler().start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    """Stop the analysis scheduler and the background job workers, and close the Redis stores."""
+    await get_scheduler().stop()
+    await get_job_queue().stop()
+    await rate_limiter.close()
+    await analysis_cache.close()
 
 
 @app.get("/")
@@ -4,7 +4,11 @@ from .config import Config, ConfigVersion  # isort:skip
 from .validation import ValidationRun  # isort:skip
 from .policy import Policy  # isort:skip
 from .audit import AuditLog  # isort:skip
-from .billing import Subscription, CloudAccount, CostAnalysis, CostRecommendation  # isort:skip
+from .billing import Subscription, CloudAccount, CostAnalysis, CostRecommendation, CostDataCacheEntry  # isort:skip
+from .job import JobRecord  # isort:skip
+from .inventory import CloudResource  # isort:skip
+from .cost_facts import DailyCost, CostFactDay  # isort:skip
+from .profile import RequestProfile  # isort:skip
 
 __all__ = [
     "User",
@@ -17,5 +21,11 @@ __all__ = [
     "Subscription",
     "CloudAccount",
     "CostAnalysis",
-    "CostRecommendation"
+    "CostRecommendation",
+    "CostDataCacheEntry",
+    "JobRecord",
+    "CloudResource",
+    "DailyCost",
+    "CostFactDay",
+    "RequestProfile",
 ]
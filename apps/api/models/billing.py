@@ -1,5 +1,7 @@
-from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Text, Float, Boolean, Integer
+from datetime import date, datetime
+from sqlalchemy import (
+    String, Date, DateTime, ForeignKey, Text, Float, Boolean, Integer, Index, UniqueConstraint, desc, text,
+)
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import uuid
@@ -8,6 +10,9 @@ from apps.api.core.database import Base
 
 class Subscription(Base):
     __tablename__ = "subscriptions"
+    __table_args__ = (
+        UniqueConstraint("user_id", name="uq_subscriptions_user_id"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -35,6 +40,15 @@ class Subscription(Base):
 
 class CloudAccount(Base):
     __tablename__ = "cloud_accounts"
+    __table_args__ = (
+        Index("ix_cloud_accounts_user_id_created_at", "user_id", "created_at"),
+        # Scheduler: active accounts whose next analysis is due
+        Index(
+            "ix_cloud_accounts_next_analysis_at",
+            "next_analysis_at",
+            postgresql_where=text("is_active"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -48,6 +62,8 @@ class CloudAccount(Base):
     region: Mapped[str] = mapped_column(String(100), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     last_synced_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_full_sync_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    next_analysis_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # set by the scheduler
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
@@ -61,6 +77,13 @@ class CloudAccount(Base):
 
 class CostAnalysis(Base):
     __tablename__ = "cost_analyses"
+    __table_args__ = (
+        # Matches the keyset ordering of GET /cost-optimizer/analyses
+        Index(
+            "ix_cost_analyses_cloud_account_id_analysis_date",
+            "cloud_account_id", desc("analysis_date"), desc("id"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -74,6 +97,8 @@ class CostAnalysis(Base):
     savings_percentage: Mapped[float] = mapped_column(Float, nullable=False)
     resource_count: Mapped[int] = mapped_column(Integer, nullable=False)
     cost_breakdown: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    # Bumped whenever a recommendation's status changes; part of the analysis ETags
+    recommendations_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
@@ -89,6 +114,15 @@ class CostAnalysis(Base):
 
 class CostRecommendation(Base):
     __tablename__ = "cost_recommendations"
+    __table_args__ = (
+        Index("ix_cost_recommendations_cost_analysis_id_status", "cost_analysis_id", "status"),
+        # Open recommendations by savings; applied/dismissed rows are never scanned
+        Index(
+            "ix_cost_recommendations_pending_savings",
+            "cost_analysis_id", desc("monthly_savings"),
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
@@ -109,7 +143,9 @@ class CostRecommendation(Base):
     priority: Mapped[str] = mapped_column(String(20), nullable=False)  # HIGH, MEDIUM, LOW
     implementation_effort: Mapped[str] = mapped_column(String(20), nullable=False)  # EASY, MEDIUM, HARD
     status: Mapped[str] = mapped_column(String(50), default="PENDING")  # PENDING, APPLIED, DISMISSED
-    recommendation_metadata: Mapped[dict] = mapped_column(JSONB, nullable=True)
+    # Stored in the "metadata" column; the attribute is renamed because
+    # ``metadata`` is reserved on declarative classes.
+    recommendation_metadata: Mapped[dict] = mapped_column("metadata", JSONB, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow, nullable=False
     )
@@ -118,3 +154,23 @@ class CostRecommendation(Base):
     cost_analysis: Mapped["CostAnalysis"] = relationship(
         "CostAnalysis", back_populates="recommendations"
     )
+
+
+class CostDataCacheEntry(Base):
+    """Persistent copy of a provider billing API response (see billing_cache)."""
+
+    __tablename__ = "cost_data_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)  # sha256 of the query
+    cloud_account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cloud_accounts.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    period_end: Mapped[date] = mapped_column(Date, nullable=False)  # exclusive
+    granularity: Mapped[str] = mapped_column(String(20), nullable=False)
+    group_by: Mapped[str] = mapped_column(String(50), nullable=False)
+    data: Mapped[dict] = mapped_column(JSONB, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # NULL: closed period
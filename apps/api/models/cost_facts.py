@@ -0,0 +1,44 @@
+from datetime import date, datetime
+from sqlalchemy import String, Date, DateTime, Float, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+import uuid
+from apps.api.core.database import Base
+
+
+class DailyCost(Base):
+    """
+    Append-only daily cost fact: one row per account, day and service.
+
+    Range-partitioned by month on ``usage_date``; partitions are created on
+    demand by the backfill (services/cost_optimizer/cost_facts.py).
+    """
+
+    __tablename__ = "daily_costs"
+    __table_args__ = (
+        # The partition key has to be part of the primary key
+        PrimaryKeyConstraint("cloud_account_id", "usage_date", "service", name="pk_daily_costs"),
+        {"postgresql_partition_by": "RANGE (usage_date)"},
+    )
+
+    cloud_account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cloud_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    usage_date: Mapped[date] = mapped_column(Date, nullable=False)
+    service: Mapped[str] = mapped_column(String(255), nullable=False)  # provider service name
+    category: Mapped[str] = mapped_column(String(20), nullable=False)  # compute, storage, network, database, other
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+
+
+class CostFactDay(Base):
+    """Days whose costs have been ingested into daily_costs, including days without spend."""
+
+    __tablename__ = "cost_fact_days"
+
+    cloud_account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cloud_accounts.id", ondelete="CASCADE"), primary_key=True
+    )
+    usage_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    ingested_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
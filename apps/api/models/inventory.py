@@ -0,0 +1,46 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+import uuid
+from apps.api.core.database import Base
+
+
+class CloudResource(Base):
+    """Last known state of a discovered cloud resource."""
+
+    __tablename__ = "cloud_resources"
+    __table_args__ = (
+        UniqueConstraint(
+            "cloud_account_id", "resource_type", "resource_id",
+            name="uq_cloud_resources_account_type_resource",
+        ),
+        # Live inventory scans skip tombstoned rows
+        Index(
+            "ix_cloud_resources_live",
+            "cloud_account_id",
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    cloud_account_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("cloud_accounts.id", ondelete="CASCADE"), nullable=False
+    )
+    resource_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    resource_id: Mapped[str] = mapped_column(String(512), nullable=False)
+    region: Mapped[str] = mapped_column(String(100), nullable=True)
+    attributes: Mapped[dict] = mapped_column(JSONB, nullable=False)  # resource as returned by discovery
+    fingerprint: Mapped[str] = mapped_column(String(64), nullable=False)  # sha256 of attributes
+    first_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )  # last time the fingerprint changed
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)  # tombstone
@@ -0,0 +1,37 @@
+from datetime import datetime
+from sqlalchemy import String, DateTime, Float, ForeignKey, Integer, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+import uuid
+from apps.api.core.database import Base
+
+
+class RequestProfile(Base):
+    """Sampled call stacks and SQL of one profiled API request (see core/profiling)."""
+
+    __tablename__ = "request_profiles"
+    __table_args__ = (
+        Index("ix_request_profiles_created_at", "created_at"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    method: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(2048), nullable=False)
+    route: Mapped[str] = mapped_column(String(255), nullable=True)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    trigger: Mapped[str] = mapped_column(String(20), nullable=False)  # requested, sampled
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True
+    )
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    sample_interval_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    folded_stacks: Mapped[str] = mapped_column(Text, nullable=False)  # flamegraph.pl / speedscope input
+    top_functions: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    sql_statements: Mapped[list] = mapped_column(JSONB, nullable=False, default=list)
+    sql_time_ms: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+    )
@@ -3,8 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from apps.api.core.database import get_db
 from apps.api.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    hash_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -29,7 +29,7 @@ async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db))
         )
 
     # Create new user
-    hashed_password = get_password_hash(request.password)
+    hashed_password = await hash_password_async(request.password)
     new_user = User(
         email=request.email,
         name=request.name,
@@ -54,12 +54,22 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.email == request.email))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(request.password, user.password_hash):
+    valid, new_hash = (
+        await verify_password_async(request.password, user.password_hash)
+        if user else (False, None)
+    )
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
+    # Upgrade hashes created with an older work factor
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
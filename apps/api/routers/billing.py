@@ -6,6 +6,7 @@ import uuid
 
 from apps.api.core.database import get_db
 from apps.api.core.deps import get_current_user
+from apps.api.core.rate_limit import invalidate_cached_plan
 from apps.api.schemas.billing import (
     SubscriptionResponse,
     SubscriptionCreate,
@@ -71,6 +72,7 @@ async def create_or_update_subscription(
 
     await db.commit()
     await db.refresh(subscription)
+    invalidate_cached_plan(current_user.id)
 
     return subscription
 
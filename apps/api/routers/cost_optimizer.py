@@ -1,27 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import noload
 from typing import List
+from datetime import date, datetime, timedelta, timezone
+import base64
 import uuid
-from datetime import datetime
 
-from apps.api.core.database import get_db
+from apps.api.core.database import AsyncSessionLocal, ReadSessionLocal, get_db, get_read_db
 from apps.api.core.deps import get_current_user
+from apps.api.core.responses import (
+    dump_json,
+    encode,
+    etag_matches,
+    make_response,
+    negotiate_encoding,
+    not_modified,
+)
 from apps.api.schemas.billing import (
     CloudAccountCreate,
     CloudAccountResponse,
     CostAnalysisResponse,
     CostAnalysisRequest,
-    CostRecommendationResponse,
+    CostDataResponse,
+    DailyCostPoint,
     RecommendationActionRequest,
+    AnalysisJobResponse,
 )
 from apps.api.models.user import User
 from apps.api.models.billing import CloudAccount, CostAnalysis, CostRecommendation, Subscription
-from apps.api.services.cost_optimizer import CostOptimizerEngine
-from apps.api.services.cost_optimizer.cloud_providers import get_analyzer
+from apps.api.services.cost_optimizer import billing_cache
+from apps.api.services.cost_optimizer.client_pool import client_pool
+from apps.api.services.cost_optimizer.cloud_providers import BillingUnsupported
+from apps.api.services.cost_optimizer.analysis import ANALYSIS_JOB, analysis_dedupe_key
+from apps.api.services.cost_optimizer.analysis_cache import CachedResponse, analysis_cache
+from apps.api.services.cost_optimizer.cost_facts import daily_cost_series, supports_daily_costs
+from apps.api.services.cost_optimizer.scheduler import next_analysis_time
+from apps.api.services.cost_optimizer.serialization import (
+    analyses_etag,
+    analysis_etag,
+    analysis_payload,
+    dump_analyses,
+    load_recommendations,
+)
+from apps.api.services.jobs import get_job_queue
 
 router = APIRouter(prefix="/cost-optimizer", tags=["cost-optimizer"])
 
+# Analyses only change when a recommendation's status does, and their ETags
+# say when: browsers keep them and revalidate on every use, a 304 is cheap.
+# private: payloads are per user, shared caches must not keep them.
+ANALYSIS_CACHE_CONTROL = "private, no-cache"
+# Jobs are polled while they change; nothing is worth keeping
+JOB_CACHE_CONTROL = "no-store"
+
 
 async def check_subscription_limit(user_id: uuid.UUID, db: AsyncSession):
     """Check if user has reached account limit based on subscription."""
@@ -30,10 +62,9 @@ async def check_subscription_limit(user_id: uuid.UUID, db: AsyncSession):
     )
     subscription = result.scalar_one_or_none()
 
-    account_result = await db.execute(
-        select(CloudAccount).where(CloudAccount.user_id == user_id)
+    account_count = await db.scalar(
+        select(func.count()).select_from(CloudAccount).where(CloudAccount.user_id == user_id)
     )
-    account_count = len(account_result.scalars().all())
 
     # Free tier: 1 account, Premium: unlimited
     if subscription and subscription.plan == "FREE" and account_count >= 1:
@@ -82,11 +113,13 @@ async def create_cloud_account(
 @router.get("/cloud-accounts", response_model=List[CloudAccountResponse])
 async def list_cloud_accounts(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List user's connected cloud accounts."""
     result = await db.execute(
-        select(CloudAccount).where(CloudAccount.user_id == current_user.id)
+        select(CloudAccount)
+        .where(CloudAccount.user_id == current_user.id)
+        .order_by(CloudAccount.created_at)
     )
     accounts = result.scalars().all()
     return accounts
@@ -116,6 +149,97 @@ async def get_cloud_account(
     return account
 
 
+@router.get("/cloud-accounts/{account_id}/costs", response_model=CostDataResponse)
+async def get_account_costs(
+    account_id: uuid.UUID,
+    start: date | None = None,
+    end: date | None = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Billed cost breakdown of a cloud account from the provider's billing API.
+
+    ``end`` is exclusive; the default range is the last 30 days. Responses
+    are cached (see billing_cache), settled months indefinitely.
+    """
+    result = await db.execute(
+        select(CloudAccount).where(
+            CloudAccount.id == account_id,
+            CloudAccount.user_id == current_user.id,
+        )
+    )
+    account = result.scalar_one_or_none()
+
+    if not account:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cloud account not found",
+        )
+
+    end = end or date.today()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+    try:
+        cost_breakdown = await billing_cache.get_cost_data(account, start.isoformat(), end.isoformat())
+    except BillingUnsupported:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Billing data is not available for {account.provider} accounts",
+        )
+
+    return {"cloud_account_id": account.id, "start": start, "end": end, "cost_breakdown": cost_breakdown}
+
+
+@router.get("/cloud-accounts/{account_id}/daily-costs", response_model=List[DailyCostPoint])
+async def get_daily_costs(
+    account_id: uuid.UUID,
+    start: date | None = None,
+    end: date | None = None,
+    group_by: str = Query(default="category", pattern="^(category|service)$"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Daily cost trend of a cloud account from the stored cost facts.
+
+    ``end`` is exclusive; the default range is the last 30 days. Facts are
+    ingested by cost analyses, so recent days may not be present yet.
+    Providers without daily cost data (see cost_facts) get a 501.
+    """
+    provider = await db.scalar(
+        select(CloudAccount.provider).where(
+            CloudAccount.id == account_id,
+            CloudAccount.user_id == current_user.id,
+        )
+    )
+    if not provider:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Cloud account not found",
+        )
+    if not supports_daily_costs(provider):
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Daily costs are not available for {provider} accounts",
+        )
+
+    end = end or date.today()
+    start = start or end - timedelta(days=30)
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+    return await daily_cost_series(db, account_id, start, end, group_by)
+
+
 @router.delete("/cloud-accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_cloud_account(
     account_id: uuid.UUID,
@@ -139,17 +263,23 @@ async def delete_cloud_account(
 
     await db.delete(account)
     await db.commit()
+    await analysis_cache.invalidate_user(current_user.id)
+    billing_cache.forget_account(account_id)
+    client_pool.evict(account.provider, account.credentials)
 
     return None
 
 
-@router.post("/analyze", response_model=CostAnalysisResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/analyze", response_model=AnalysisJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def run_cost_analysis(
     request: CostAnalysisRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
-    """Run cost analysis on a cloud account."""
+    """
+    Queue a cost analysis on a cloud account and return the job for polling.
+    If the account already has a queued or running analysis, that job is returned.
+    """
     # Get cloud account
     result = await db.execute(
         select(CloudAccount).where(
@@ -165,150 +295,199 @@ async def run_cost_analysis(
             detail="Cloud account not found",
         )
 
-    # Get cloud provider analyzer
-    analyzer = get_analyzer(account.provider)
+    # An analysis of this account that is already queued or running is
+    # returned instead of queueing an overlapping one
+    job = await get_job_queue().enqueue(
+        ANALYSIS_JOB,
+        {"cloud_account_id": str(account.id), "full_sync": request.full_sync},
+        user_id=current_user.id,
+        dedupe_key=analysis_dedupe_key(account.id),
+    )
+    # A manual run counts as this period's analysis
+    account.next_analysis_at = next_analysis_time(datetime.now(timezone.utc))
+    await db.commit()
 
-    # Fetch resources from cloud provider
-    resources = analyzer.fetch_resources(account.credentials, account.region or "us-east-1")
+    return job
 
-    # Run AI cost analysis
-    analysis_result = CostOptimizerEngine.analyze_resources(account.provider, resources)
 
-    # Create cost analysis record
-    cost_analysis = CostAnalysis(
-        cloud_account_id=account.id,
-        analysis_date=datetime.utcnow(),
-        total_monthly_cost=analysis_result["total_monthly_cost"],
-        potential_savings=analysis_result["potential_savings"],
-        savings_percentage=analysis_result["savings_percentage"],
-        resource_count=analysis_result["resource_count"],
-        cost_breakdown=analysis_result["cost_breakdown"],
-    )
+@router.get("/jobs", response_model=List[AnalysisJobResponse])
+async def list_analysis_jobs(
+    response: Response,
+    limit: int = Query(default=20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    """List the user's recent analysis jobs."""
+    response.headers["Cache-Control"] = JOB_CACHE_CONTROL
+    return await get_job_queue().list_for_user(current_user.id, limit)
+
 
-    db.add(cost_analysis)
-    await db.flush()
-
-    # Create recommendation records
-    for rec in analysis_result["recommendations"]:
-        recommendation = CostRecommendation(
-            cost_analysis_id=cost_analysis.id,
-            resource_type=rec["resource_type"],
-            resource_id=rec["resource_id"],
-            recommendation_type=rec["recommendation_type"],
-            title=rec["title"],
-            description=rec["description"],
-            current_cost=rec["current_cost"],
-            estimated_new_cost=rec["estimated_new_cost"],
-            monthly_savings=rec["monthly_savings"],
-            annual_savings=rec["annual_savings"],
-            priority=rec["priority"],
-            implementation_effort=rec["implementation_effort"],
-            status=rec["status"],
-            metadata=rec.get("metadata", {}),
+@router.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def get_analysis_job(
+    job_id: uuid.UUID,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+):
+    """Get analysis job status and progress."""
+    job = await get_job_queue().get(job_id)
+
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
         )
-        db.add(recommendation)
 
-    # Update last synced timestamp
-    account.last_synced_at = datetime.utcnow()
+    response.headers["Cache-Control"] = JOB_CACHE_CONTROL
+    return job
 
-    await db.commit()
-    await db.refresh(cost_analysis)
 
-    # Fetch recommendations to include in response
-    rec_result = await db.execute(
-        select(CostRecommendation).where(CostRecommendation.cost_analysis_id == cost_analysis.id)
-    )
-    cost_analysis.recommendations = rec_result.scalars().all()
+def _encode_cursor(analysis: CostAnalysis) -> str:
+    raw = f"{analysis.analysis_date.isoformat()}|{analysis.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        analysis_date, analysis_id = raw.split("|", 1)
+        return datetime.fromisoformat(analysis_date), uuid.UUID(analysis_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
 
-    return cost_analysis
+def _cached_response(request: Request, cached: CachedResponse) -> Response:
+    if cached.content is None or etag_matches(request, cached.etag):
+        return not_modified(request, cached.etag, cached.headers)
+    return make_response(cached.content, cached.encoding, headers=cached.headers, etag=cached.etag)
 
 
 @router.get("/analyses", response_model=List[CostAnalysisResponse])
 async def list_cost_analyses(
+    request: Request,
     cloud_account_id: uuid.UUID | None = None,
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=200),
+    include_recommendations: bool = True,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
-    """List cost analyses."""
-    if cloud_account_id:
-        # Verify ownership
-        account_result = await db.execute(
-            select(CloudAccount).where(
-                CloudAccount.id == cloud_account_id,
-                CloudAccount.user_id == current_user.id,
-            )
+    """
+    List cost analyses, newest first.
+
+    Keyset-paginated on (analysis_date, id): pass the ``X-Next-Cursor``
+    response header back as ``cursor`` to fetch the next page. Ownership is
+    enforced with a join, and recommendations are loaded as plain rows with
+    one extra IN query for the whole page (or skipped entirely), then
+    serialized without a model pass (services/cost_optimizer/serialization.py).
+    Pages are served from the analysis cache; the page's ETag is known from
+    the analysis rows alone, so uncached, a matching If-None-Match gets a 304
+    before any recommendation is loaded.
+    """
+    keyset = _decode_cursor(cursor) if cursor else None
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    async def load(conditional: bool) -> CachedResponse:
+        query = (
+            select(CostAnalysis)
+            .join(CloudAccount, CloudAccount.id == CostAnalysis.cloud_account_id)
+            .where(CloudAccount.user_id == current_user.id)
         )
-        account = account_result.scalar_one_or_none()
-
-        if not account:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Cloud account not found",
+        if cloud_account_id:
+            query = query.where(CostAnalysis.cloud_account_id == cloud_account_id)
+        if keyset:
+            query = query.where(tuple_(CostAnalysis.analysis_date, CostAnalysis.id) < tuple_(*keyset))
+
+        async with ReadSessionLocal() as db:
+            result = await db.execute(
+                query.options(noload(CostAnalysis.recommendations))
+                .order_by(CostAnalysis.analysis_date.desc(), CostAnalysis.id.desc()).limit(limit + 1)
             )
-
-        query = select(CostAnalysis).where(CostAnalysis.cloud_account_id == cloud_account_id)
-    else:
-        # Get all analyses for user's accounts
-        account_ids_result = await db.execute(
-            select(CloudAccount.id).where(CloudAccount.user_id == current_user.id)
-        )
-        account_ids = [row[0] for row in account_ids_result.all()]
-
-        query = select(CostAnalysis).where(CostAnalysis.cloud_account_id.in_(account_ids))
-
-    result = await db.execute(query.order_by(CostAnalysis.analysis_date.desc()))
-    analyses = result.scalars().all()
-
-    # Load recommendations for each analysis
-    for analysis in analyses:
-        rec_result = await db.execute(
-            select(CostRecommendation).where(CostRecommendation.cost_analysis_id == analysis.id)
-        )
-        analysis.recommendations = rec_result.scalars().all()
-
-    return analyses
+            analyses = result.scalars().all()
+
+            if not analyses and cloud_account_id and not cursor:
+                # Distinguish "no analyses yet" from an account the user doesn't own
+                account_result = await db.execute(
+                    select(CloudAccount.id).where(
+                        CloudAccount.id == cloud_account_id,
+                        CloudAccount.user_id == current_user.id,
+                    )
+                )
+                if account_result.scalar_one_or_none() is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Cloud account not found",
+                    )
+
+            headers = {"Cache-Control": ANALYSIS_CACHE_CONTROL}
+            has_more = len(analyses) > limit
+            if has_more:
+                analyses = analyses[:limit]
+                headers["X-Next-Cursor"] = _encode_cursor(analyses[-1])
+
+            etag = analyses_etag(analyses, include_recommendations, has_more)
+            if conditional and etag_matches(request, etag):
+                return CachedResponse(etag, headers)
+
+            recommendations = {}
+            if include_recommendations:
+                recommendations = await load_recommendations(db, [analysis.id for analysis in analyses])
+        content, applied = await encode(dump_analyses(analyses, recommendations), encoding)
+        return CachedResponse(etag, headers, content, applied)
+
+    key = f"list:{cloud_account_id}:{cursor}:{limit}:{include_recommendations:d}:{encoding}"
+    return _cached_response(request, await analysis_cache.get_or_load(current_user.id, key, load))
 
 
 @router.get("/analyses/{analysis_id}", response_model=CostAnalysisResponse)
 async def get_cost_analysis(
     analysis_id: uuid.UUID,
+    request: Request,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
 ):
-    """Get cost analysis details."""
-    result = await db.execute(
-        select(CostAnalysis).where(CostAnalysis.id == analysis_id)
-    )
-    analysis = result.scalar_one_or_none()
+    """
+    Get cost analysis details.
+
+    Served from the analysis cache. Uncached, a matching If-None-Match gets
+    a 304 after the ownership check, without loading the recommendations.
+    """
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+
+    async def load(conditional: bool) -> CachedResponse:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(CostAnalysis, CloudAccount.user_id)
+                .join(CloudAccount, CloudAccount.id == CostAnalysis.cloud_account_id)
+                .where(CostAnalysis.id == analysis_id)
+                .options(noload(CostAnalysis.recommendations))
+            )
+            row = result.one_or_none()
 
-    if not analysis:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Cost analysis not found",
-        )
+            if not row:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Cost analysis not found",
+                )
 
-    # Verify ownership through cloud account
-    account_result = await db.execute(
-        select(CloudAccount).where(
-            CloudAccount.id == analysis.cloud_account_id,
-            CloudAccount.user_id == current_user.id,
-        )
-    )
-    account = account_result.scalar_one_or_none()
+            # Verify ownership through cloud account
+            analysis, owner_id = row
+            if owner_id != current_user.id:
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail="Access denied",
+                )
 
-    if not account:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied",
-        )
+            headers = {"Cache-Control": ANALYSIS_CACHE_CONTROL}
+            etag = analysis_etag(analysis)
+            if conditional and etag_matches(request, etag):
+                return CachedResponse(etag, headers)
 
-    # Load recommendations
-    rec_result = await db.execute(
-        select(CostRecommendation).where(CostRecommendation.cost_analysis_id == analysis.id)
-    )
-    analysis.recommendations = rec_result.scalars().all()
+            recommendations = await load_recommendations(db, [analysis.id])
+        content, applied = await encode(dump_json(analysis_payload(analysis, recommendations[analysis.id])), encoding)
+        return CachedResponse(etag, headers, content, applied)
 
-    return analysis
+    key = f"analysis:{analysis_id}:{encoding}"
+    return _cached_response(request, await analysis_cache.get_or_load(current_user.id, key, load))
 
 
 @router.patch("/recommendations/{recommendation_id}")
@@ -359,7 +538,10 @@ async def update_recommendation_status(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid action. Must be APPLY or DISMISS",
         )
+    # Changes the ETags of the analysis and of every list page showing it
+    analysis.recommendations_version = CostAnalysis.recommendations_version + 1
 
     await db.commit()
+    await analysis_cache.invalidate_user(current_user.id)
 
     return {"message": f"Recommendation {action.action.lower()}ed successfully"}
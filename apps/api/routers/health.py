@@ -1,7 +1,29 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+from apps.api.core.database import pool_stats
+from apps.api.core.deps import user_cache
+from apps.api.core.metrics import StatsCollector
+from apps.api.core.rate_limit import rate_limiter
+from apps.api.services.cost_optimizer import billing_cache
+from apps.api.services.cost_optimizer.analysis_cache import analysis_cache
+from apps.api.services.cost_optimizer.client_pool import client_pool
+from apps.api.services.cost_optimizer.scheduler import get_scheduler
 
 router = APIRouter(tags=["health"])
 
+for collector in (
+    StatsCollector("user_cache", user_cache.stats),
+    StatsCollector("db_pool", pool_stats),
+    # Per-account hit rates would add a series per account
+    StatsCollector("billing_cache", billing_cache.stats, labels={"lookups": "result"}, exclude=["accounts"]),
+    StatsCollector("provider_clients", client_pool.stats, labels={"created": "kind", "reused": "kind"}),
+    StatsCollector("scheduler", lambda: get_scheduler().stats(), labels={"in_flight": "provider"}),
+    StatsCollector("rate_limit", rate_limiter.stats, labels={"allowed": "bucket", "limited": "bucket"}),
+    StatsCollector("analysis_cache", analysis_cache.stats, labels={"lookups": "result"}),
+):
+    REGISTRY.register(collector)
+
 
 @router.get("/health")
 async def health_check():
@@ -11,9 +33,5 @@ async def health_check():
 
 @router.get("/metrics")
 async def metrics():
-    """Basic metrics endpoint."""
-    # In a real system, this would return actual metrics
-    return {
-        "requests_total": 0,
-        "validations_total": 0,
-    }
+    """Prometheus metrics in the text exposition format."""
+    return Response(generate_latest(REGISTRY), headers={"Content-Type": CONTENT_TYPE_LATEST})
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import defer
+from typing import List
+import uuid
+
+from apps.api.core.database import get_db
+from apps.api.core.deps import require_role
+from apps.api.schemas.profile import RequestProfileResponse, RequestProfileSummary
+from apps.api.models.user import User
+from apps.api.models.profile import RequestProfile
+
+router = APIRouter(prefix="/admin/profiles", tags=["profiling"])
+
+_DETAIL_COLUMNS = (RequestProfile.folded_stacks, RequestProfile.top_functions, RequestProfile.sql_statements)
+
+
+async def _get_profile(db: AsyncSession, profile_id: uuid.UUID) -> RequestProfile:
+    profile = await db.get(RequestProfile, profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return profile
+
+
+@router.get("", response_model=List[RequestProfileSummary])
+async def list_profiles(
+    limit: int = Query(default=50, ge=1, le=200),
+    current_user: User = Depends(require_role(["ADMIN"])),
+    db: AsyncSession = Depends(get_db),
+):
+    """List stored request profiles, newest first (ADMIN only)."""
+    result = await db.execute(
+        select(RequestProfile)
+        .options(*(defer(column) for column in _DETAIL_COLUMNS))
+        .order_by(RequestProfile.created_at.desc())
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+
+@router.get("/{profile_id}", response_model=RequestProfileResponse)
+async def get_profile(
+    profile_id: uuid.UUID,
+    current_user: User = Depends(require_role(["ADMIN"])),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get a profile's hottest functions and SQL statements (ADMIN only)."""
+    return await _get_profile(db, profile_id)
+
+
+@router.get("/{profile_id}/folded")
+async def download_folded_stacks(
+    profile_id: uuid.UUID,
+    current_user: User = Depends(require_role(["ADMIN"])),
+    db: AsyncSession = Depends(get_db),
+):
+    """Download a profile's folded stacks, for flamegraph.pl or speedscope (ADMIN only)."""
+    profile = await _get_profile(db, profile_id)
+    return Response(
+        profile.folded_stacks,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile.id}.folded"'},
+    )
+
+
+@router.delete("/{profile_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_profile(
+    profile_id: uuid.UUID,
+    current_user: User = Depends(require_role(["ADMIN"])),
+    db: AsyncSession = Depends(get_db),
+):
+    """Delete a stored profile (ADMIN only)."""
+    profile = await _get_profile(db, profile_id)
+    await db.delete(profile)
+    await db.commit()
+    return None
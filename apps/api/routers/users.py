@@ -4,8 +4,8 @@ from sqlalchemy import select
 from typing import List
 import uuid
 
-from apps.api.core.database import get_db
-from apps.api.core.deps import get_current_user, require_role
+from apps.api.core.database import get_db, get_read_db
+from apps.api.core.deps import get_current_user, invalidate_cached_user, require_role
 from apps.api.schemas.user import UserResponse, UserUpdate
 from apps.api.models.user import User
 
@@ -21,7 +21,7 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 @router.get("", response_model=List[UserResponse])
 async def list_users(
     current_user: User = Depends(require_role(["ADMIN"])),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List all users (ADMIN only)."""
     result = await db.execute(select(User))
@@ -57,5 +57,6 @@ async def update_user(
     user.role = update.role
     await db.commit()
     await db.refresh(user)
+    invalidate_cached_user(user.id)
 
     return user
@@ -7,6 +7,7 @@ from .billing import (
     CloudAccountResponse,
     CostAnalysisResponse,
     CostRecommendationResponse,
+    AnalysisJobResponse,
 )
 
 __all__ = [
@@ -22,4 +23,5 @@ __all__ = [
     "CloudAccountResponse",
     "CostAnalysisResponse",
     "CostRecommendationResponse",
+    "AnalysisJobResponse",
 ]
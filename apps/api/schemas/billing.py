@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from datetime import datetime
+from pydantic import AliasChoices, BaseModel, Field
+from datetime import date, datetime
 import uuid
 
 
@@ -56,7 +56,12 @@ class CostRecommendationResponse(BaseModel):
     priority: str
     implementation_effort: str
     status: str
-    metadata: dict | None
+    # ORM rows expose the JSONB column as ``recommendation_metadata``;
+    # plain dicts from the engine use ``metadata``.
+    metadata: dict | None = Field(
+        default=None,
+        validation_alias=AliasChoices("recommendation_metadata", "metadata"),
+    )
 
     class Config:
         from_attributes = True
@@ -79,6 +84,36 @@ class CostAnalysisResponse(BaseModel):
 
 class CostAnalysisRequest(BaseModel):
     cloud_account_id: uuid.UUID
+    full_sync: bool = False
+
+
+class AnalysisJobResponse(BaseModel):
+    id: uuid.UUID
+    job_type: str
+    status: str  # QUEUED, RUNNING, SUCCEEDED, FAILED, SKIPPED
+    progress: int
+    message: str | None
+    result: dict | None
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+class CostDataResponse(BaseModel):
+    cloud_account_id: uuid.UUID
+    start: date
+    end: date  # exclusive
+    cost_breakdown: dict  # total, compute, storage, network, database, other
+
+
+class DailyCostPoint(BaseModel):
+    date: date
+    key: str  # category or service, depending on group_by
+    amount: float
 
 
 class RecommendationActionRequest(BaseModel):
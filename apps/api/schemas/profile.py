@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List
+import uuid
+
+
+class RequestProfileSummary(BaseModel):
+    id: uuid.UUID
+    method: str
+    path: str
+    route: str | None
+    status_code: int
+    trigger: str  # requested, sampled
+    user_id: uuid.UUID | None
+    duration_ms: float
+    sample_count: int
+    sql_time_ms: float
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class RequestProfileResponse(RequestProfileSummary):
+    sample_interval_ms: float
+    top_functions: List[Dict[str, Any]]
+    sql_statements: List[Dict[str, Any]]
@@ -1,9 +1,17 @@
-from .engine import CostOptimizerEngine
-from .cloud_providers import AWSCostAnalyzer, GCPCostAnalyzer, AzureCostAnalyzer
+from .engine import CostOptimizerEngine, AnalysisStream
 
 __all__ = [
     "CostOptimizerEngine",
+    "AnalysisStream",
     "AWSCostAnalyzer",
     "GCPCostAnalyzer",
     "AzureCostAnalyzer",
 ]
+
+
+def __getattr__(name):
+    # Analyzers (and their provider SDKs) are imported on first access
+    if name in ("AWSCostAnalyzer", "GCPCostAnalyzer", "AzureCostAnalyzer"):
+        from . import cloud_providers
+        return getattr(cloud_providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
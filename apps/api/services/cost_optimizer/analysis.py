@@ -0,0 +1,183 @@
+"""
+Cost analysis job: syncs the cloud account's resource inventory, backfills
+missing daily cost facts, runs the recommendation engine over the inventory
+and persists the results.
+
+Runs on the background job queue; blocking provider SDK calls and the
+engine are pushed onto worker threads so the event loop stays responsive.
+The live inventory is streamed from the database in fixed-size chunks and
+each chunk's recommendations are written as they are produced, so memory
+stays flat regardless of account size.
+
+An account has at most one queued or running analysis job: both the API
+and the scheduler enqueue with the account id as dedupe key and get the
+active job back instead of a duplicate. A per-account advisory lock backs
+this up across replicas; a job that finds the account locked by another run
+is skipped.
+"""
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from apps.api.core.config import get_settings
+from apps.api.core.database import AsyncSessionLocal, try_advisory_lock
+from apps.api.models.billing import CloudAccount, CostAnalysis
+from apps.api.models.inventory import CloudResource
+from apps.api.services.jobs import Job, JobSkipped
+from .analysis_cache import analysis_cache
+from .cost_facts import backfill_daily_costs
+from .engine import AnalysisStream, CostOptimizerEngine
+from .inventory import sync_inventory
+from .persistence import COPY_THRESHOLD, save_recommendations
+
+ANALYSIS_JOB = "cost_analysis"
+
+# Advisory lock namespace for per-account analysis locks
+ANALYSIS_LOCK_NAMESPACE = 7302
+
+RESOURCE_CHUNK_SIZE = 1000
+
+
+def analysis_dedupe_key(account_id: uuid.UUID) -> str:
+    """Dedupe key of ANALYSIS_JOB, so each account has at most one active analysis job."""
+    return str(account_id)
+
+
+def _analyze_chunk(resources: List[Dict[str, Any]], stream: AnalysisStream) -> List[Dict[str, Any]]:
+    """Feed a chunk of resources to the engine and return its recommendations."""
+    if get_settings().ENGINE_MODE == "columnar":
+        return stream.feed_batch(resources)
+
+    started = time.perf_counter()
+    recommendations: List[Dict[str, Any]] = []
+    for resource in resources:
+        recommendations.extend(stream.feed(resource))
+    stream.compute_sec += time.perf_counter() - started
+    return recommendations
+
+
+async def run_analysis_job(job: Job, report) -> Optional[Dict[str, Any]]:
+    """
+    Job handler for ANALYSIS_JOB.
+
+    Payload: ``{"cloud_account_id": str, "full_sync": bool}``; ``full_sync``
+    forces a full inventory enumeration instead of an incremental sync.
+    Scheduled runs also carry ``"scheduled": True``.
+    """
+    account_id = uuid.UUID(job.payload["cloud_account_id"])
+
+    async with try_advisory_lock(ANALYSIS_LOCK_NAMESPACE, str(account_id)) as acquired:
+        if not acquired:
+            raise JobSkipped("Skipped: an analysis of this account is already running")
+        return await _analyze_account(job, account_id, report)
+
+
+async def _analyze_account(job: Job, account_id: uuid.UUID, report) -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        account = await db.get(CloudAccount, account_id)
+        if account is None:
+            raise ValueError("Cloud account not found")
+        provider = account.provider
+        user_id = account.user_id
+
+    await report(5, "Syncing resources")
+    sync = await sync_inventory(account_id, force_full=job.payload.get("full_sync", False))
+    await report(35, f"Synced resources ({sync.mode})")
+
+    # Cheap when there are no gaps: one ledger query and no billing requests
+    backfill = await backfill_daily_costs(account)
+    if backfill.supported:
+        await report(40, f"Backfilled {backfill.missing_days} days of costs")
+    else:
+        await report(40, "Daily costs are not available for this provider")
+
+    stream = CostOptimizerEngine.stream(provider)
+    recommendation_count = 0
+
+    # The analysis row and its recommendations are written in one transaction
+    # so readers never see a partially populated analysis. The inventory is
+    # read through a second session so its server-side cursor stays open
+    # while recommendations are inserted.
+    async with AsyncSessionLocal() as db, AsyncSessionLocal() as inventory_db:
+        cost_analysis = CostAnalysis(
+            cloud_account_id=account_id,
+            analysis_date=datetime.utcnow(),
+            total_monthly_cost=0,
+            potential_savings=0,
+            savings_percentage=0,
+            resource_count=0,
+            cost_breakdown={},
+        )
+        db.add(cost_analysis)
+        await db.flush()
+
+        live_resources = await inventory_db.stream(
+            select(CloudResource.attributes)
+            .where(
+                CloudResource.cloud_account_id == account_id,
+                CloudResource.deleted_at.is_(None),
+            )
+            .execution_options(yield_per=RESOURCE_CHUNK_SIZE)
+        )
+
+        # Recommendations are buffered up to the COPY threshold so large
+        # accounts are written in a few bulk statements.
+        pending: List[Dict[str, Any]] = []
+        async for partition in live_resources.partitions():
+            recommendations = await asyncio.to_thread(
+                _analyze_chunk, [row.attributes for row in partition], stream
+            )
+            pending.extend(recommendations)
+            if len(pending) >= COPY_THRESHOLD:
+                rows = await save_recommendations(db, cost_analysis.id, pending)
+                recommendation_count += len(rows)
+                pending = []
+
+            await report(
+                min(90, 40 + stream.resource_count // RESOURCE_CHUNK_SIZE),
+                f"Analyzed {stream.resource_count} resources",
+            )
+
+        summary = stream.finalize()
+        pending.extend(summary["recommendations"])
+        rows = await save_recommendations(db, cost_analysis.id, pending)
+        recommendation_count += len(rows)
+
+        cost_analysis.total_monthly_cost = summary["total_monthly_cost"]
+        cost_analysis.potential_savings = summary["potential_savings"]
+        cost_analysis.savings_percentage = summary["savings_percentage"]
+        cost_analysis.resource_count = summary["resource_count"]
+        cost_analysis.cost_breakdown = summary["cost_breakdown"]
+
+        await db.commit()
+    await analysis_cache.invalidate_user(user_id)
+
+    # Built from the in-memory summary; nothing is read back after commit.
+    return {
+        "analysis_id": str(cost_analysis.id),
+        "cloud_account_id": str(account_id),
+        "analysis_date": cost_analysis.analysis_date.isoformat(),
+        "total_monthly_cost": summary["total_monthly_cost"],
+        "potential_savings": summary["potential_savings"],
+        "savings_percentage": summary["savings_percentage"],
+        "resource_count": summary["resource_count"],
+        "cost_breakdown": summary["cost_breakdown"],
+        "recommendation_count": recommendation_count,
+        "sync": {
+            "mode": sync.mode,
+            "seen": sync.seen,
+            "changed": sync.changed,
+            "tombstoned": sync.tombstoned,
+        },
+        "daily_costs": {
+            "missing_days": backfill.missing_days,
+            "requests": backfill.requests,
+            "rows": backfill.rows,
+            "complete": backfill.complete,
+            "supported": backfill.supported,
+        },
+    }
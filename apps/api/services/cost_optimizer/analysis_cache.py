@@ -0,0 +1,306 @@
+"""
+Cache of serialized analysis responses (GET /analyses and /analyses/{id}).
+
+Analyses are read far more often than they change, and a response is
+expensive to produce (several queries, serialization, compression). The
+encoded responses are cached per user, in two tiers:
+
+- an in-process LRU bounded by ANALYSIS_CACHE_MAX_MB
+- a shared tier: Redis at ANALYSIS_CACHE_REDIS_URL, shared by the API
+  replicas and job workers, or without a URL an in-memory stand-in with the
+  same interface (enough for a single process)
+
+Analyses are committed by job workers, which with the database job backend
+run in every API process. A process-local shared tier would never see their
+invalidations, so without Redis the cache is only used with JOB_BACKEND=memory
+(one process); otherwise it turns itself off at startup.
+
+Invalidation is per user. Cache keys include the user's generation, a
+random token kept in the shared tier; ``invalidate_user`` replaces it when a
+new analysis is committed, a recommendation changes status or a cloud
+account is deleted. Entries of old generations are never read again and
+age out. Every lookup reads the generation, so an invalidation made by any
+process is seen at once. Entries also expire after ANALYSIS_CACHE_TTL_SEC,
+which bounds how stale a list read from a lagging replica can stay.
+
+Misses are single-flight. Concurrent misses in a process share one load,
+as billing_cache does. Across processes, the first loader takes a short
+lock in the shared tier, and the others poll for its entry for up to
+ANALYSIS_CACHE_LOCK_SEC before loading themselves.
+
+When the shared tier fails, lookups bypass the cache (and load from the
+database) for ANALYSIS_CACHE_REDIS_RETRY_SEC, as the rate limiter does.
+Without the generation there is no safe way to use either tier.
+"""
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from loguru import logger
+
+from apps.api.core.cache import TTLCache
+from apps.api.core.config import get_settings
+
+KEY_PREFIX = "analysis-cache"
+
+# Generations outlive their entries; an expired one only costs misses
+GENERATION_TTL_SEC = 86400
+
+LOCK_POLL_SEC = 0.05
+
+# Entries per process, on top of the byte bound
+MAX_ENTRIES = 10000
+
+
+@dataclass
+class CachedResponse:
+    """An encoded analysis response, or only its ETag when the client's copy is current."""
+
+    etag: str
+    headers: Dict[str, str]  # Cache-Control, X-Next-Cursor
+    content: Optional[bytes] = None  # None: not modified, never cached
+    encoding: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.content or b"")
+
+    def dumps(self) -> bytes:
+        header = orjson.dumps({"etag": self.etag, "headers": self.headers, "encoding": self.encoding})
+        return header + b"\n" + (self.content or b"")
+
+    @classmethod
+    def loads(cls, blob: bytes) -> "CachedResponse":
+        header, _, content = blob.partition(b"\n")
+        return cls(content=content, **orjson.loads(header))
+
+
+# Called with whether it may answer a conditional request without loading
+# the payload (content None); shared loads always need the full payload.
+Loader = Callable[[bool], Awaitable[CachedResponse]]
+
+
+class SharedTierUnavailable(Exception):
+    pass
+
+
+class MemoryStore:
+    """In-process stand-in for the Redis tier, with the subset of its API used here."""
+
+    backend = "memory"
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self._values = TTLCache(MAX_ENTRIES, ttl, max_bytes=max_bytes)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._values.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float, nx: bool = False) -> bool:
+        # No await in between: atomic on the event loop
+        if nx and self._values.get(key) is not None:
+            return False
+        self._values.set(key, value, ttl=ttl)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._values.invalidate(key)
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return self._values.stats()
+
+
+class RedisStore:
+    """The shared tier in Redis."""
+
+    backend = "redis"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis  # optional dependency, loaded when configured
+
+        self._client = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float, nx: bool = False) -> bool:
+        return bool(await self._client.set(key, value, px=max(1, int(ttl * 1000)), nx=nx))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class AnalysisCache:
+    def __init__(self):
+        settings = get_settings()
+        self.enabled = settings.ANALYSIS_CACHE_ENABLED
+        self.ttl = settings.ANALYSIS_CACHE_TTL_SEC
+        self.lock_sec = settings.ANALYSIS_CACHE_LOCK_SEC
+        self._retry_sec = settings.ANALYSIS_CACHE_REDIS_RETRY_SEC
+        max_bytes = int(settings.ANALYSIS_CACHE_MAX_MB * 2**20)
+        self.local = TTLCache(MAX_ENTRIES, self.ttl, max_bytes=max_bytes)
+        self.shared = MemoryStore(max_bytes, self.ttl)
+        if settings.ANALYSIS_CACHE_REDIS_URL:
+            try:
+                self.shared = RedisStore(settings.ANALYSIS_CACHE_REDIS_URL)
+            except ImportError:
+                logger.warning("ANALYSIS_CACHE_REDIS_URL is set but redis is not installed; caching per process")
+        if self.enabled and self.shared.backend == "memory" and settings.JOB_BACKEND != "memory":
+            logger.warning(
+                "Analysis cache disabled: job workers in other processes commit analyses, and without "
+                "Redis (ANALYSIS_CACHE_REDIS_URL) their invalidations would not reach this process"
+            )
+            self.enabled = False
+        self._shared_down_until = 0.0
+        self._inflight: Dict[str, "asyncio.Future[CachedResponse]"] = {}
+        self.lookups = {"local_hits": 0, "shared_hits": 0, "misses": 0, "bypassed": 0}
+        self.loads = 0
+        self.coalesced = 0  # misses that waited for a load in this process
+        self.lock_waits = 0  # misses served by another process's load
+        self.invalidations = 0
+        self.shared_errors = 0
+
+    async def _shared(self, operation: str, *args: Any) -> Any:
+        """Call the shared tier; SharedTierUnavailable while it is failing."""
+        if time.monotonic() < self._shared_down_until:
+            raise SharedTierUnavailable()
+        try:
+            return await getattr(self.shared, operation)(*args)
+        except Exception as e:
+            self.shared_errors += 1
+            self._shared_down_until = time.monotonic() + self._retry_sec
+            logger.warning(f"Analysis cache store unavailable, bypassing the cache for {self._retry_sec:.0f}s: {e}")
+            raise SharedTierUnavailable() from e
+
+    def _generation_key(self, user_id: uuid.UUID) -> str:
+        return f"{KEY_PREFIX}:gen:{user_id}"
+
+    async def _generation(self, user_id: uuid.UUID) -> str:
+        key = self._generation_key(user_id)
+        generation = await self._shared("get", key)
+        if generation is None:
+            generation = uuid.uuid4().hex.encode()
+            if not await self._shared("set", key, generation, GENERATION_TTL_SEC, True):
+                generation = await self._shared("get", key) or generation
+        return generation.decode() if isinstance(generation, bytes) else generation
+
+    async def get_or_load(self, user_id: uuid.UUID, key: str, loader: Loader) -> CachedResponse:
+        """
+        The cached response for the user's ``key``, loaded with ``loader`` on a miss.
+
+        ``key`` must identify the response: endpoint, parameters and content coding.
+        """
+        if not self.enabled:
+            return await loader(True)
+        try:
+            generation = await self._generation(user_id)
+        except SharedTierUnavailable:
+            self.lookups["bypassed"] += 1
+            return await loader(True)
+
+        cache_key = f"{KEY_PREFIX}:{user_id}:{generation}:{key}"
+        entry = self.local.get(cache_key)
+        if entry is not None:
+            self.lookups["local_hits"] += 1
+            return entry
+        try:
+            blob = await self._shared("get", cache_key)
+        except SharedTierUnavailable:
+            blob = None
+        if blob is not None:
+            self.lookups["shared_hits"] += 1
+            entry = CachedResponse.loads(blob)
+            self.local.set(cache_key, entry)
+            return entry
+
+        self.lookups["misses"] += 1
+        future = self._inflight.get(cache_key)
+        if future is None:
+            future = asyncio.ensure_future(self._load(cache_key, loader))
+            self._inflight[cache_key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def _load(self, cache_key: str, loader: Loader) -> CachedResponse:
+        lock_key = f"{cache_key}:lock"
+        try:
+            locked = await self._shared("set", lock_key, b"1", self.lock_sec, True)
+        except SharedTierUnavailable:
+            locked = True
+        if not locked:
+            # Another process is loading it; wait for its entry
+            deadline = time.monotonic() + self.lock_sec
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_SEC)
+                try:
+                    blob = await self._shared("get", cache_key)
+                except SharedTierUnavailable:
+                    break
+                if blob is not None:
+                    self.lock_waits += 1
+                    entry = CachedResponse.loads(blob)
+                    self.local.set(cache_key, entry)
+                    return entry
+
+        try:
+            entry = await loader(False)
+            self.loads += 1
+            self.local.set(cache_key, entry)
+            try:
+                await self._shared("set", cache_key, entry.dumps(), self.ttl)
+            except SharedTierUnavailable:
+                pass
+            return entry
+        finally:
+            if locked:
+                try:
+                    await self._shared("delete", lock_key)
+                except SharedTierUnavailable:
+                    pass
+
+    async def invalidate_user(self, user_id: uuid.UUID) -> None:
+        """Drop every cached response of the user, in all processes."""
+        if not self.enabled:
+            return
+        self.invalidations += 1
+        try:
+            await self._shared("set", self._generation_key(user_id), uuid.uuid4().hex.encode(), GENERATION_TTL_SEC)
+        except SharedTierUnavailable:
+            # Lookups bypass the cache meanwhile; entries stored before expire within the TTL
+            pass
+
+    async def close(self) -> None:
+        await self.shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookups per outcome, hit ratio, loads, and both tiers' sizes and evictions."""
+        hits = self.lookups["local_hits"] + self.lookups["shared_hits"]
+        total = hits + self.lookups["misses"] + self.lookups["bypassed"]
+        return {
+            "enabled": self.enabled,
+            "backend": self.shared.backend,
+            "lookups": dict(self.lookups),
+            "hit_ratio": round(hits / total, 4) if total else 0.0,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "lock_waits": self.lock_waits,
+            "invalidations": self.invalidations,
+            "shared_errors": self.shared_errors,
+            "local": self.local.stats(),
+            "shared": self.shared.stats(),
+        }
+
+
+analysis_cache = AnalysisCache()
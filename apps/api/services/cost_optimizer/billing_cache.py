@@ -0,0 +1,212 @@
+"""
+Cache for provider billing API responses.
+
+Cost Explorer is billed per request and rate limited, and billing data for a
+settled period does not change. Responses are cached per account, period,
+granularity and group-by:
+
+- closed periods, ending before the start of the last settled month
+  (BILLING_CACHE_SETTLE_DAYS after month end), never expire;
+- anything touching the open month expires after BILLING_CACHE_OPEN_TTL_SEC.
+
+Lookups hit a bounded in-process LRU first and then the ``cost_data_cache``
+table, so entries survive restarts and are shared between API replicas and
+job workers. Only data returned by a provider is cached: neither the demo
+data returned on API errors nor anything for providers whose billing API is
+not integrated (their analyzers raise BillingUnsupported, which is passed on
+to the caller).
+"""
+import asyncio
+import hashlib
+import math
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from apps.api.core.cache import TTLCache
+from apps.api.core.config import get_settings
+from apps.api.core.database import AsyncSessionLocal
+from apps.api.core.metrics import observe_provider_request
+from apps.api.models.billing import CloudAccount, CostDataCacheEntry
+from .cloud_providers import BillingUnsupported, default_cost_period, get_analyzer
+
+settings = get_settings()
+
+memory_cache = TTLCache(settings.BILLING_CACHE_MAX_SIZE, settings.BILLING_CACHE_OPEN_TTL_SEC)
+
+# Per-account lookup counts, keyed by cloud account id
+_account_stats: Dict[str, Dict[str, int]] = {}
+
+# Misses being fetched, so concurrent lookups share one billed API call
+_inflight: Dict[str, "asyncio.Future[Dict[str, float]]"] = {}
+
+
+def cache_key(account_id: uuid.UUID, start_date: str, end_date: str, granularity: str, group_by: str) -> str:
+    return hashlib.sha256(
+        "|".join([str(account_id), start_date, end_date, granularity, group_by]).encode()
+    ).hexdigest()
+
+
+def is_closed_period(period_end: date, today: Optional[date] = None) -> bool:
+    """Whether billing data for a period ending (exclusive) on ``period_end`` is final."""
+    settled = (today or datetime.now(timezone.utc).date()) - timedelta(days=settings.BILLING_CACHE_SETTLE_DAYS)
+    return period_end <= settled.replace(day=1)
+
+
+def _stats_for(account_id: uuid.UUID) -> Dict[str, int]:
+    return _account_stats.setdefault(
+        str(account_id), {"memory_hits": 0, "store_hits": 0, "misses": 0, "errors": 0}
+    )
+
+
+async def _load(key: str) -> Optional[Dict[str, float]]:
+    now = datetime.now(timezone.utc)
+    try:
+        async with AsyncSessionLocal() as db:
+            entry = await db.scalar(select(CostDataCacheEntry).where(CostDataCacheEntry.cache_key == key))
+    except SQLAlchemyError as e:
+        logger.warning(f"Billing cache lookup failed: {e}")
+        return None
+
+    if entry is None or (entry.expires_at is not None and entry.expires_at <= now):
+        return None
+    ttl = math.inf if entry.expires_at is None else (entry.expires_at - now).total_seconds()
+    memory_cache.set(key, entry.data, ttl=ttl)
+    return entry.data
+
+
+async def _store(
+    key: str,
+    account_id: uuid.UUID,
+    start_date: str,
+    end_date: str,
+    granularity: str,
+    group_by: str,
+    data: Dict[str, float],
+) -> None:
+    now = datetime.now(timezone.utc)
+    period_end = date.fromisoformat(end_date)
+    if is_closed_period(period_end):
+        ttl, expires_at = math.inf, None
+    else:
+        ttl = settings.BILLING_CACHE_OPEN_TTL_SEC
+        expires_at = now + timedelta(seconds=ttl)
+    memory_cache.set(key, data, ttl=ttl)
+
+    values = {
+        "cache_key": key,
+        "cloud_account_id": account_id,
+        "period_start": date.fromisoformat(start_date),
+        "period_end": period_end,
+        "granularity": granularity,
+        "group_by": group_by,
+        "data": data,
+        "fetched_at": now,
+        "expires_at": expires_at,
+    }
+    stmt = insert(CostDataCacheEntry).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CostDataCacheEntry.cache_key],
+        set_={"data": stmt.excluded.data, "fetched_at": now, "expires_at": expires_at},
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt)
+            await db.commit()
+    except SQLAlchemyError as e:
+        # The account may have been deleted meanwhile; the memory entry still helps
+        logger.warning(f"Billing cache write failed: {e}")
+
+
+async def _fetch(
+    key: str, account: CloudAccount, start_date: str, end_date: str
+) -> Dict[str, float]:
+    analyzer = get_analyzer(account.provider)
+    with observe_provider_request(account.provider, "billing.cost_data"):
+        data = await asyncio.to_thread(
+            analyzer.fetch_cost_data, account.credentials, account.region, start_date, end_date
+        )
+    await _store(
+        key, account.id, start_date, end_date, analyzer.COST_GRANULARITY, analyzer.COST_GROUP_BY, data
+    )
+    return data
+
+
+async def get_cost_data(
+    account: CloudAccount, start_date: Optional[str] = None, end_date: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Cost breakdown of a cloud account for ``start_date``..``end_date``
+    (ISO dates, end exclusive; defaults to the last 30 days).
+
+    On billing API errors, or when the provider reports no spend, the
+    analyzer's demo data is returned (and not cached). Raises
+    BillingUnsupported if the provider's billing API is not integrated.
+    """
+    analyzer = get_analyzer(account.provider)
+    if not start_date or not end_date:
+        start_date, end_date = default_cost_period()
+    key = cache_key(account.id, start_date, end_date, analyzer.COST_GRANULARITY, analyzer.COST_GROUP_BY)
+    stats = _stats_for(account.id)
+
+    data = memory_cache.get(key)
+    if data is not None:
+        stats["memory_hits"] += 1
+    else:
+        data = await _load(key)
+        if data is not None:
+            stats["store_hits"] += 1
+
+    if data is None:
+        stats["misses"] += 1
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(_fetch(key, account, start_date, end_date))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        try:
+            data = await asyncio.shield(future)
+        except BillingUnsupported:
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            logger.error(f"{account.provider} billing API error for account {account.id}: {e}")
+            # Fall back to mock data
+            return dict(analyzer.MOCK_COST_DATA)
+
+    # If no cost data found, return mock data
+    if not data.get("total"):
+        logger.info(f"No {account.provider} cost data found, returning mock data for demo")
+        return dict(analyzer.MOCK_COST_DATA)
+    return dict(data)
+
+
+def account_stats(account_id: uuid.UUID) -> Dict[str, Any]:
+    stats = dict(_stats_for(account_id))
+    lookups = stats["memory_hits"] + stats["store_hits"] + stats["misses"]
+    hits = stats["memory_hits"] + stats["store_hits"]
+    stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+    return stats
+
+
+def stats() -> Dict[str, Any]:
+    """Memory cache counters, lookup totals and hit rates per cloud account."""
+    lookups: Dict[str, int] = {}
+    for counts in list(_account_stats.values()):
+        for result, count in counts.items():
+            lookups[result] = lookups.get(result, 0) + count
+    return {
+        "memory": memory_cache.stats(),
+        "lookups": lookups,
+        "accounts": {account_id: account_stats(account_id) for account_id in list(_account_stats)},
+    }
+
+
+def forget_account(account_id: uuid.UUID) -> None:
+    """Drop the stats of a deleted account. Persisted entries go with the row (ON DELETE CASCADE)."""
+    _account_stats.pop(str(account_id), None)
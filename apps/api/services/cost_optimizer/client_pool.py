@@ -0,0 +1,103 @@
+"""
+Pool of provider SDK sessions, clients and credentials per cloud account.
+
+Building a boto3 session and its clients, an Azure ClientSecretCredential
+(whose first request fetches a new AAD token) or GCP credentials from the
+service-account JSON is a measurable share of sync latency. They are built
+once per account and reused until the entry expires
+(PROVIDER_CLIENT_POOL_TTL_SEC) or the account is deleted. OAuth tokens live
+inside the credential objects, which refresh them when they expire, so
+reusing the object reuses the token.
+
+Analyzers only see an account's credentials, so entries are keyed by
+provider and a fingerprint of the credentials; rotated credentials get a new
+entry and the old one ages out.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+from apps.api.core.cache import TTLCache
+from apps.api.core.config import get_settings
+
+T = TypeVar("T")
+
+
+class _AccountClients:
+    __slots__ = ("objects", "lock")
+
+    def __init__(self):
+        self.objects: Dict[Hashable, Any] = {}
+        # Reentrant: a client factory may fetch the account's session first
+        self.lock = threading.RLock()
+
+
+class ProviderClientPool:
+    """Per-account cache of SDK objects with creation/reuse counters."""
+
+    def __init__(self, max_accounts: int, ttl: float):
+        self._accounts = TTLCache(max_accounts, ttl)
+        self._lock = threading.Lock()
+        self.created: Dict[str, int] = {}
+        self.reused: Dict[str, int] = {}
+
+    @staticmethod
+    def account_key(provider: str, credentials: Dict[str, Any]) -> Tuple[str, str]:
+        fingerprint = hashlib.sha256(
+            json.dumps(credentials, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return provider, fingerprint
+
+    def get(
+        self, provider: str, credentials: Dict[str, Any], name: Tuple[Hashable, ...], factory: Callable[[], T]
+    ) -> T:
+        """
+        Return the account's object called ``name``, building it with ``factory`` if needed.
+
+        ``name[0]`` is the kind reported in the metrics (``session``,
+        ``client``, ``credential``...). Factories run under the account's lock:
+        boto3 sessions are not thread-safe, and concurrent callers should share
+        one credential and token fetch.
+        """
+        key = self.account_key(provider, credentials)
+        with self._lock:
+            entry = self._accounts.get(key)
+            if entry is None:
+                entry = _AccountClients()
+                self._accounts.set(key, entry)
+
+        counter = f"{provider.lower()}.{name[0]}"
+        with entry.lock:
+            obj = entry.objects.get(name)
+            created = obj is None
+            if created:
+                obj = factory()
+                entry.objects[name] = obj
+
+        with self._lock:
+            counts = self.created if created else self.reused
+            counts[counter] = counts.get(counter, 0) + 1
+        return obj
+
+    def evict(self, provider: str, credentials: Dict[str, Any]) -> None:
+        """Drop everything pooled for an account, e.g. once it is deleted."""
+        self._accounts.invalidate(self.account_key(provider, credentials))
+
+    def clear(self) -> None:
+        self._accounts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "accounts": self._accounts.stats(),
+                "created": dict(self.created),
+                "reused": dict(self.reused),
+            }
+
+
+settings = get_settings()
+
+client_pool = ProviderClientPool(
+    settings.PROVIDER_CLIENT_POOL_MAX_ACCOUNTS, settings.PROVIDER_CLIENT_POOL_TTL_SEC
+)
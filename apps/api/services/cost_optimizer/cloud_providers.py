@@ -1,486 +1,54 @@
 """
-Cloud provider-specific cost analyzers with real API integrations.
+Cloud provider registry and helpers shared by the provider analyzers.
+
+Each provider's analyzer lives in ``providers/<name>.py`` together with its
+SDK imports. ``get_analyzer`` imports a provider module the first time it is
+asked for, so an API worker that never talks to AWS never loads boto3. With
+CLOUD_PROVIDER_BACKEND=fake every provider is simulated instead (see
+``providers/fake.py``).
 """
-from typing import Dict, Any, List
+import importlib
+from typing import Dict, Any, Tuple
 from datetime import datetime, timedelta
-import boto3
-from botocore.exceptions import ClientError, BotoCoreError
-from loguru import logger
-
-
-class AWSCostAnalyzer:
-    """AWS Cost Explorer and resource analyzer."""
-
-    @staticmethod
-    def fetch_resources(credentials: Dict[str, Any], region: str) -> List[Dict[str, Any]]:
-        """
-        Fetch AWS resources using boto3.
-
-        Supports multiple resource types:
-        - EC2 instances
-        - RDS databases
-        - S3 buckets
-        - EBS volumes
-        - Lambda functions
-        """
-        try:
-            # Create boto3 session with credentials
-            session = boto3.Session(
-                aws_access_key_id=credentials.get("access_key_id"),
-                aws_secret_access_key=credentials.get("secret_access_key"),
-                region_name=region or "us-east-1"
-            )
-
-            resources = []
-
-            # Fetch EC2 instances
-            try:
-                ec2 = session.client('ec2')
-                instances_response = ec2.describe_instances()
-                for reservation in instances_response.get('Reservations', []):
-                    for instance in reservation.get('Instances', []):
-                        resources.append({
-                            "id": instance['InstanceId'],
-                            "type": "EC2",
-                            "name": next((tag['Value'] for tag in instance.get('Tags', []) if tag['Key'] == 'Name'), instance['InstanceId']),
-                            "instance_type": instance.get('InstanceType'),
-                            "state": instance['State']['Name'],
-                            "region": region,
-                        })
-            except Exception as e:
-                logger.warning(f"Failed to fetch EC2 instances: {e}")
-
-            # Fetch RDS instances
-            try:
-                rds = session.client('rds')
-                db_response = rds.describe_db_instances()
-                for db in db_response.get('DBInstances', []):
-                    resources.append({
-                        "id": db['DBInstanceIdentifier'],
-                        "type": "RDS",
-                        "name": db['DBInstanceIdentifier'],
-                        "instance_type": db.get('DBInstanceClass'),
-                        "engine": db.get('Engine'),
-                        "region": region,
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch RDS instances: {e}")
-
-            # Fetch S3 buckets (global)
-            try:
-                s3 = session.client('s3')
-                buckets_response = s3.list_buckets()
-                for bucket in buckets_response.get('Buckets', []):
-                    resources.append({
-                        "id": bucket['Name'],
-                        "type": "S3",
-                        "name": bucket['Name'],
-                        "region": "global",
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch S3 buckets: {e}")
-
-            # Fetch EBS volumes
-            try:
-                ec2 = session.client('ec2')
-                volumes_response = ec2.describe_volumes()
-                for volume in volumes_response.get('Volumes', []):
-                    resources.append({
-                        "id": volume['VolumeId'],
-                        "type": "EBS",
-                        "name": next((tag['Value'] for tag in volume.get('Tags', []) if tag['Key'] == 'Name'), volume['VolumeId']),
-                        "size": volume.get('Size'),
-                        "state": volume['State'],
-                        "region": region,
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch EBS volumes: {e}")
-
-            # If no resources found, return mock data for demo purposes
-            if not resources:
-                logger.info("No AWS resources found, returning mock data for demo")
-                from .engine import CostOptimizerEngine
-                return CostOptimizerEngine.generate_mock_resources("AWS", count=25)
-
-            return resources
-
-        except (ClientError, BotoCoreError) as e:
-            logger.error(f"AWS API error: {e}")
-            # Fall back to mock data if credentials are invalid
-            from .engine import CostOptimizerEngine
-            return CostOptimizerEngine.generate_mock_resources("AWS", count=25)
-
-    @staticmethod
-    def get_cost_data(credentials: Dict[str, Any], start_date: str, end_date: str) -> Dict[str, float]:
-        """
-        Fetch actual cost data from AWS Cost Explorer API.
-        """
-        try:
-            # Create boto3 session with credentials
-            session = boto3.Session(
-                aws_access_key_id=credentials.get("access_key_id"),
-                aws_secret_access_key=credentials.get("secret_access_key"),
-            )
-
-            ce = session.client('ce', region_name='us-east-1')
-
-            # Calculate date range (last 30 days if not specified)
-            if not start_date or not end_date:
-                end = datetime.now()
-                start = end - timedelta(days=30)
-                start_date = start.strftime('%Y-%m-%d')
-                end_date = end.strftime('%Y-%m-%d')
-
-            # Get cost by service
-            response = ce.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date,
-                    'End': end_date
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {
-                        'Type': 'DIMENSION',
-                        'Key': 'SERVICE'
-                    }
-                ]
-            )
-
-            # Parse response and categorize costs
-            cost_breakdown = {
-                "compute": 0.0,
-                "storage": 0.0,
-                "network": 0.0,
-                "database": 0.0,
-                "other": 0.0,
-            }
-
-            for result in response.get('ResultsByTime', []):
-                for group in result.get('Groups', []):
-                    service = group['Keys'][0]
-                    amount = float(group['Metrics']['UnblendedCost']['Amount'])
-
-                    # Categorize services
-                    if service in ['Amazon Elastic Compute Cloud - Compute', 'AWS Lambda']:
-                        cost_breakdown["compute"] += amount
-                    elif service in ['Amazon Simple Storage Service', 'Amazon Elastic Block Store']:
-                        cost_breakdown["storage"] += amount
-                    elif service in ['Amazon Virtual Private Cloud', 'Amazon CloudFront']:
-                        cost_breakdown["network"] += amount
-                    elif service in ['Amazon Relational Database Service', 'Amazon DynamoDB']:
-                        cost_breakdown["database"] += amount
-                    else:
-                        cost_breakdown["other"] += amount
-
-            # Calculate total
-            cost_breakdown["total"] = sum(v for k, v in cost_breakdown.items() if k != "total")
-
-            # If no cost data found, return mock data
-            if cost_breakdown["total"] == 0:
-                logger.info("No AWS cost data found, returning mock data for demo")
-                return {
-                    "total": 3500.50,
-                    "compute": 1800.25,
-                    "storage": 900.15,
-                    "network": 500.10,
-                    "database": 250.00,
-                    "other": 50.00,
-                }
-
-            return cost_breakdown
-
-        except (ClientError, BotoCoreError) as e:
-            logger.error(f"AWS Cost Explorer API error: {e}")
-            # Fall back to mock data
-            return {
-                "total": 3500.50,
-                "compute": 1800.25,
-                "storage": 900.15,
-                "network": 500.10,
-                "database": 250.00,
-                "other": 50.00,
-            }
-
-
-class GCPCostAnalyzer:
-    """Google Cloud Platform cost analyzer."""
-
-    @staticmethod
-    def fetch_resources(credentials: Dict[str, Any], project_id: str) -> List[Dict[str, Any]]:
-        """
-        Fetch GCP resources using Google Cloud SDK.
-
-        Supports:
-        - Compute Engine instances
-        - Cloud Storage buckets
-        - Cloud SQL instances
-        - Persistent disks
-        """
-        try:
-            from google.cloud import compute_v1
-            from google.cloud import storage
-            from google.oauth2 import service_account
-            import json
-
-            # Parse service account credentials
-            if isinstance(credentials.get("service_account_json"), str):
-                creds_dict = json.loads(credentials["service_account_json"])
-            else:
-                creds_dict = credentials.get("service_account_json")
-
-            creds = service_account.Credentials.from_service_account_info(creds_dict)
-
-            resources = []
-
-            # Fetch Compute Engine instances
-            try:
-                instances_client = compute_v1.InstancesClient(credentials=creds)
-                aggregated_list = instances_client.aggregated_list(project=project_id)
-                for zone, response in aggregated_list:
-                    if response.instances:
-                        for instance in response.instances:
-                            resources.append({
-                                "id": instance.id,
-                                "type": "Compute Engine",
-                                "name": instance.name,
-                                "machine_type": instance.machine_type.split('/')[-1],
-                                "status": instance.status,
-                                "zone": zone.split('/')[-1],
-                            })
-            except Exception as e:
-                logger.warning(f"Failed to fetch GCP Compute instances: {e}")
-
-            # Fetch Cloud Storage buckets
-            try:
-                storage_client = storage.Client(credentials=creds, project=project_id)
-                buckets = storage_client.list_buckets()
-                for bucket in buckets:
-                    resources.append({
-                        "id": bucket.name,
-                        "type": "Cloud Storage",
-                        "name": bucket.name,
-                        "location": bucket.location,
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch GCP Storage buckets: {e}")
-
-            # If no resources found, return mock data for demo purposes
-            if not resources:
-                logger.info("No GCP resources found, returning mock data for demo")
-                from .engine import CostOptimizerEngine
-                return CostOptimizerEngine.generate_mock_resources("GCP", count=20)
-
-            return resources
-
-        except Exception as e:
-            logger.error(f"GCP API error: {e}")
-            # Fall back to mock data if credentials are invalid
-            from .engine import CostOptimizerEngine
-            return CostOptimizerEngine.generate_mock_resources("GCP", count=20)
-
-    @staticmethod
-    def get_cost_data(credentials: Dict[str, Any], project_id: str) -> Dict[str, float]:
-        """
-        Fetch GCP billing data using Cloud Billing API.
-
-        Note: GCP billing data typically requires BigQuery export setup.
-        This implementation uses the Cloud Billing API for basic cost data.
-        """
-        try:
-            from google.cloud import billing_v1
-            from google.oauth2 import service_account
-            import json
-
-            # Parse service account credentials
-            if isinstance(credentials.get("service_account_json"), str):
-                creds_dict = json.loads(credentials["service_account_json"])
-            else:
-                creds_dict = credentials.get("service_account_json")
-
-            creds = service_account.Credentials.from_service_account_info(creds_dict)
-
-            # For production, you would query BigQuery export of billing data
-            # or use Cloud Billing Catalog API for pricing information
-            # For now, we'll return mock data as billing API requires complex setup
-
-            logger.info("GCP billing data requires BigQuery export, returning mock data for demo")
-            return {
-                "total": 2800.75,
-                "compute": 1500.50,
-                "storage": 700.25,
-                "network": 400.00,
-                "database": 180.00,
-                "other": 20.00,
-            }
-
-        except Exception as e:
-            logger.error(f"GCP Billing API error: {e}")
-            # Fall back to mock data
-            return {
-                "total": 2800.75,
-                "compute": 1500.50,
-                "storage": 700.25,
-                "network": 400.00,
-                "database": 180.00,
-                "other": 20.00,
-            }
-
-
-class AzureCostAnalyzer:
-    """Microsoft Azure cost analyzer."""
-
-    @staticmethod
-    def fetch_resources(credentials: Dict[str, Any], subscription_id: str) -> List[Dict[str, Any]]:
-        """
-        Fetch Azure resources using Azure SDK.
-
-        Supports:
-        - Virtual Machines
-        - Storage Accounts
-        - SQL Databases
-        - App Services
-        """
-        try:
-            from azure.identity import ClientSecretCredential
-            from azure.mgmt.compute import ComputeManagementClient
-            from azure.mgmt.storage import StorageManagementClient
-            from azure.mgmt.sql import SqlManagementClient
-
-            # Create credential
-            credential = ClientSecretCredential(
-                tenant_id=credentials.get("tenant_id"),
-                client_id=credentials.get("client_id"),
-                client_secret=credentials.get("client_secret"),
-            )
-
-            resources = []
-
-            # Fetch Virtual Machines
-            try:
-                compute_client = ComputeManagementClient(credential, subscription_id)
-                vms = compute_client.virtual_machines.list_all()
-                for vm in vms:
-                    resources.append({
-                        "id": vm.id,
-                        "type": "Virtual Machine",
-                        "name": vm.name,
-                        "vm_size": vm.hardware_profile.vm_size if vm.hardware_profile else None,
-                        "location": vm.location,
-                        "status": "running",  # Would need additional call to get actual status
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch Azure VMs: {e}")
-
-            # Fetch Storage Accounts
-            try:
-                storage_client = StorageManagementClient(credential, subscription_id)
-                storage_accounts = storage_client.storage_accounts.list()
-                for account in storage_accounts:
-                    resources.append({
-                        "id": account.id,
-                        "type": "Storage Account",
-                        "name": account.name,
-                        "location": account.location,
-                        "sku": account.sku.name if account.sku else None,
-                    })
-            except Exception as e:
-                logger.warning(f"Failed to fetch Azure Storage accounts: {e}")
-
-            # Fetch SQL Databases
-            try:
-                sql_client = SqlManagementClient(credential, subscription_id)
-                servers = sql_client.servers.list()
-                for server in servers:
-                    databases = sql_client.databases.list_by_server(
-                        resource_group_name=server.id.split('/')[4],
-                        server_name=server.name
-                    )
-                    for db in databases:
-                        if db.name != "master":  # Skip master database
-                            resources.append({
-                                "id": db.id,
-                                "type": "SQL Database",
-                                "name": db.name,
-                                "server": server.name,
-                                "location": db.location,
-                            })
-            except Exception as e:
-                logger.warning(f"Failed to fetch Azure SQL databases: {e}")
-
-            # If no resources found, return mock data for demo purposes
-            if not resources:
-                logger.info("No Azure resources found, returning mock data for demo")
-                from .engine import CostOptimizerEngine
-                return CostOptimizerEngine.generate_mock_resources("AZURE", count=18)
-
-            return resources
 
-        except Exception as e:
-            logger.error(f"Azure API error: {e}")
-            # Fall back to mock data if credentials are invalid
-            from .engine import CostOptimizerEngine
-            return CostOptimizerEngine.generate_mock_resources("AZURE", count=18)
+from apps.api.core.config import get_settings
 
-    @staticmethod
-    def get_cost_data(credentials: Dict[str, Any], subscription_id: str) -> Dict[str, float]:
-        """
-        Fetch Azure cost data using Cost Management API.
-        """
-        try:
-            from azure.identity import ClientSecretCredential
-            from azure.mgmt.costmanagement import CostManagementClient
-            from azure.mgmt.costmanagement.models import QueryDefinition, TimeframeType, QueryTimePeriod, QueryDataset, QueryAggregation
-            from datetime import datetime, timedelta
 
-            # Create credential
-            credential = ClientSecretCredential(
-                tenant_id=credentials.get("tenant_id"),
-                client_id=credentials.get("client_id"),
-                client_secret=credentials.get("client_secret"),
-            )
+def default_cost_period(days: int = 30) -> Tuple[str, str]:
+    """Default billing period: the last ``days`` days, as ISO dates."""
+    end = datetime.now()
+    start = end - timedelta(days=days)
+    return start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')
 
-            cost_client = CostManagementClient(credential)
 
-            # Define time period (last 30 days)
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
+# (ISO day, service, category, amount)
+DailyCost = Tuple[str, str, str, float]
 
-            # Query cost data
-            scope = f"/subscriptions/{subscription_id}"
 
-            # Note: Azure Cost Management API has specific requirements
-            # For a production implementation, you would use QueryDefinition properly
-            # For now, we'll return mock data as the API requires proper setup
+class BillingUnsupported(Exception):
+    """The provider's billing integration cannot answer this query; nothing should be stored."""
 
-            logger.info("Azure Cost Management API requires proper setup, returning mock data for demo")
-            return {
-                "total": 3200.00,
-                "compute": 1700.00,
-                "storage": 800.00,
-                "network": 450.00,
-                "database": 220.00,
-                "other": 30.00,
-            }
 
-        except Exception as e:
-            logger.error(f"Azure Cost Management API error: {e}")
-            # Fall back to mock data
-            return {
-                "total": 3200.00,
-                "compute": 1700.00,
-                "storage": 800.00,
-                "network": 450.00,
-                "database": 220.00,
-                "other": 30.00,
-            }
+# Provider -> (module, analyzer class)
+ANALYZERS: Dict[str, Tuple[str, str]] = {
+    "AWS": ("apps.api.services.cost_optimizer.providers.aws", "AWSCostAnalyzer"),
+    "GCP": ("apps.api.services.cost_optimizer.providers.gcp", "GCPCostAnalyzer"),
+    "AZURE": ("apps.api.services.cost_optimizer.providers.azure", "AzureCostAnalyzer"),
+}
 
 
 def get_analyzer(provider: str):
-    """Get the appropriate cost analyzer for a cloud provider."""
-    analyzers = {
-        "AWS": AWSCostAnalyzer,
-        "GCP": GCPCostAnalyzer,
-        "AZURE": AzureCostAnalyzer,
-    }
-    return analyzers.get(provider, AWSCostAnalyzer)
+    """Get the appropriate cost analyzer for a cloud provider, importing it on first use."""
+    if get_settings().CLOUD_PROVIDER_BACKEND == "fake":
+        from .providers.fake import get_fake_analyzer
+        return get_fake_analyzer(provider)
+    module, name = ANALYZERS.get(provider, ANALYZERS["AWS"])
+    return getattr(importlib.import_module(module), name)
+
+
+def __getattr__(name: str) -> Any:
+    # ``from .cloud_providers import AWSCostAnalyzer`` keeps working, lazily
+    for provider, (_, analyzer) in ANALYZERS.items():
+        if analyzer == name:
+            return get_analyzer(provider)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,205 @@
+"""
+Daily cost time series.
+
+Provider billing data is ingested into the append-only ``daily_costs`` fact
+table (one row per account, day and service, partitioned by month) so trends
+are read from stored facts instead of being recomputed from billing APIs.
+
+``cost_fact_days`` records every ingested day, including days without any
+spend. A backfill compares the window it should cover against that ledger
+and only requests the missing days, merged into a few contiguous ranges so
+each range is one batched billing API request. Days younger than
+COST_FACTS_SETTLE_DAYS are left alone because providers still revise them.
+Providers whose analyzer has ``SUPPORTS_DAILY_COSTS = False`` are skipped
+and have no daily cost series; their ledger stays empty so the days are
+fetched once the integration exists.
+"""
+import asyncio
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.core.config import get_settings
+from apps.api.core.database import AsyncSessionLocal
+from apps.api.core.metrics import observe_provider_request
+from apps.api.models.billing import CloudAccount
+from apps.api.models.cost_facts import CostFactDay, DailyCost
+from .cloud_providers import get_analyzer
+
+INSERT_CHUNK_SIZE = 1000
+
+GROUP_BY_COLUMNS = {
+    "category": DailyCost.category,
+    "service": DailyCost.service,
+}
+
+
+@dataclass
+class BackfillResult:
+    missing_days: int = 0
+    requests: int = 0
+    rows: int = 0
+    complete: bool = True  # False if a billing request failed; the gap is retried next time
+    supported: bool = True  # False if the provider has no daily costs; nothing was fetched
+
+
+def missing_ranges(
+    missing: Iterable[date], max_span_days: int, merge_gap_days: int
+) -> List[Tuple[date, date]]:
+    """
+    Group missing days into ``[start, end)`` ranges for batched requests.
+
+    Ranges separated by at most ``merge_gap_days`` ingested days are merged
+    (re-fetching a few known days is cheaper than another request), and no
+    range spans more than ``max_span_days``.
+    """
+    ranges: List[Tuple[date, date]] = []
+    for day in sorted(missing):
+        if ranges:
+            start, end = ranges[-1]
+            if (day - end).days <= merge_gap_days and (day - start).days < max_span_days:
+                ranges[-1] = (start, day + timedelta(days=1))
+                continue
+        ranges.append((day, day + timedelta(days=1)))
+    return ranges
+
+
+def supports_daily_costs(provider: str) -> bool:
+    """Whether daily costs can be fetched for ``provider``'s accounts."""
+    return get_analyzer(provider).SUPPORTS_DAILY_COSTS
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+async def ensure_partitions(db: AsyncSession, start: date, end: date) -> None:
+    """Create the monthly daily_costs partitions covering ``[start, end)``."""
+    # Serialize partition creation between workers
+    await db.execute(text("SELECT pg_advisory_xact_lock(hashtext('daily_costs_partitions'))"))
+    month = _month_start(start)
+    while month < end:
+        following = _next_month(month)
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS daily_costs_y{month:%Y}m{month:%m} "
+            f"PARTITION OF daily_costs FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        ))
+        month = following
+
+
+async def _ingest_range(
+    account_id: uuid.UUID, start: date, end: date, facts: List[Tuple[str, str, str, float]]
+) -> int:
+    """Store the facts of one fetched range and mark all its days ingested."""
+    rows: Dict[Tuple[date, str], Dict[str, Any]] = {}
+    for day, service, category, amount in facts:
+        usage_date = date.fromisoformat(day)
+        entry = rows.setdefault((usage_date, service), {
+            "cloud_account_id": account_id,
+            "usage_date": usage_date,
+            "service": service,
+            "category": category,
+            "amount": 0.0,
+        })
+        entry["amount"] += amount
+
+    days = [
+        {"cloud_account_id": account_id, "usage_date": start + timedelta(days=offset)}
+        for offset in range((end - start).days)
+    ]
+
+    async with AsyncSessionLocal() as db:
+        await ensure_partitions(db, start, end)
+        values = list(rows.values())
+        inserted = 0
+        for offset in range(0, len(values), INSERT_CHUNK_SIZE):
+            # Append-only: days already ingested (inside a merged range) keep their rows
+            result = await db.execute(
+                insert(DailyCost)
+                .values(values[offset:offset + INSERT_CHUNK_SIZE])
+                .on_conflict_do_nothing()
+            )
+            inserted += result.rowcount
+        await db.execute(insert(CostFactDay).values(days).on_conflict_do_nothing())
+        await db.commit()
+    return inserted
+
+
+async def backfill_daily_costs(account: CloudAccount, days: Optional[int] = None) -> BackfillResult:
+    """Fetch and store the missing settled days of the last ``days`` days."""
+    if not supports_daily_costs(account.provider):
+        return BackfillResult(complete=False, supported=False)
+
+    settings = get_settings()
+    today = datetime.now(timezone.utc).date()
+    window_end = today - timedelta(days=settings.COST_FACTS_SETTLE_DAYS - 1)  # exclusive
+    window_start = today - timedelta(days=days or settings.COST_FACTS_BACKFILL_DAYS)
+
+    async with AsyncSessionLocal() as db:
+        ingested = set(await db.scalars(
+            select(CostFactDay.usage_date).where(
+                CostFactDay.cloud_account_id == account.id,
+                CostFactDay.usage_date >= window_start,
+                CostFactDay.usage_date < window_end,
+            )
+        ))
+
+    missing = [
+        window_start + timedelta(days=offset)
+        for offset in range((window_end - window_start).days)
+        if window_start + timedelta(days=offset) not in ingested
+    ]
+    result = BackfillResult(missing_days=len(missing))
+    analyzer = get_analyzer(account.provider)
+
+    for start, end in missing_ranges(
+        missing, settings.COST_FACTS_MAX_RANGE_DAYS, settings.COST_FACTS_MERGE_GAP_DAYS
+    ):
+        result.requests += 1
+        try:
+            with observe_provider_request(account.provider, "billing.daily_costs"):
+                facts = await asyncio.to_thread(
+                    lambda: list(analyzer.fetch_daily_costs(
+                        account.credentials, account.region, start.isoformat(), end.isoformat()
+                    ))
+                )
+        except Exception as e:
+            logger.warning(f"Daily cost backfill for account {account.id} stopped at {start}: {e}")
+            result.complete = False
+            break
+        result.rows += await _ingest_range(account.id, start, end, facts)
+
+    if missing:
+        logger.info(
+            f"Backfilled {result.missing_days} days of costs for account {account.id} "
+            f"in {result.requests} requests ({result.rows} rows)"
+        )
+    return result
+
+
+async def daily_cost_series(
+    db: AsyncSession, account_id: uuid.UUID, start: date, end: date, group_by: str = "category"
+) -> List[Dict[str, Any]]:
+    """Daily totals per category or service for ``[start, end)``, oldest first."""
+    column = GROUP_BY_COLUMNS[group_by]
+    result = await db.execute(
+        select(DailyCost.usage_date, column, func.sum(DailyCost.amount))
+        .where(
+            DailyCost.cloud_account_id == account_id,
+            DailyCost.usage_date >= start,
+            DailyCost.usage_date < end,
+        )
+        .group_by(DailyCost.usage_date, column)
+        .order_by(DailyCost.usage_date, column)
+    )
+    return [{"date": day, "key": key, "amount": amount} for day, key, amount in result]
@@ -0,0 +1,103 @@
+"""
+Bulk persistence for analysis results.
+
+Recommendations are written with a multi-row ``INSERT ... RETURNING`` for
+ordinary batches and with asyncpg's binary ``COPY`` once a batch is large
+enough for the per-statement overhead to matter. Rows are built in memory
+with client-side ids and timestamps, so callers can build API responses
+from the returned rows without reading them back.
+"""
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.models.billing import CostRecommendation
+
+# Batches at or above this size go through COPY on asyncpg connections.
+COPY_THRESHOLD = 2000
+
+_table = CostRecommendation.__table__
+
+# Database column names in COPY order. ``recommendation_metadata`` is stored
+# in the ``metadata`` column, so the table columns are used rather than the
+# mapped attribute names.
+_COPY_COLUMNS = [column.name for column in _table.columns]
+
+
+def build_recommendation_rows(
+    cost_analysis_id: uuid.UUID, recommendations: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """Turn engine recommendations into rows keyed by mapped attribute name."""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": uuid.uuid4(),
+            "cost_analysis_id": cost_analysis_id,
+            "resource_type": rec["resource_type"],
+            "resource_id": str(rec["resource_id"]),  # GCP instance ids are integers
+            "recommendation_type": rec["recommendation_type"],
+            "title": rec["title"],
+            "description": rec["description"],
+            "current_cost": rec["current_cost"],
+            "estimated_new_cost": rec["estimated_new_cost"],
+            "monthly_savings": rec["monthly_savings"],
+            "annual_savings": rec["annual_savings"],
+            "priority": rec["priority"],
+            "implementation_effort": rec["implementation_effort"],
+            "status": rec.get("status", "PENDING"),
+            "recommendation_metadata": rec.get("metadata") or {},
+            "created_at": now,
+        }
+        for rec in recommendations
+    ]
+
+
+async def _insert_returning(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    result = await db.execute(
+        insert(CostRecommendation).returning(CostRecommendation.id), rows
+    )
+    return len(result.all())
+
+
+async def _copy_records(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+
+    records = []
+    for row in rows:
+        values = dict(row)
+        values["metadata"] = json.dumps(values.pop("recommendation_metadata"))
+        records.append(tuple(values[name] for name in _COPY_COLUMNS))
+
+    await raw.driver_connection.copy_records_to_table(
+        _table.name, records=records, columns=_COPY_COLUMNS
+    )
+    return len(records)
+
+
+async def save_recommendations(
+    db: AsyncSession, cost_analysis_id: uuid.UUID, recommendations: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Insert a batch of engine recommendations for an analysis.
+
+    Runs inside the caller's transaction. Returns the rows as written.
+    """
+    if not recommendations:
+        return []
+
+    rows = build_recommendation_rows(cost_analysis_id, recommendations)
+    if len(rows) >= COPY_THRESHOLD and db.bind.dialect.driver == "asyncpg":
+        written = await _copy_records(db, rows)
+    else:
+        written = await _insert_returning(db, rows)
+
+    if written != len(rows):
+        raise RuntimeError(
+            f"Expected to write {len(rows)} recommendations, wrote {written}"
+        )
+    return rows
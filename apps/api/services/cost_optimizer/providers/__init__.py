@@ -0,0 +1,4 @@
+"""
+Provider analyzers, one module per cloud. Import them through
+``cloud_providers.get_analyzer`` so their SDKs load on first use.
+"""
@@ -0,0 +1,196 @@
+"""
+Simulated cloud provider backend for load tests and offline development.
+
+With CLOUD_PROVIDER_BACKEND=fake, ``get_analyzer`` returns a FakeCostAnalyzer
+for every provider instead of the SDK-backed analyzers, and inventory syncs
+are always full (there is no change feed). Nothing leaves the process, but
+the fake behaves like a slow, paginated, rate-limited API:
+
+- every page and billing request waits for a latency drawn around
+  FAKE_PROVIDER_LATENCY_MS (lognormal, so there is a long tail)
+- inventories come from synthetic.py, listed one resource type at a time
+  and paginated with the page sizes of the real APIs
+- a request is throttled with probability FAKE_PROVIDER_THROTTLE_RATE and
+  retried with jittered exponential backoff, as the SDK retry modes do; one
+  still throttled after FAKE_PROVIDER_MAX_ATTEMPTS fails its listing, which
+  is reported in ``errors`` like a real enumeration failure
+- an account has FAKE_PROVIDER_RESOURCES resources, or
+  ``credentials["resource_count"]``. Its inventory is seeded by
+  ``credentials["seed"]`` (default: the credentials themselves), so every
+  sync of the account lists the same resources, and its billing data is
+  priced from that inventory.
+"""
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from apps.api.core.config import get_settings
+from apps.api.core.metrics import observe_provider_request
+from ..cloud_providers import DailyCost
+from ..synthetic import CATALOG, ResourceKind, SyntheticInventory
+
+# Backoff before the first retry of a throttled request; doubles per attempt
+RETRY_BACKOFF_SEC = 0.1
+
+# Days of daily costs per billing page
+DAILY_COSTS_PAGE_DAYS = 30
+
+
+class FakeThrottlingError(Exception):
+    """The simulated API rejected a request for exceeding its rate limit."""
+
+
+# Resources per listing page; types not listed here use DEFAULT_PAGE_SIZE
+PAGE_SIZES: Dict[str, Optional[int]] = {
+    "S3 Bucket": None,  # ListBuckets returns every bucket in one response
+    "Compute Engine Instance": 500,
+    "RDS Database": 100,
+    "SQL Database": 100,
+    "Cloud SQL": 100,
+}
+DEFAULT_PAGE_SIZE = 1000
+
+# Demo cost breakdown returned when billing stays throttled
+MOCK_COST_DATA: Dict[str, Dict[str, float]] = {
+    "AWS": {"total": 3500.50, "compute": 1800.25, "storage": 900.15, "network": 500.10, "database": 250.00,
+            "other": 50.00},
+    "GCP": {"total": 2800.75, "compute": 1500.50, "storage": 700.25, "network": 400.00, "database": 180.00,
+            "other": 20.00},
+    "AZURE": {"total": 3200.00, "compute": 1700.00, "storage": 800.00, "network": 450.00, "database": 220.00,
+              "other": 30.00},
+}
+
+_stats = {"requests": 0, "throttled": 0, "failed": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def stats() -> Dict[str, int]:
+    """Simulated requests, throttled attempts and requests that failed after retries."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _request() -> None:
+    """One simulated API request: wait out its latency, retrying throttled attempts."""
+    settings = get_settings()
+    attempts = max(1, settings.FAKE_PROVIDER_MAX_ATTEMPTS)
+    for attempt in range(attempts):
+        _count("requests")
+        if settings.FAKE_PROVIDER_LATENCY_MS > 0:
+            time.sleep(random.lognormvariate(math.log(settings.FAKE_PROVIDER_LATENCY_MS / 1000), 0.5))
+        if random.random() >= settings.FAKE_PROVIDER_THROTTLE_RATE:
+            return
+        _count("throttled")
+        if attempt + 1 < attempts:
+            time.sleep(random.uniform(0, RETRY_BACKOFF_SEC * 2 ** attempt))
+    _count("failed")
+    raise FakeThrottlingError(f"Rate exceeded after {attempts} attempts")
+
+
+def _seed(credentials: Dict[str, Any]) -> str:
+    seed = credentials.get("seed")
+    if seed is None:
+        seed = hashlib.sha256(json.dumps(credentials, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return str(seed)
+
+
+class FakeCostAnalyzer:
+    """Simulated analyzer for one provider, with the interface of the real ones."""
+
+    COST_GRANULARITY = "MONTHLY"
+    COST_GROUP_BY = "SERVICE"
+    SUPPORTS_DAILY_COSTS = True
+
+    def __init__(self, provider: str):
+        self.provider = provider if provider in CATALOG else "AWS"
+        self.MOCK_COST_DATA = dict(MOCK_COST_DATA[self.provider])
+
+    def inventory(self, credentials: Dict[str, Any], scope: Optional[str] = None) -> SyntheticInventory:
+        """The account's synthetic inventory."""
+        count = int(credentials.get("resource_count", get_settings().FAKE_PROVIDER_RESOURCES))
+        regions = None
+        # AWS scopes are region specs; GCP projects and Azure subscriptions span every region
+        if self.provider == "AWS" and scope and scope.strip().lower() not in ("all", "*"):
+            regions = [region.strip() for region in scope.split(",") if region.strip()]
+        return SyntheticInventory(self.provider, count, _seed(credentials), regions=regions)
+
+    def iter_resources(
+        self, credentials: Dict[str, Any], scope: Optional[str], errors: Optional[List[Tuple[str, Optional[str]]]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the account's simulated inventory, one listing per resource type.
+
+        A listing that stays throttled stops there and is appended to
+        ``errors`` as ``(resource type, None)``.
+        """
+        inventory = self.inventory(credentials, scope)
+        for kind, count in inventory.kind_counts():
+            page_size = PAGE_SIZES.get(kind.label, DEFAULT_PAGE_SIZE) or max(1, count)
+            try:
+                for start in range(0, count, page_size):
+                    with observe_provider_request(self.provider, kind.label):
+                        _request()
+                    yield from inventory.iter_kind(kind, start, min(count, start + page_size))
+            except FakeThrottlingError as e:
+                logger.warning(f"Failed to fetch {self.provider} {kind.label} resources: {e}")
+                if errors is not None:
+                    errors.append((kind.label, None))
+
+    def fetch_resources(self, credentials: Dict[str, Any], scope: Optional[str]) -> List[Dict[str, Any]]:
+        """Fetch the simulated inventory into a list. Prefer iter_resources for large accounts."""
+        return list(self.iter_resources(credentials, scope))
+
+    def _monthly_costs(self, credentials: Dict[str, Any], period: str) -> List[Tuple[ResourceKind, float]]:
+        """Monthly cost per resource kind: the inventory's expected cost, varied per period."""
+        rand = random.Random(f"{_seed(credentials)}:{period}")
+        inventory = self.inventory(credentials)
+        return [
+            (kind, count * kind.mean_monthly_cost() * rand.uniform(0.9, 1.1))
+            for kind, count in inventory.kind_counts()
+        ]
+
+    def fetch_cost_data(
+        self, credentials: Dict[str, Any], scope: Optional[str], start_date: str, end_date: str
+    ) -> Dict[str, float]:
+        """Simulated cost breakdown for ``start_date``..``end_date`` (end exclusive). Raises when throttled."""
+        _request()
+        days = (datetime.strptime(end_date, '%Y-%m-%d') - datetime.strptime(start_date, '%Y-%m-%d')).days
+        cost_breakdown = {"compute": 0.0, "storage": 0.0, "network": 0.0, "database": 0.0, "other": 0.0}
+        for kind, monthly in self._monthly_costs(credentials, start_date):
+            cost_breakdown[kind.category] += round(monthly * days / 30, 2)
+        cost_breakdown["total"] = sum(cost_breakdown.values())
+        return cost_breakdown
+
+    def fetch_daily_costs(
+        self, credentials: Dict[str, Any], scope: Optional[str], start_date: str, end_date: str
+    ) -> Iterator[DailyCost]:
+        """Simulated daily cost per service (end exclusive), one request per page of days. Raises when throttled."""
+        day = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        while day < end:
+            _request()
+            page_end = min(end, day + timedelta(days=DAILY_COSTS_PAGE_DAYS))
+            while day < page_end:
+                iso_day = day.strftime('%Y-%m-%d')
+                for kind, monthly in self._monthly_costs(credentials, iso_day):
+                    if monthly:
+                        yield iso_day, kind.label, kind.category, round(monthly / 30, 4)
+                day += timedelta(days=1)
+
+
+@lru_cache()
+def get_fake_analyzer(provider: str) -> FakeCostAnalyzer:
+    return FakeCostAnalyzer(provider)
@@ -0,0 +1,203 @@
+"""
+Fleet-wide analysis scheduler.
+
+Re-analyzes every active cloud account every ANALYSIS_SCHEDULE_INTERVAL_HOURS
+so dashboards stay fresh without users triggering analyses themselves.
+
+- Each account's due time is stored in ``CloudAccount.next_analysis_at``.
+  A random jitter of up to ANALYSIS_SCHEDULE_JITTER_SEC is added every time
+  it is set, so accounts created together (or a fresh deploy) do not all
+  come due at the same moment.
+- Due accounts are enqueued as regular analysis jobs, oldest due first,
+  while the global (ANALYSIS_SCHEDULE_MAX_CONCURRENT) and per-provider
+  (ANALYSIS_SCHEDULE_PROVIDER_CONCURRENCY) in-flight caps allow it.
+  Accounts held back by a cap stay due and are picked up on a later tick.
+- Only the replica holding the scheduler advisory lock runs ticks, so the
+  caps hold across replicas. An account with a queued or running analysis
+  (e.g. one its user started) gets that job back instead of a second one,
+  and analysis jobs take a per-account advisory lock (see analysis.py), so
+  an account is never analyzed by two replicas at once.
+"""
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from loguru import logger
+from sqlalchemy import DateTime, func, literal, select, update
+
+from apps.api.core.config import get_settings
+from apps.api.core.database import AsyncSessionLocal, try_advisory_lock
+from apps.api.models.billing import CloudAccount
+from apps.api.services.jobs import get_job_queue
+from apps.api.services.jobs.queue import FINISHED_STATUSES
+from .analysis import ANALYSIS_JOB, analysis_dedupe_key
+
+# Advisory lock namespace for scheduler leadership (see analysis.py for 7302)
+SCHEDULER_LOCK_NAMESPACE = 7301
+
+# Due accounts read per tick; the rest wait for later ticks
+DUE_BATCH_SIZE = 500
+
+
+def next_analysis_time(now: datetime) -> datetime:
+    settings = get_settings()
+    return now + timedelta(
+        hours=settings.ANALYSIS_SCHEDULE_INTERVAL_HOURS,
+        seconds=random.uniform(0, settings.ANALYSIS_SCHEDULE_JITTER_SEC),
+    )
+
+
+class AnalysisScheduler:
+    """Enqueues analyses for due accounts within the concurrency caps."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._in_flight: Dict[uuid.UUID, str] = {}  # job id -> provider
+        self.is_leader = False
+        self.ticks = 0
+        self.enqueued = 0
+        self.due = 0  # due accounts at the last tick
+        self.waiting = 0  # due accounts held back by the caps at the last tick
+        self.lag_sec = 0.0  # how overdue the oldest due account was at the last tick
+        self.last_tick_at: Optional[datetime] = None
+        self.last_tick_duration_ms = 0.0
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._run(), name="analysis-scheduler")
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.is_leader = False
+
+    async def _run(self) -> None:
+        interval = get_settings().ANALYSIS_SCHEDULE_TICK_SEC
+        while self._running:
+            try:
+                async with try_advisory_lock(SCHEDULER_LOCK_NAMESPACE, "scheduler") as leader:
+                    self.is_leader = leader
+                    if leader:
+                        logger.info("Analysis scheduler acquired leadership")
+                        # A new leader does not know what the previous one enqueued
+                        self._in_flight.clear()
+                    while self._running and leader:
+                        await self.tick()
+                        await asyncio.sleep(interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Analysis scheduler tick failed: {e}")
+            self.is_leader = False
+            await asyncio.sleep(interval)
+
+    async def _reap(self) -> None:
+        """Forget scheduled jobs that have finished."""
+        job_queue = get_job_queue()
+        for job_id in list(self._in_flight):
+            job = await job_queue.get(job_id)
+            if job is None or job.status in FINISHED_STATUSES:
+                del self._in_flight[job_id]
+
+    def _in_flight_for(self, provider: str) -> int:
+        return sum(1 for p in self._in_flight.values() if p == provider)
+
+    async def tick(self) -> int:
+        """Enqueue due accounts that fit under the caps. Returns how many were enqueued."""
+        settings = get_settings()
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        await self._reap()
+
+        async with AsyncSessionLocal() as db:
+            # Accounts the scheduler has not seen yet: spread their first run
+            await db.execute(
+                update(CloudAccount)
+                .where(CloudAccount.is_active.is_(True), CloudAccount.next_analysis_at.is_(None))
+                .values(next_analysis_at=literal(now, DateTime(timezone=True)) + func.random() * timedelta(
+                    seconds=settings.ANALYSIS_SCHEDULE_JITTER_SEC
+                ))
+            )
+            await db.commit()
+
+            due = (await db.execute(
+                select(CloudAccount.id, CloudAccount.user_id, CloudAccount.provider, CloudAccount.next_analysis_at)
+                .where(CloudAccount.is_active.is_(True), CloudAccount.next_analysis_at <= now)
+                .order_by(CloudAccount.next_analysis_at)
+                .limit(DUE_BATCH_SIZE)
+            )).all()
+
+            enqueued = 0
+            job_queue = get_job_queue()
+            for account_id, user_id, provider, due_at in due:
+                if len(self._in_flight) >= settings.ANALYSIS_SCHEDULE_MAX_CONCURRENT:
+                    break
+                provider_cap = settings.ANALYSIS_SCHEDULE_PROVIDER_CONCURRENCY.get(
+                    provider, settings.ANALYSIS_SCHEDULE_MAX_CONCURRENT
+                )
+                if self._in_flight_for(provider) >= provider_cap:
+                    continue
+
+                job = await job_queue.enqueue(
+                    ANALYSIS_JOB,
+                    {"cloud_account_id": str(account_id), "full_sync": False, "scheduled": True},
+                    user_id=user_id,
+                    dedupe_key=analysis_dedupe_key(account_id),
+                )
+                self._in_flight[job.id] = provider
+                await db.execute(
+                    update(CloudAccount)
+                    .where(CloudAccount.id == account_id)
+                    .values(next_analysis_at=next_analysis_time(now))
+                )
+                await db.commit()
+                enqueued += 1
+
+        self.ticks += 1
+        self.enqueued += enqueued
+        self.due = len(due)
+        self.waiting = len(due) - enqueued
+        self.lag_sec = (now - due[0].next_analysis_at).total_seconds() if due else 0.0
+        self.last_tick_at = now
+        self.last_tick_duration_ms = (time.perf_counter() - started) * 1000
+        if enqueued or self.waiting:
+            logger.info(
+                f"Scheduled {enqueued} analyses; {self.waiting} due accounts waiting, "
+                f"oldest {self.lag_sec:.0f}s overdue"
+            )
+        return enqueued
+
+    def stats(self) -> Dict[str, Any]:
+        settings = get_settings()
+        in_flight: Dict[str, int] = {}
+        for provider in self._in_flight.values():
+            in_flight[provider] = in_flight.get(provider, 0) + 1
+        return {
+            "enabled": settings.ANALYSIS_SCHEDULE_ENABLED,
+            "leader": self.is_leader,
+            "ticks": self.ticks,
+            "enqueued_total": self.enqueued,
+            "due": self.due,
+            "waiting": self.waiting,
+            "lag_sec": round(self.lag_sec, 1),
+            "in_flight": in_flight,
+            "max_concurrent": settings.ANALYSIS_SCHEDULE_MAX_CONCURRENT,
+            "last_tick_at": self.last_tick_at.isoformat() if self.last_tick_at else None,
+            "last_tick_duration_ms": round(self.last_tick_duration_ms, 1),
+        }
+
+
+@lru_cache()
+def get_scheduler() -> AnalysisScheduler:
+    """Return the process-wide analysis scheduler."""
+    return AnalysisScheduler()
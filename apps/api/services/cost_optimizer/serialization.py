@@ -0,0 +1,100 @@
+"""
+Cost analyses as response payloads, built straight from database rows.
+
+Recommendations are selected as plain column tuples (no ORM objects, no
+identity map) and zipped into dicts; analyses are few per response and stay
+ORM rows. The dicts have exactly the fields of CostAnalysisResponse and
+CostRecommendationResponse (schemas/billing.py), in the same order, so
+``dump_json`` of them is byte for byte what the ``response_model`` path
+returned, without validating every recommendation into a model first.
+Keep the two in step when a schema changes, and bump PAYLOAD_VERSION.
+
+An analysis payload only changes when one of its recommendations changes
+status, which bumps ``CostAnalysis.recommendations_version``; the ETags
+below are built from the analysis ids and that counter, so they are known
+before any recommendation is loaded.
+"""
+import hashlib
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from apps.api.core.responses import dump_json
+from apps.api.models.billing import CostAnalysis, CostRecommendation
+
+# Part of every ETag, so representations cached before a payload format change stop matching
+PAYLOAD_VERSION = 1
+
+# CostRecommendationResponse fields and the columns they are read from
+RECOMMENDATION_FIELDS = (
+    "id", "resource_type", "resource_id", "recommendation_type", "title", "description", "current_cost",
+    "estimated_new_cost", "monthly_savings", "annual_savings", "priority", "implementation_effort", "status",
+    "metadata",
+)
+RECOMMENDATION_COLUMNS = (
+    CostRecommendation.id,
+    CostRecommendation.resource_type,
+    CostRecommendation.resource_id,
+    CostRecommendation.recommendation_type,
+    CostRecommendation.title,
+    CostRecommendation.description,
+    CostRecommendation.current_cost,
+    CostRecommendation.estimated_new_cost,
+    CostRecommendation.monthly_savings,
+    CostRecommendation.annual_savings,
+    CostRecommendation.priority,
+    CostRecommendation.implementation_effort,
+    CostRecommendation.status,
+    CostRecommendation.recommendation_metadata,
+)
+
+
+async def load_recommendations(
+    db: AsyncSession, analysis_ids: Sequence[uuid.UUID]
+) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """Recommendation payloads of each analysis, in one IN query."""
+    grouped: Dict[uuid.UUID, List[Dict[str, Any]]] = {analysis_id: [] for analysis_id in analysis_ids}
+    if not grouped:
+        return grouped
+    result = await db.execute(
+        select(CostRecommendation.cost_analysis_id, *RECOMMENDATION_COLUMNS)
+        .where(CostRecommendation.cost_analysis_id.in_(grouped))
+    )
+    for row in result.tuples():
+        grouped[row[0]].append(dict(zip(RECOMMENDATION_FIELDS, row[1:])))
+    return grouped
+
+
+def analysis_payload(analysis: CostAnalysis, recommendations: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "id": analysis.id,
+        "cloud_account_id": analysis.cloud_account_id,
+        "analysis_date": analysis.analysis_date,
+        "total_monthly_cost": float(analysis.total_monthly_cost),
+        "potential_savings": float(analysis.potential_savings),
+        "savings_percentage": float(analysis.savings_percentage),
+        "resource_count": analysis.resource_count,
+        "cost_breakdown": analysis.cost_breakdown,
+        "recommendations": recommendations,
+    }
+
+
+def dump_analyses(
+    analyses: Iterable[CostAnalysis], recommendations: Dict[uuid.UUID, List[Dict[str, Any]]]
+) -> bytes:
+    """Serialize analyses with their recommendations (analyses missing from ``recommendations`` get none)."""
+    return dump_json([analysis_payload(analysis, recommendations.get(analysis.id, [])) for analysis in analyses])
+
+
+def analysis_etag(analysis: CostAnalysis) -> str:
+    return f"a{PAYLOAD_VERSION}-{analysis.id}-{analysis.recommendations_version}"
+
+
+def analyses_etag(analyses: Sequence[CostAnalysis], include_recommendations: bool, has_more: bool) -> str:
+    """ETag of a GET /analyses page: which analyses it lists, at which versions."""
+    digest = hashlib.sha256(f"{PAYLOAD_VERSION}|{include_recommendations:d}|{has_more:d}".encode())
+    for analysis in analyses:
+        digest.update(f"|{analysis.id}:{analysis.recommendations_version}".encode())
+    return f"l{PAYLOAD_VERSION}-{digest.hexdigest()[:32]}"
@@ -0,0 +1,266 @@
+"""
+Seeded synthetic cloud inventories.
+
+Benchmarks, load tests (the simulated providers in providers/fake.py) and
+the demo fallbacks of the real analyzers all draw resources from here, so
+they exercise the same data. An inventory is a pure function of
+``(provider, count, seed)``:
+
+- resources are generated lazily, one block of BLOCK_SIZE at a time, each
+  block drawn as NumPy columns from its own RNG seeded by ``(seed,
+  provider, kind, block)``. Memory stays constant however many are
+  streamed (10M is fine), and any index range can be produced without
+  generating what comes before it.
+- the mix is skewed the way real accounts are: many small buckets and
+  volumes, fewer instances, a handful of databases; instance sizes follow
+  a long tail (mostly small, a few very large), storage capacity is
+  lognormal, most resources sit in the primary region.
+- every resource carries tags (some are untagged), a monthly cost derived
+  from its size and a daily utilization history.
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+BLOCK_SIZE = 1000
+
+HISTORY_DAYS = 7
+
+ENVIRONMENTS = (("prod", 5), ("staging", 2), ("dev", 3))
+TEAMS = ("platform", "payments", "search", "data", "ml", "web", "mobile", "growth", "security", "infra",
+         "analytics", "support")
+# Zipf-like: a few teams own most of the fleet
+TEAM_WEIGHTS = tuple(1 / (rank + 1) for rank in range(len(TEAMS)))
+UNTAGGED_SHARE = 0.15
+
+
+@dataclass(frozen=True)
+class ResourceKind:
+    label: str  # resource type name
+    share: float  # fraction of an inventory
+    category: str  # billing category
+    prefix: str  # resource id prefix
+    sizes: Tuple[Tuple[str, float, float], ...]  # (size, weight, monthly price, or price per GB with capacity)
+    capacity_gb: Optional[Tuple[float, float]] = None  # lognormal (median, sigma)
+    utilization: Optional[Tuple[float, float]] = (2.0, 5.0)  # beta(alpha, beta) of average use
+
+    def mean_monthly_cost(self) -> float:
+        total_weight = sum(weight for _, weight, _ in self.sizes)
+        price = sum(weight * price for _, weight, price in self.sizes) / total_weight
+        if self.capacity_gb is not None:
+            median, sigma = self.capacity_gb
+            price *= median * math.exp(sigma ** 2 / 2)
+        return price
+
+
+_COMPUTE_UTILIZATION = (2.0, 5.0)  # mostly lightly used
+_STORAGE_UTILIZATION = (3.0, 2.0)  # mostly full
+
+CATALOG: Dict[str, Tuple[ResourceKind, ...]] = {
+    "AWS": (
+        ResourceKind("S3 Bucket", 0.28, "storage", "bucket", (
+            ("STANDARD", 6, 0.023), ("STANDARD_IA", 3, 0.0125), ("GLACIER", 1, 0.004),
+        ), capacity_gb=(2.0, 2.5), utilization=None),
+        ResourceKind("EBS Volume", 0.24, "storage", "vol", (
+            ("gp3", 7, 0.08), ("gp2", 2, 0.10), ("io2", 1, 0.125),
+        ), capacity_gb=(50.0, 1.2), utilization=_STORAGE_UTILIZATION),
+        ResourceKind("EC2 Instance", 0.20, "compute", "i", (
+            ("t3.micro", 30, 7.5), ("t3.medium", 25, 30.0), ("m5.large", 18, 70.0), ("m5.2xlarge", 12, 280.0),
+            ("c5.4xlarge", 8, 496.0), ("r5.8xlarge", 5, 1472.0), ("x1e.16xlarge", 2, 9734.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("Lambda Function", 0.12, "compute", "fn", (
+            ("128MB", 5, 0.4), ("512MB", 3, 2.5), ("3008MB", 1, 18.0),
+        ), utilization=(1.2, 8.0)),
+        ResourceKind("CloudWatch Logs", 0.06, "other", "log", (
+            ("standard", 1, 0.03),
+        ), capacity_gb=(5.0, 2.0), utilization=None),
+        ResourceKind("Elastic IP", 0.04, "network", "eip", (("ipv4", 1, 3.6),), utilization=None),
+        ResourceKind("ELB Load Balancer", 0.03, "network", "elb", (
+            ("application", 3, 22.0), ("network", 1, 16.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("RDS Database", 0.03, "database", "db", (
+            ("db.t3.medium", 5, 50.0), ("db.m5.large", 3, 125.0), ("db.r5.2xlarge", 2, 700.0),
+            ("db.r5.12xlarge", 1, 4200.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+    ),
+    "GCP": (
+        ResourceKind("Cloud Storage Bucket", 0.30, "storage", "bucket", (
+            ("STANDARD", 6, 0.020), ("NEARLINE", 3, 0.010), ("ARCHIVE", 1, 0.0012),
+        ), capacity_gb=(2.0, 2.5), utilization=None),
+        ResourceKind("Persistent Disk", 0.22, "storage", "disk", (
+            ("pd-balanced", 6, 0.10), ("pd-standard", 3, 0.04), ("pd-ssd", 1, 0.17),
+        ), capacity_gb=(50.0, 1.2), utilization=_STORAGE_UTILIZATION),
+        ResourceKind("Compute Engine Instance", 0.22, "compute", "vm", (
+            ("e2-micro", 30, 6.1), ("e2-standard-2", 25, 49.0), ("n2-standard-4", 18, 142.0),
+            ("n2-standard-16", 12, 567.0), ("n2-highmem-32", 8, 1532.0), ("m2-ultramem-208", 2, 30000.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("Cloud Functions", 0.12, "compute", "fn", (
+            ("256MB", 5, 0.6), ("1GB", 3, 3.0), ("8GB", 1, 22.0),
+        ), utilization=(1.2, 8.0)),
+        ResourceKind("Cloud Logging", 0.06, "other", "log", (("_Default", 1, 0.50),),
+                     capacity_gb=(1.0, 2.0), utilization=None),
+        ResourceKind("Reserved IP", 0.04, "network", "ip", (("EXTERNAL", 1, 7.3),), utilization=None),
+        ResourceKind("Load Balancer", 0.02, "network", "lb", (("HTTPS", 1, 18.0),),
+                     utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("Cloud SQL", 0.02, "database", "sql", (
+            ("db-g1-small", 5, 25.0), ("db-custom-4-16384", 3, 260.0), ("db-custom-32-131072", 1, 2100.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+    ),
+    "AZURE": (
+        ResourceKind("Blob Storage", 0.28, "storage", "blob", (
+            ("Hot", 6, 0.018), ("Cool", 3, 0.010), ("Archive", 1, 0.002),
+        ), capacity_gb=(2.0, 2.5), utilization=None),
+        ResourceKind("Managed Disk", 0.24, "storage", "disk", (
+            ("StandardSSD_LRS", 6, 0.075), ("Standard_LRS", 3, 0.045), ("Premium_LRS", 1, 0.135),
+        ), capacity_gb=(64.0, 1.1), utilization=_STORAGE_UTILIZATION),
+        ResourceKind("Virtual Machine", 0.22, "compute", "vm", (
+            ("Standard_B1s", 30, 7.6), ("Standard_B2s", 25, 30.4), ("Standard_D4s_v5", 18, 140.0),
+            ("Standard_D16s_v5", 12, 561.0), ("Standard_E32s_v5", 8, 1840.0), ("Standard_M128s", 2, 9800.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("Azure Functions", 0.12, "compute", "fn", (
+            ("Consumption", 6, 0.5), ("Premium_EP1", 1, 155.0),
+        ), utilization=(1.2, 8.0)),
+        ResourceKind("Log Analytics", 0.06, "other", "log", (("PerGB2018", 1, 2.3),),
+                     capacity_gb=(0.5, 2.0), utilization=None),
+        ResourceKind("Public IP", 0.04, "network", "pip", (("Standard", 1, 3.65),), utilization=None),
+        ResourceKind("Load Balancer", 0.02, "network", "lb", (("Standard", 1, 18.3),),
+                     utilization=_COMPUTE_UTILIZATION),
+        ResourceKind("SQL Database", 0.02, "database", "sqldb", (
+            ("Basic", 4, 5.0), ("S2", 4, 75.0), ("GP_Gen5_8", 2, 1480.0), ("BC_Gen5_32", 1, 11900.0),
+        ), utilization=_COMPUTE_UTILIZATION),
+    ),
+}
+
+# The first region holds most of the fleet
+REGIONS: Dict[str, Tuple[str, ...]] = {
+    "AWS": ("us-east-1", "us-west-2", "eu-west-1", "ap-southeast-1"),
+    "GCP": ("us-central1", "us-east1", "europe-west1"),
+    "AZURE": ("eastus", "westeurope", "southeastasia"),
+}
+REGION_WEIGHTS = (6, 2, 1.5, 0.5)
+
+
+@lru_cache(maxsize=256)
+def _size_table(kind: ResourceKind):
+    import numpy as np
+
+    weights = np.array([weight for _, weight, _ in kind.sizes], dtype=float)
+    return (
+        [name for name, _, _ in kind.sizes],
+        weights / weights.sum(),
+        np.array([price for _, _, price in kind.sizes]),
+    )
+
+
+def _probabilities(weights: Sequence[float]):
+    import numpy as np
+
+    weights = np.asarray(weights, dtype=float)
+    return weights / weights.sum()
+
+
+class SyntheticInventory:
+    """A seeded synthetic inventory of ``count`` resources of one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        count: int,
+        seed: Any = 0,
+        regions: Optional[Sequence[str]] = None,
+        history_days: int = HISTORY_DAYS,
+    ):
+        self.provider = provider if provider in CATALOG else "AWS"
+        self.count = count
+        self.seed = seed
+        self.kinds = CATALOG[self.provider]
+        self.regions = list(regions or REGIONS[self.provider])
+        self.history_days = history_days
+        self._entropy = int.from_bytes(hashlib.sha256(f"{seed}:{self.provider}".encode()).digest()[:8], "big")
+
+    def kind_counts(self) -> List[Tuple[ResourceKind, int]]:
+        """How many resources of each kind the inventory holds."""
+        counts = [int(self.count * kind.share) for kind in self.kinds]
+        counts[0] += self.count - sum(counts)
+        return list(zip(self.kinds, counts))
+
+    def monthly_cost(self) -> Dict[str, float]:
+        """Expected monthly cost per resource kind."""
+        return {kind.label: count * kind.mean_monthly_cost() for kind, count in self.kind_counts()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for kind, count in self.kind_counts():
+            yield from self.iter_kind(kind, 0, count)
+
+    def iter_kind(self, kind: ResourceKind, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        """Resources ``start``..``stop`` (exclusive) of one kind."""
+        index = start
+        while index < stop:
+            block = index // BLOCK_SIZE
+            block_stop = min(stop, (block + 1) * BLOCK_SIZE)
+            yield from self._block(kind, block, index - block * BLOCK_SIZE, block_stop - block * BLOCK_SIZE)
+            index = block_stop
+
+    def _block(self, kind: ResourceKind, block: int, lo: int, hi: int) -> List[Dict[str, Any]]:
+        """Resources ``lo``..``hi`` of a block. Every column is drawn for the
+        whole block, so values do not depend on which slice is asked for."""
+        import numpy as np
+
+        rng = np.random.default_rng([self._entropy, self.kinds.index(kind), block])
+        n = BLOCK_SIZE
+        names, size_p, prices = _size_table(kind)
+        size = rng.choice(len(names), n, p=size_p)
+        if kind.capacity_gb is not None:
+            capacity = np.round(rng.lognormal(math.log(kind.capacity_gb[0]), kind.capacity_gb[1], n), 2)
+            cost = prices[size] * capacity
+        else:
+            capacity = None
+            cost = prices[size] * rng.uniform(0.9, 1.1, n)
+        region = rng.choice(len(self.regions), n, p=_probabilities(
+            [REGION_WEIGHTS[min(i, len(REGION_WEIGHTS) - 1)] for i in range(len(self.regions))]
+        ))
+        tagged = rng.random(n) >= UNTAGGED_SHARE
+        team = rng.choice(len(TEAMS), n, p=_probabilities(TEAM_WEIGHTS))
+        env = rng.choice(len(ENVIRONMENTS), n, p=_probabilities([weight for _, weight in ENVIRONMENTS]))
+        history = None
+        if kind.utilization is not None:
+            average = rng.beta(*kind.utilization, n)
+            noise = rng.normal(0, 0.05, (n, self.history_days))
+            history = np.clip(average[:, None] + noise, 0, 1).round(3)[lo:hi].tolist()
+
+        base = block * BLOCK_SIZE
+        resources = []
+        for i, (size_i, cost_i, region_i, tagged_i, team_i, env_i) in enumerate(zip(
+            size[lo:hi].tolist(), np.round(cost[lo:hi], 2).tolist(), region[lo:hi].tolist(),
+            tagged[lo:hi].tolist(), team[lo:hi].tolist(), env[lo:hi].tolist(),
+        )):
+            position = base + lo + i
+            owner = TEAMS[team_i] if tagged_i else "untagged"
+            resource = {
+                "id": f"{kind.prefix}-{position:010d}",
+                "type": kind.label,
+                "name": f"{owner}-{kind.prefix}-{position}",
+                "region": self.regions[region_i],
+                "size": names[size_i],
+                "monthly_cost": cost_i,
+                "tags": {
+                    "env": ENVIRONMENTS[env_i][0],
+                    "team": owner,
+                    "cost-center": f"cc-{team_i % 4 + 100}",
+                } if tagged_i else {},
+            }
+            if capacity is not None:
+                resource["capacity_gb"] = float(capacity[lo + i])
+            if history is not None:
+                resource["utilization"] = history[i]
+            resources.append(resource)
+        return resources
+
+
+def iter_synthetic_resources(
+    provider: str, count: int, seed: Any = 0, history_days: int = HISTORY_DAYS
+) -> Iterator[Dict[str, Any]]:
+    """Stream a seeded synthetic inventory; see SyntheticInventory."""
+    return iter(SyntheticInventory(provider, count, seed, history_days=history_days))
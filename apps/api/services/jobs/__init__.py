@@ -0,0 +1,19 @@
+from .queue import (
+    Job,
+    JobQueue,
+    JobSkipped,
+    JobBackend,
+    InMemoryJobBackend,
+    DatabaseJobBackend,
+    get_job_queue,
+)
+
+__all__ = [
+    "Job",
+    "JobQueue",
+    "JobSkipped",
+    "JobBackend",
+    "InMemoryJobBackend",
+    "DatabaseJobBackend",
+    "get_job_queue",
+]
@@ -0,0 +1,531 @@
+"""
+Background job queue.
+
+Long-running work (cloud resource discovery, cost analysis) is enqueued from
+request handlers and executed by a pool of worker tasks, so the API event loop
+never waits on provider SDK calls. Job state lives in a pluggable backend:
+
+- DatabaseJobBackend (the default): jobs persisted in Postgres and claimed
+  with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several API replicas and
+  uvicorn workers share work and see each other's jobs.
+- InMemoryJobBackend: in-process queue for local development with a single
+  uvicorn worker. Jobs are only visible to the process that created them, so
+  with several workers a job status GET can miss a job.
+
+A running job's worker refreshes its heartbeat every JOB_HEARTBEAT_SEC.
+Jobs whose heartbeat is older than JOB_STALE_AFTER_SEC lost their worker (a
+crash or a killed replica); they are re-queued until they have been claimed
+JOB_MAX_ATTEMPTS times, then failed. Every queue sweeps for them on startup
+and periodically after that. Jobs interrupted by a graceful shutdown are put
+back in the queue right away, without counting the interrupted attempt.
+
+A job enqueued with a ``dedupe_key`` is not duplicated while another job of
+the same type and key is QUEUED or RUNNING: the active job is returned
+instead (a partial unique index makes this atomic across replicas).
+Handlers that find their work already being done raise JobSkipped, which
+finishes the job as SKIPPED rather than FAILED.
+"""
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from apps.api.core.config import get_settings
+from apps.api.core.database import AsyncSessionLocal
+from apps.api.models.job import JobRecord
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+SKIPPED = "SKIPPED"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+FINISHED_STATUSES = (SUCCEEDED, FAILED, SKIPPED)
+
+
+@dataclass
+class Job:
+    """A unit of background work and its current state."""
+
+    job_type: str
+    payload: Dict[str, Any]
+    user_id: Optional[uuid.UUID] = None
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    status: str = QUEUED
+    progress: int = 0
+    message: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    dedupe_key: Optional[str] = None
+
+
+class JobSkipped(Exception):
+    """Raised by a handler whose work is already being done; the message says why."""
+
+
+ProgressReporter = Callable[[int, Optional[str]], Awaitable[None]]
+JobHandler = Callable[[Job, ProgressReporter], Awaitable[Optional[Dict[str, Any]]]]
+
+
+STALE_JOB_MESSAGE = "Worker stopped responding"
+RELEASED_JOB_MESSAGE = "Re-queued: worker shut down"
+
+
+class JobBackend(ABC):
+    """Storage and dispatch interface for jobs."""
+
+    @abstractmethod
+    async def create(self, job: Job) -> Job:
+        """
+        Store a new QUEUED job and return it, or return the active job with
+        the same type and ``dedupe_key`` if there is one.
+        """
+
+    @abstractmethod
+    async def claim(self, timeout: float) -> Optional[Job]:
+        """Claim the next queued job, waiting up to ``timeout`` seconds."""
+
+    @abstractmethod
+    async def update(self, job_id: uuid.UUID, **fields: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: uuid.UUID) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    async def list_for_user(self, user_id: uuid.UUID, limit: int = 50) -> List[Job]:
+        ...
+
+    @abstractmethod
+    async def release(self, job_id: uuid.UUID) -> None:
+        """Put a RUNNING job back in the queue, undoing its claim (its worker is shutting down)."""
+
+    @abstractmethod
+    async def recover_stale(self, stale_before: datetime, max_attempts: int) -> Tuple[int, int]:
+        """
+        Re-queue RUNNING jobs whose heartbeat is older than ``stale_before``,
+        or fail them once claimed ``max_attempts`` times. Returns (requeued, failed).
+        """
+
+
+class InMemoryJobBackend(JobBackend):
+    """Process-local backend. Job state is lost on restart."""
+
+    def __init__(self, max_retained: int = 1000):
+        self._jobs: Dict[uuid.UUID, Job] = {}
+        self._pending: asyncio.Queue = asyncio.Queue()
+        self._max_retained = max_retained
+
+    async def create(self, job: Job) -> Job:
+        if job.dedupe_key is not None:
+            for existing in self._jobs.values():
+                if (
+                    existing.job_type == job.job_type
+                    and existing.dedupe_key == job.dedupe_key
+                    and existing.status in ACTIVE_STATUSES
+                ):
+                    return existing
+        self._jobs[job.id] = job
+        self._prune()
+        await self._pending.put(job.id)
+        return job
+
+    async def claim(self, timeout: float) -> Optional[Job]:
+        try:
+            job_id = await asyncio.wait_for(self._pending.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+        job = self._jobs.get(job_id)
+        if job is None or job.status != QUEUED:
+            return None
+
+        job.status = RUNNING
+        job.started_at = job.heartbeat_at = datetime.utcnow()
+        job.attempts += 1
+        return job
+
+    async def update(self, job_id: uuid.UUID, **fields: Any) -> None:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        for key, value in fields.items():
+            setattr(job, key, value)
+
+    async def get(self, job_id: uuid.UUID) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def list_for_user(self, user_id: uuid.UUID, limit: int = 50) -> List[Job]:
+        jobs = [job for job in self._jobs.values() if job.user_id == user_id]
+        jobs.sort(key=lambda job: job.created_at, reverse=True)
+        return jobs[:limit]
+
+    async def release(self, job_id: uuid.UUID) -> None:
+        job = self._jobs.get(job_id)
+        if job is None or job.status != RUNNING:
+            return
+        job.status, job.message, job.started_at, job.heartbeat_at = QUEUED, RELEASED_JOB_MESSAGE, None, None
+        job.attempts = max(0, job.attempts - 1)
+        self._pending.put_nowait(job.id)
+
+    async def recover_stale(self, stale_before: datetime, max_attempts: int) -> Tuple[int, int]:
+        requeued = failed = 0
+        for job in list(self._jobs.values()):
+            if job.status != RUNNING or (job.heartbeat_at or job.started_at or job.created_at) >= stale_before:
+                continue
+            if job.attempts < max_attempts:
+                job.status, job.message, job.started_at, job.heartbeat_at = QUEUED, STALE_JOB_MESSAGE, None, None
+                await self._pending.put(job.id)
+                requeued += 1
+            else:
+                job.status, job.error, job.finished_at = FAILED, STALE_JOB_MESSAGE, datetime.utcnow()
+                failed += 1
+        return requeued, failed
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs once the retention limit is exceeded."""
+        overflow = len(self._jobs) - self._max_retained
+        if overflow <= 0:
+            return
+        finished = sorted(
+            (job for job in self._jobs.values() if job.status in FINISHED_STATUSES),
+            key=lambda job: job.created_at,
+        )
+        for job in finished[:overflow]:
+            del self._jobs[job.id]
+
+
+class DatabaseJobBackend(JobBackend):
+    """Postgres-backed backend shared by every API replica."""
+
+    def __init__(self, poll_interval: float = 1.0):
+        self._poll_interval = poll_interval
+
+    @staticmethod
+    def _to_job(record) -> Job:
+        return Job(
+            id=record.id,
+            job_type=record.job_type,
+            payload=record.payload or {},
+            user_id=record.user_id,
+            status=record.status,
+            progress=record.progress,
+            message=record.message,
+            result=record.result,
+            error=record.error,
+            attempts=record.attempts,
+            created_at=record.created_at,
+            started_at=record.started_at,
+            finished_at=record.finished_at,
+            heartbeat_at=record.heartbeat_at,
+            dedupe_key=record.dedupe_key,
+        )
+
+    async def create(self, job: Job) -> Job:
+        stmt = insert(JobRecord).values(
+            id=job.id,
+            job_type=job.job_type,
+            user_id=job.user_id,
+            payload=job.payload,
+            status=job.status,
+            progress=job.progress,
+            attempts=job.attempts,
+            created_at=job.created_at,
+            dedupe_key=job.dedupe_key,
+        )
+        if job.dedupe_key is not None:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=[JobRecord.job_type, JobRecord.dedupe_key],
+                index_where=JobRecord.status.in_(ACTIVE_STATUSES),
+            )
+        stmt = stmt.returning(JobRecord.id)
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                created = await db.scalar(stmt)
+                await db.commit()
+                if created is not None:
+                    return job
+                existing = await db.scalar(
+                    select(JobRecord).where(
+                        JobRecord.job_type == job.job_type,
+                        JobRecord.dedupe_key == job.dedupe_key,
+                        JobRecord.status.in_(ACTIVE_STATUSES),
+                    )
+                )
+                if existing is not None:
+                    return self._to_job(existing)
+            # The conflicting job finished in between; try again
+
+    async def claim(self, timeout: float) -> Optional[Job]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(JobRecord)
+                .where(JobRecord.status == QUEUED)
+                .order_by(JobRecord.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            record = result.scalar_one_or_none()
+
+            if record is not None:
+                record.status = RUNNING
+                record.started_at = record.heartbeat_at = datetime.utcnow()
+                record.attempts += 1
+                await db.commit()
+                return self._to_job(record)
+
+        await asyncio.sleep(min(timeout, self._poll_interval))
+        return None
+
+    async def update(self, job_id: uuid.UUID, **fields: Any) -> None:
+        async with AsyncSessionLocal() as db:
+            record = await db.get(JobRecord, job_id)
+            if record is None:
+                return
+            for key, value in fields.items():
+                setattr(record, key, value)
+            await db.commit()
+
+    async def get(self, job_id: uuid.UUID) -> Optional[Job]:
+        async with AsyncSessionLocal() as db:
+            record = await db.get(JobRecord, job_id)
+            return self._to_job(record) if record else None
+
+    async def list_for_user(self, user_id: uuid.UUID, limit: int = 50) -> List[Job]:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(JobRecord)
+                .where(JobRecord.user_id == user_id)
+                .order_by(JobRecord.created_at.desc())
+                .limit(limit)
+            )
+            return [self._to_job(record) for record in result.scalars().all()]
+
+    async def release(self, job_id: uuid.UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(JobRecord)
+                .where(JobRecord.id == job_id, JobRecord.status == RUNNING)
+                .values(
+                    status=QUEUED,
+                    message=RELEASED_JOB_MESSAGE,
+                    started_at=None,
+                    heartbeat_at=None,
+                    attempts=func.greatest(JobRecord.attempts - 1, 0),
+                )
+            )
+            await db.commit()
+
+    async def recover_stale(self, stale_before: datetime, max_attempts: int) -> Tuple[int, int]:
+        requeued = failed = 0
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(JobRecord)
+                .where(
+                    JobRecord.status == RUNNING,
+                    func.coalesce(JobRecord.heartbeat_at, JobRecord.started_at) < stale_before,
+                )
+                .with_for_update(skip_locked=True)
+            )
+            for record in result.scalars().all():
+                if record.attempts < max_attempts:
+                    record.status = QUEUED
+                    record.message = STALE_JOB_MESSAGE
+                    record.started_at = record.heartbeat_at = None
+                    requeued += 1
+                else:
+                    record.status = FAILED
+                    record.error = STALE_JOB_MESSAGE
+                    record.finished_at = datetime.utcnow()
+                    failed += 1
+            await db.commit()
+        return requeued, failed
+
+
+class JobQueue:
+    """Dispatches queued jobs to registered handlers on a pool of worker tasks."""
+
+    def __init__(
+        self,
+        backend: JobBackend,
+        concurrency: int = 4,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 30.0,
+        stale_after: float = 300.0,
+        max_attempts: int = 3,
+    ):
+        self.backend = backend
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.max_attempts = max(1, max_attempts)
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._running = False
+
+    def register(self, job_type: str, handler: JobHandler) -> None:
+        """Register the coroutine that executes jobs of ``job_type``."""
+        self._handlers[job_type] = handler
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        await self.recover_stale()
+        self._workers = [
+            asyncio.create_task(self._worker(n), name=f"job-worker-{n}")
+            for n in range(self.concurrency)
+        ]
+        self._workers.append(asyncio.create_task(self._reaper(), name="job-reaper"))
+        logger.info(f"Started {self.concurrency} job workers ({type(self.backend).__name__})")
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        user_id: Optional[uuid.UUID] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Job:
+        """
+        Queue a job. With a ``dedupe_key``, an active job of the same type and
+        key is returned instead of queueing another one.
+        """
+        if job_type not in self._handlers:
+            raise ValueError(f"No handler registered for job type: {job_type}")
+        job = Job(job_type=job_type, payload=payload, user_id=user_id, dedupe_key=dedupe_key)
+        return await self.backend.create(job)
+
+    async def get(self, job_id: uuid.UUID) -> Optional[Job]:
+        return await self.backend.get(job_id)
+
+    async def list_for_user(self, user_id: uuid.UUID, limit: int = 50) -> List[Job]:
+        return await self.backend.list_for_user(user_id, limit)
+
+    async def recover_stale(self) -> None:
+        """Re-queue or fail jobs left RUNNING by a worker that stopped heartbeating."""
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        try:
+            requeued, failed = await self.backend.recover_stale(stale_before, self.max_attempts)
+        except Exception as e:
+            logger.error(f"Failed to recover stale jobs: {e}")
+            return
+        if requeued or failed:
+            logger.warning(f"Recovered stale jobs: {requeued} re-queued, {failed} failed after {self.max_attempts} attempts")
+
+    async def _reaper(self) -> None:
+        while self._running:
+            await asyncio.sleep(self.stale_after / 2)
+            await self.recover_stale()
+
+    async def _heartbeat(self, job_id: uuid.UUID) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.backend.update(job_id, heartbeat_at=datetime.utcnow())
+            except Exception as e:
+                logger.warning(f"Failed to record heartbeat of job {job_id}: {e}")
+
+    async def _worker(self, n: int) -> None:
+        while self._running:
+            try:
+                job = await self.backend.claim(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {n} failed to claim a job: {e}")
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            if job is not None:
+                await self._run(job)
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers.get(job.job_type)
+
+        async def report(progress: int, message: Optional[str] = None) -> None:
+            await self.backend.update(job.id, progress=max(0, min(100, progress)), message=message)
+
+        if handler is None:
+            await self.backend.update(
+                job.id,
+                status=FAILED,
+                error=f"No handler registered for job type: {job.job_type}",
+                finished_at=datetime.utcnow(),
+            )
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            result = await handler(job, report)
+        except asyncio.CancelledError:
+            # Shutting down: hand the job to the next worker. If this fails
+            # the job stays RUNNING and the reaper re-queues it once stale.
+            try:
+                await self.backend.release(job.id)
+            except Exception as e:
+                logger.warning(f"Failed to re-queue job {job.id} on shutdown: {e}")
+            raise
+        except JobSkipped as e:
+            logger.info(f"Job {job.id} ({job.job_type}) skipped: {e}")
+            await self.backend.update(
+                job.id, status=SKIPPED, message=str(e), finished_at=datetime.utcnow()
+            )
+            return
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.job_type}) failed: {e}")
+            await self.backend.update(
+                job.id, status=FAILED, error=str(e), finished_at=datetime.utcnow()
+            )
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self.backend.update(
+            job.id,
+            status=SUCCEEDED,
+            progress=100,
+            message="Completed",
+            result=result,
+            finished_at=datetime.utcnow(),
+        )
+
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue configured from settings."""
+    settings = get_settings()
+    if settings.JOB_BACKEND == "memory":
+        backend: JobBackend = InMemoryJobBackend()
+    else:
+        backend = DatabaseJobBackend(poll_interval=settings.JOB_POLL_INTERVAL_SEC)
+    return JobQueue(
+        backend,
+        concurrency=settings.JOB_WORKERS,
+        poll_interval=settings.JOB_POLL_INTERVAL_SEC,
+        heartbeat_interval=settings.JOB_HEARTBEAT_SEC,
+        stale_after=settings.JOB_STALE_AFTER_SEC,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
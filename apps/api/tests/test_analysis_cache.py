@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from apps.api.core.config import get_settings
+from apps.api.services.cost_optimizer.analysis_cache import AnalysisCache, CachedResponse
+
+
+class CountingLoader:
+    def __init__(self):
+        self.loads = 0
+
+    async def __call__(self, bypass: bool) -> CachedResponse:
+        self.loads += 1
+        return CachedResponse(etag=f"v{self.loads}", headers={}, content=b"[]")
+
+
+@pytest.fixture
+def process_local(monkeypatch):
+    """Configure caches without Redis, so each one gets an in-memory shared tier."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_REDIS_URL", "")
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_job_completed_analysis_invalidates_cached_list(process_local, monkeypatch):
+    monkeypatch.setattr(process_local, "JOB_BACKEND", "memory")
+    api, worker = AnalysisCache(), AnalysisCache()
+    worker.shared = api.shared  # both processes see the same shared tier, as with Redis
+    user_id = uuid.uuid4()
+    loader = CountingLoader()
+
+    assert (await api.get_or_load(user_id, "list:gzip", loader)).etag == "v1"
+    assert (await api.get_or_load(user_id, "list:gzip", loader)).etag == "v1"
+    assert loader.loads == 1
+
+    # What run_analysis_job does once the analysis is committed
+    await worker.invalidate_user(user_id)
+
+    assert (await api.get_or_load(user_id, "list:gzip", loader)).etag == "v2"
+    assert loader.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_is_per_user(process_local, monkeypatch):
+    monkeypatch.setattr(process_local, "JOB_BACKEND", "memory")
+    cache = AnalysisCache()
+    user_id, other_id = uuid.uuid4(), uuid.uuid4()
+    loader = CountingLoader()
+
+    await cache.get_or_load(user_id, "list", loader)
+    await cache.get_or_load(other_id, "list", loader)
+    await cache.invalidate_user(other_id)
+    await cache.get_or_load(user_id, "list", loader)
+
+    assert loader.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_process_local_cache_is_off_with_database_jobs(process_local, monkeypatch):
+    # Job workers in other processes could not invalidate it
+    monkeypatch.setattr(process_local, "JOB_BACKEND", "database")
+    cache = AnalysisCache()
+    loader = CountingLoader()
+
+    assert not cache.enabled
+    await cache.get_or_load(uuid.uuid4(), "list", loader)
+    await cache.get_or_load(uuid.uuid4(), "list", loader)
+    assert loader.loads == 2
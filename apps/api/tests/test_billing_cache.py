@@ -0,0 +1,134 @@
+import uuid
+from datetime import date
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from apps.api.core.cache import TTLCache
+from apps.api.models.billing import CloudAccount
+from apps.api.services.cost_optimizer import billing_cache
+from apps.api.services.cost_optimizer.billing_cache import is_closed_period
+from apps.api.services.cost_optimizer.cloud_providers import BillingUnsupported
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class UnavailableSession:
+    """AsyncSessionLocal stand-in for a database that is down; the cache falls back to memory."""
+
+    def __call__(self) -> "UnavailableSession":
+        return self
+
+    async def __aenter__(self):
+        raise OperationalError("SELECT 1", {}, ConnectionError("database unavailable"))
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+
+class CountingAnalyzer:
+    COST_GRANULARITY = "MONTHLY"
+    COST_GROUP_BY = "SERVICE"
+    MOCK_COST_DATA = {"total": 1.0, "other": 1.0}
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_cost_data(self, credentials, scope, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        return {"total": 42.0, "compute": 42.0}
+
+
+class UnsupportedAnalyzer(CountingAnalyzer):
+    def fetch_cost_data(self, credentials, scope, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        raise BillingUnsupported("not integrated")
+
+
+@pytest.fixture(autouse=True)
+def settle_days(monkeypatch):
+    monkeypatch.setattr(billing_cache.settings, "BILLING_CACHE_SETTLE_DAYS", 3)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(billing_cache, "memory_cache", TTLCache(100, 60, clock=clock))
+    monkeypatch.setattr(billing_cache, "AsyncSessionLocal", UnavailableSession())
+    return clock
+
+
+def account(provider: str = "AWS") -> CloudAccount:
+    return CloudAccount(id=uuid.uuid4(), provider=provider, credentials={}, region="us-east-1")
+
+
+def test_closed_period_before_last_month_start():
+    assert is_closed_period(date(2026, 4, 1), today=date(2026, 5, 20))
+    assert is_closed_period(date(2026, 5, 1), today=date(2026, 5, 20))
+
+
+def test_open_month_is_not_closed():
+    assert not is_closed_period(date(2026, 5, 2), today=date(2026, 5, 20))
+    assert not is_closed_period(date(2026, 5, 20), today=date(2026, 5, 20))
+
+
+def test_last_month_is_open_until_settled():
+    # April ends (exclusive) on 1 May and settles three days later
+    assert not is_closed_period(date(2026, 5, 1), today=date(2026, 5, 3))
+    assert is_closed_period(date(2026, 5, 1), today=date(2026, 5, 4))
+
+
+def test_settle_window_crosses_year_end():
+    assert not is_closed_period(date(2026, 1, 1), today=date(2026, 1, 2))
+    assert is_closed_period(date(2025, 12, 1), today=date(2026, 1, 2))
+
+
+@pytest.mark.asyncio
+async def test_unsupported_provider_is_not_cached(clock, monkeypatch):
+    analyzer = UnsupportedAnalyzer()
+    monkeypatch.setattr(billing_cache, "get_analyzer", lambda provider: analyzer)
+    azure = account("AZURE")
+
+    for _ in range(2):
+        with pytest.raises(BillingUnsupported):
+            await billing_cache.get_cost_data(azure, "2026-01-01", "2026-02-01")
+
+    assert len(analyzer.calls) == 2
+    assert len(billing_cache.memory_cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_closed_period_is_fetched_once(clock, monkeypatch):
+    analyzer = CountingAnalyzer()
+    monkeypatch.setattr(billing_cache, "get_analyzer", lambda provider: analyzer)
+    aws = account()
+
+    first = await billing_cache.get_cost_data(aws, "2026-01-01", "2026-02-01")
+    clock.now += 10 ** 6  # far beyond BILLING_CACHE_OPEN_TTL_SEC
+    second = await billing_cache.get_cost_data(aws, "2026-01-01", "2026-02-01")
+
+    assert first == second == {"total": 42.0, "compute": 42.0}
+    assert analyzer.calls == [("2026-01-01", "2026-02-01")]
+
+
+@pytest.mark.asyncio
+async def test_open_period_expires(clock, monkeypatch):
+    analyzer = CountingAnalyzer()
+    monkeypatch.setattr(billing_cache, "get_analyzer", lambda provider: analyzer)
+    aws = account()
+    today = date.today()
+    start, end = today.replace(day=1).isoformat(), today.isoformat()
+
+    await billing_cache.get_cost_data(aws, start, end)
+    await billing_cache.get_cost_data(aws, start, end)
+    assert len(analyzer.calls) == 1
+
+    clock.now += billing_cache.settings.BILLING_CACHE_OPEN_TTL_SEC
+    await billing_cache.get_cost_data(aws, start, end)
+    assert len(analyzer.calls) == 2
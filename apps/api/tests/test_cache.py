@@ -0,0 +1,80 @@
+from apps.api.core.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=60, clock=clock)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock.now += 5
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 55
+    assert cache.get("default") is None
+    assert len(cache) == 0
+
+
+def test_infinite_ttl_never_expires():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=60, clock=clock)
+    cache.set("closed", 1, ttl=float("inf"))
+    clock.now += 10 ** 9
+    assert cache.get("closed") == 1
+
+
+def test_max_bytes_evicts_oldest():
+    cache = TTLCache(max_size=10, ttl=60, max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    cache.set("c", b"cccc")
+
+    assert cache.get("a") is None
+    assert cache.bytes == 8
+    assert cache.stats()["bytes"] == 8
+
+
+def test_value_larger_than_max_bytes_is_not_stored():
+    cache = TTLCache(max_size=10, ttl=60, max_bytes=4)
+    cache.set("a", b"aa")
+    cache.set("a", b"too large")
+
+    # The stale value is dropped too
+    assert cache.get("a") is None
+    assert cache.bytes == 0
+
+
+def test_invalidate_and_stats():
+    cache = TTLCache(max_size=10, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    cache.invalidate("missing")
+
+    assert cache.get("a") is None
+    cache.set("b", 2)
+    assert cache.get("b") == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
@@ -0,0 +1,86 @@
+import uuid
+from datetime import date, timedelta
+
+import pytest
+
+from apps.api.core.config import get_settings
+from apps.api.models.billing import CloudAccount
+from apps.api.services.cost_optimizer import cost_facts
+from apps.api.services.cost_optimizer.cost_facts import backfill_daily_costs, missing_ranges, supports_daily_costs
+
+
+def days(start: date, count: int):
+    return [start + timedelta(days=offset) for offset in range(count)]
+
+
+def test_missing_ranges_empty():
+    assert missing_ranges([], max_span_days=31, merge_gap_days=2) == []
+
+
+def test_missing_ranges_contiguous_days_make_one_range():
+    assert missing_ranges(days(date(2026, 3, 1), 5), max_span_days=31, merge_gap_days=0) == [
+        (date(2026, 3, 1), date(2026, 3, 6)),
+    ]
+
+
+def test_missing_ranges_sorts_input():
+    missing = [date(2026, 3, 3), date(2026, 3, 1), date(2026, 3, 2)]
+    assert missing_ranges(missing, max_span_days=31, merge_gap_days=0) == [
+        (date(2026, 3, 1), date(2026, 3, 4)),
+    ]
+
+
+def test_missing_ranges_merges_small_gaps():
+    # 3 and 4 March are ingested; re-fetching them saves a request
+    missing = [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 5)]
+    assert missing_ranges(missing, max_span_days=31, merge_gap_days=2) == [
+        (date(2026, 3, 1), date(2026, 3, 6)),
+    ]
+
+
+def test_missing_ranges_splits_large_gaps():
+    missing = [date(2026, 3, 1), date(2026, 3, 2), date(2026, 3, 6)]
+    assert missing_ranges(missing, max_span_days=31, merge_gap_days=2) == [
+        (date(2026, 3, 1), date(2026, 3, 3)),
+        (date(2026, 3, 6), date(2026, 3, 7)),
+    ]
+
+
+def test_missing_ranges_caps_span():
+    ranges = missing_ranges(days(date(2026, 1, 1), 70), max_span_days=31, merge_gap_days=2)
+    assert ranges == [
+        (date(2026, 1, 1), date(2026, 2, 1)),
+        (date(2026, 2, 1), date(2026, 3, 4)),
+        (date(2026, 3, 4), date(2026, 3, 12)),
+    ]
+    assert all((end - start).days <= 31 for start, end in ranges)
+
+
+@pytest.fixture
+def live_providers(monkeypatch):
+    monkeypatch.setattr(get_settings(), "CLOUD_PROVIDER_BACKEND", "live")
+
+
+def test_daily_costs_support(live_providers):
+    assert supports_daily_costs("AWS")
+    assert not supports_daily_costs("AZURE")
+    assert not supports_daily_costs("GCP")
+
+
+def test_fake_backend_simulates_daily_costs_for_every_provider(monkeypatch):
+    monkeypatch.setattr(get_settings(), "CLOUD_PROVIDER_BACKEND", "fake")
+    assert all(supports_daily_costs(provider) for provider in ("AWS", "AZURE", "GCP"))
+
+
+@pytest.mark.asyncio
+async def test_backfill_skips_unsupported_provider(live_providers, monkeypatch):
+    def no_database():
+        raise AssertionError("the ledger should not be read")
+
+    monkeypatch.setattr(cost_facts, "AsyncSessionLocal", no_database)
+    account = CloudAccount(id=uuid.uuid4(), provider="GCP", credentials={}, region="project")
+
+    result = await backfill_daily_costs(account)
+
+    assert not result.supported
+    assert (result.missing_days, result.requests, result.rows) == (0, 0, 0)
@@ -0,0 +1,86 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+
+from apps.api.core import deps
+from apps.api.core.cache import TTLCache
+from apps.api.core.security import create_access_token
+from apps.api.models.user import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeResult:
+    def __init__(self, user):
+        self._user = user
+
+    def scalar_one_or_none(self):
+        return self._user
+
+
+class UsersTable:
+    """Session stand-in returning the current row for the user, counting queries."""
+
+    def __init__(self, user: User):
+        self.user = user
+        self.queries = 0
+
+    async def execute(self, statement):
+        self.queries += 1
+        return FakeResult(self.user)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(deps, "user_cache", TTLCache(100, deps.user_cache.ttl, clock=clock))
+    return clock
+
+
+def credentials(user_id: uuid.UUID) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": str(user_id)}))
+
+
+def make_user(role: str) -> User:
+    return User(id=uuid.uuid4(), email="ops@example.com", name="Ops", role=role, created_at=datetime.utcnow())
+
+
+def test_role_staleness_window_is_capped():
+    assert deps.user_cache.ttl <= deps.MAX_USER_CACHE_TTL_SEC
+
+
+@pytest.mark.asyncio
+async def test_role_change_in_another_process_is_seen_after_ttl(clock):
+    user = make_user("ADMIN")
+    db = UsersTable(user)
+
+    assert (await deps.get_current_user(credentials(user.id), db)).role == "ADMIN"
+    # Demoted by another API process: this one's entry is not invalidated
+    db.user = User(id=user.id, email=user.email, name=user.name, role="VIEWER", created_at=user.created_at)
+    assert (await deps.get_current_user(credentials(user.id), db)).role == "ADMIN"
+    assert db.queries == 1
+
+    clock.now += deps.user_cache.ttl
+    assert (await deps.get_current_user(credentials(user.id), db)).role == "VIEWER"
+    assert db.queries == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reloads_at_once(clock):
+    user = make_user("ADMIN")
+    db = UsersTable(user)
+
+    await deps.get_current_user(credentials(user.id), db)
+    db.user = User(id=user.id, email=user.email, name=user.name, role="VIEWER", created_at=user.created_at)
+    deps.invalidate_cached_user(user.id)
+
+    assert (await deps.get_current_user(credentials(user.id), db)).role == "VIEWER"
+    assert db.queries == 2
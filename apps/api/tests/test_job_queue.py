@@ -0,0 +1,155 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from apps.api.services.jobs import InMemoryJobBackend, Job, JobQueue, JobSkipped
+from apps.api.services.jobs.queue import (
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SKIPPED,
+    STALE_JOB_MESSAGE,
+    SUCCEEDED,
+)
+
+
+async def wait_for_status(queue: JobQueue, job: Job, status: str, timeout: float = 2.0) -> Job:
+    async def poll() -> Job:
+        while (current := await queue.get(job.id)).status != status:
+            await asyncio.sleep(0.01)
+        return current
+
+    return await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_claim_marks_job_running():
+    backend = InMemoryJobBackend()
+    job = Job(job_type="test", payload={})
+    await backend.create(job)
+
+    claimed = await backend.claim(timeout=0.1)
+
+    assert claimed is job
+    assert claimed.status == RUNNING
+    assert claimed.attempts == 1
+    assert claimed.started_at is not None
+    assert claimed.heartbeat_at == claimed.started_at
+    assert await backend.claim(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_create_returns_active_job_with_same_dedupe_key():
+    backend = InMemoryJobBackend()
+    first = await backend.create(Job(job_type="test", payload={}, dedupe_key="account"))
+
+    assert await backend.create(Job(job_type="test", payload={}, dedupe_key="account")) is first
+    assert await backend.create(Job(job_type="other", payload={}, dedupe_key="account")) is not first
+
+    await backend.claim(timeout=0.1)
+    await backend.update(first.id, status=SUCCEEDED)
+    assert await backend.create(Job(job_type="test", payload={}, dedupe_key="account")) is not first
+
+
+@pytest.mark.asyncio
+async def test_running_job_heartbeats():
+    queue = JobQueue(InMemoryJobBackend(), concurrency=1, poll_interval=0.01, heartbeat_interval=0.02)
+    release = asyncio.Event()
+
+    async def handler(job, report):
+        await release.wait()
+        return {"done": True}
+
+    queue.register("test", handler)
+    job = await queue.enqueue("test", {})
+    await queue.start()
+    try:
+        running = await wait_for_status(queue, job, RUNNING)
+        claimed_at = running.heartbeat_at
+        await asyncio.sleep(0.1)
+        assert running.heartbeat_at > claimed_at
+
+        release.set()
+        finished = await wait_for_status(queue, job, SUCCEEDED)
+        assert finished.result == {"done": True}
+        assert finished.progress == 100
+    finally:
+        await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_reaper_requeues_then_fails_stale_jobs():
+    backend = InMemoryJobBackend()
+    job = Job(job_type="test", payload={})
+    await backend.create(job)
+    await backend.claim(timeout=0.1)
+    job.heartbeat_at = datetime.utcnow() - timedelta(minutes=10)
+    stale_before = datetime.utcnow() - timedelta(minutes=5)
+
+    assert await backend.recover_stale(stale_before, max_attempts=2) == (1, 0)
+    assert job.status == QUEUED
+    assert job.message == STALE_JOB_MESSAGE
+    assert job.heartbeat_at is None
+
+    # Re-claimed, and the second worker is lost too
+    assert await backend.claim(timeout=0.1) is job
+    job.heartbeat_at = datetime.utcnow() - timedelta(minutes=10)
+
+    assert await backend.recover_stale(stale_before, max_attempts=2) == (0, 1)
+    assert job.status == FAILED
+    assert job.error == STALE_JOB_MESSAGE
+    assert job.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_reaper_leaves_live_jobs_alone():
+    backend = InMemoryJobBackend()
+    job = Job(job_type="test", payload={})
+    await backend.create(job)
+    await backend.claim(timeout=0.1)
+
+    assert await backend.recover_stale(datetime.utcnow() - timedelta(minutes=5), max_attempts=3) == (0, 0)
+    assert job.status == RUNNING
+
+
+@pytest.mark.asyncio
+async def test_shutdown_requeues_running_job():
+    backend = InMemoryJobBackend()
+    queue = JobQueue(backend, concurrency=1, poll_interval=0.01)
+    started = asyncio.Event()
+
+    async def handler(job, report):
+        started.set()
+        await asyncio.Event().wait()
+
+    queue.register("test", handler)
+    job = await queue.enqueue("test", {})
+    await queue.start()
+    await asyncio.wait_for(started.wait(), 2.0)
+    await queue.stop()
+
+    assert job.status == QUEUED
+    assert job.attempts == 0
+    assert job.started_at is None and job.heartbeat_at is None
+    assert await backend.claim(timeout=0.1) is job
+
+
+@pytest.mark.asyncio
+async def test_skipped_job_is_not_failed():
+    queue = JobQueue(InMemoryJobBackend(), concurrency=1, poll_interval=0.01)
+
+    async def handler(job, report):
+        raise JobSkipped("Skipped: already running")
+
+    queue.register("test", handler)
+    job = await queue.enqueue("test", {})
+    await queue.start()
+    try:
+        skipped = await wait_for_status(queue, job, SKIPPED)
+    finally:
+        await queue.stop()
+
+    assert skipped.message == "Skipped: already running"
+    assert skipped.error is None
+    assert skipped.finished_at is not None
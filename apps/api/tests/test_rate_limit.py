@@ -0,0 +1,56 @@
+import pytest
+
+from apps.api.core.rate_limit import Limit, LocalRateLimiter, _take
+
+
+def test_take_consumes_a_token():
+    state = [3.0, 0.0]
+    decision = _take([(state, Limit(3, 1.0))], now=0.0)
+
+    assert decision.allowed
+    assert decision.retry_after == 0
+    assert decision.remaining == 2
+    assert state == [2.0, 0.0]
+
+
+def test_take_refuses_when_empty_and_says_when_to_retry():
+    state = [0.0, 0.0]
+    decision = _take([(state, Limit(10, 0.5))], now=1.0)
+
+    # Half a token refilled; the other half takes another second
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(1.0)
+    assert state[0] == pytest.approx(0.5)
+
+
+def test_take_refills_up_to_capacity():
+    state = [0.0, 0.0]
+    decision = _take([(state, Limit(5, 1.0))], now=100.0)
+
+    assert decision.allowed
+    assert state == [4.0, 100.0]
+
+
+def test_take_is_all_or_nothing_across_buckets():
+    default, analyze = [10.0, 0.0], [0.0, 0.0]
+    decision = _take([(default, Limit(10, 1.0)), (analyze, Limit(3, 0.01))], now=0.0)
+
+    assert not decision.allowed
+    assert decision.retry_after == pytest.approx(100.0)
+    assert decision.remaining == 10
+    assert default[0] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_local_limiter_limits_per_key():
+    clock = [0.0]
+    limiter = LocalRateLimiter(clock=lambda: clock[0])
+    limit = Limit.per_minute(2)
+
+    assert (await limiter.acquire(["user:a"], [limit])).allowed
+    assert (await limiter.acquire(["user:a"], [limit])).allowed
+    assert not (await limiter.acquire(["user:a"], [limit])).allowed
+    assert (await limiter.acquire(["user:b"], [limit])).allowed
+
+    clock[0] += 30
+    assert (await limiter.acquire(["user:a"], [limit])).allowed
@@ -0,0 +1,82 @@
+import pytest
+from starlette.requests import Request
+
+from apps.api.core import responses
+from apps.api.core.responses import _accepted, _matching_tag, negotiate_encoding
+
+
+def request_with(**headers: str) -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.fixture
+def all_encodings(monkeypatch):
+    """Pretend zstd, br and gzip are all configured and installed, in that order."""
+    available = {encoding: bytes for encoding in ("zstd", "br", "gzip")}
+    monkeypatch.setattr(responses, "compressors", lambda: available)
+
+
+def test_accepted_parses_q_values():
+    assert _accepted("gzip, br;q=0.8, zstd;q=0") == ({"gzip": 1.0, "br": 0.8, "zstd": 0.0}, None)
+
+
+def test_accepted_wildcard_and_case():
+    assert _accepted("GZip;Q=0.5, *;q=0.1") == ({"gzip": 0.5}, 0.1)
+
+
+def test_accepted_invalid_q_refuses():
+    assert _accepted("br;q=high, , gzip") == ({"br": 0.0, "gzip": 1.0}, None)
+
+
+def test_negotiate_without_header_is_identity(all_encodings):
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("") is None
+
+
+def test_negotiate_prefers_server_order_on_ties(all_encodings):
+    assert negotiate_encoding("gzip, br, zstd") == "zstd"
+    assert negotiate_encoding("gzip, br") == "br"
+
+
+def test_negotiate_honours_q_values(all_encodings):
+    assert negotiate_encoding("zstd;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("zstd;q=0, br;q=0, gzip;q=0") is None
+
+
+def test_negotiate_wildcard(all_encodings):
+    assert negotiate_encoding("*") == "zstd"
+    assert negotiate_encoding("zstd;q=0, *;q=0.5") == "br"
+
+
+def test_negotiate_skips_unavailable_encodings(monkeypatch):
+    monkeypatch.setattr(responses, "compressors", lambda: {"gzip": bytes})
+    assert negotiate_encoding("zstd, br") is None
+    assert negotiate_encoding("zstd, gzip;q=0.1") == "gzip"
+
+
+def test_matching_tag_without_header():
+    assert _matching_tag(request_with(), "v1") is None
+
+
+def test_matching_tag_exact_and_per_coding():
+    assert _matching_tag(request_with(if_none_match='"v1"'), "v1") == '"v1"'
+    assert _matching_tag(request_with(if_none_match='"v1-gzip"'), "v1") == '"v1-gzip"'
+    assert _matching_tag(request_with(if_none_match='"v1-zstd"'), "v1") == '"v1-zstd"'
+
+
+def test_matching_tag_weak_comparison_and_lists():
+    assert _matching_tag(request_with(if_none_match='W/"v1-br"'), "v1") == 'W/"v1-br"'
+    assert _matching_tag(request_with(if_none_match='"v0", "v1-gzip"'), "v1") == '"v1-gzip"'
+
+
+def test_matching_tag_wildcard():
+    assert _matching_tag(request_with(if_none_match="*"), "v1") == '"v1"'
+
+
+def test_matching_tag_other_versions_do_not_match():
+    assert _matching_tag(request_with(if_none_match='"v2", "v1-deflate", "v10"'), "v1") is None
@@ -80,16 +80,15 @@ export default function CloudAccountsPage() {
 
   const analyzeMutation = useMutation({
     mutationFn: async (accountId: string) => {
-      const response = await costAnalysisAPI.run(accountId)
-      return response.data
+      return costAnalysisAPI.runAndWait(accountId)
     },
-    onSuccess: (data) => {
+    onSuccess: (job) => {
       queryClient.invalidateQueries({ queryKey: ['cost-analyses'] })
       toast.success('Cost analysis completed')
-      navigate(`/cost-optimizer/analysis/${data.id}`)
+      navigate(`/cost-optimizer/analysis/${job.result!.analysis_id}`)
     },
     onError: (error: any) => {
-      toast.error(error.response?.data?.detail || 'Analysis failed')
+      toast.error(error.response?.data?.detail || error.message || 'Analysis failed')
     },
   })
 
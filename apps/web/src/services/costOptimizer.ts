@@ -1,4 +1,5 @@
 import api from './api'
+import type { AnalysisJob, CostData, DailyCostPoint } from '@/types/costOptimizer'
 
 // Subscription APIs
 export const subscriptionAPI = {
@@ -15,6 +16,14 @@ export const cloudAccountAPI = {
     api.post('/cost-optimizer/cloud-accounts', data),
   get: (id: string) => api.get(`/cost-optimizer/cloud-accounts/${id}`),
   delete: (id: string) => api.delete(`/cost-optimizer/cloud-accounts/${id}`),
+  // Billed cost breakdown; end is exclusive, dates are YYYY-MM-DD
+  costs: (id: string, params: { start?: string; end?: string } = {}) =>
+    api.get<CostData>(`/cost-optimizer/cloud-accounts/${id}/costs`, { params }),
+  // Daily cost trend; end is exclusive, dates are YYYY-MM-DD
+  dailyCosts: (
+    id: string,
+    params: { start?: string; end?: string; group_by?: 'category' | 'service' } = {}
+  ) => api.get<DailyCostPoint[]>(`/cost-optimizer/cloud-accounts/${id}/daily-costs`, { params }),
 }
 
 // Cost Analysis APIs
@@ -26,6 +35,23 @@ export const costAnalysisAPI = {
     return api.get(`/cost-optimizer/analyses${params}`)
   },
   get: (id: string) => api.get(`/cost-optimizer/analyses/${id}`),
+  getJob: (jobId: string) => api.get(`/cost-optimizer/jobs/${jobId}`),
+  // Queue an analysis and poll its job until it finishes
+  runAndWait: async (cloudAccountId: string, pollMs = 1500): Promise<AnalysisJob> => {
+    const { data } = await costAnalysisAPI.run(cloudAccountId)
+    let job: AnalysisJob = data
+    while (job.status === 'QUEUED' || job.status === 'RUNNING') {
+      await new Promise((resolve) => setTimeout(resolve, pollMs))
+      job = (await costAnalysisAPI.getJob(job.id)).data
+    }
+    if (job.status === 'FAILED') {
+      throw new Error(job.error || 'Analysis failed')
+    }
+    if (job.status === 'SKIPPED') {
+      throw new Error(job.message || 'Analysis skipped')
+    }
+    return job
+  },
 }
 
 // Recommendation APIs
@@ -53,3 +53,51 @@ export interface CostAnalysis {
   }
   recommendations: CostRecommendation[]
 }
+
+export interface AnalysisJob {
+  id: string
+  job_type: string
+  status: 'QUEUED' | 'RUNNING' | 'SUCCEEDED' | 'FAILED' | 'SKIPPED'
+  progress: number
+  message?: string
+  result?: {
+    analysis_id: string
+    cloud_account_id: string
+    analysis_date: string
+    total_monthly_cost: number
+    potential_savings: number
+    savings_percentage: number
+    resource_count: number
+    cost_breakdown: Record<string, number>
+    recommendation_count: number
+    sync?: {
+      mode: 'full' | 'incremental'
+      seen: number
+      changed: number
+      tombstoned: number
+    }
+    daily_costs?: {
+      missing_days: number
+      requests: number
+      rows: number
+      complete: boolean
+    }
+  }
+  error?: string
+  created_at: string
+  started_at?: string
+  finished_at?: string
+}
+
+export interface CostData {
+  cloud_account_id: string
+  start: string
+  end: string
+  cost_breakdown: Record<string, number>
+}
+
+export interface DailyCostPoint {
+  date: string
+  key: string
+  amount: number
+}